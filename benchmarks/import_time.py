@@ -0,0 +1,114 @@
+"""Бенчмарк времени импорта интеграции GyverTwink.
+
+Каждый модуль импортируется в отдельном чистом интерпретаторе. Перед замером
+загружается базовый набор модулей Home Assistant, который в реальной системе
+уже импортирован к моменту загрузки интеграции, поэтому в отчет попадает
+только собственная стоимость интеграции.
+
+Запуск из корня репозитория:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 --json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PACKAGE = "custom_components.gyvertwink"
+
+TARGETS = [
+    PACKAGE,
+    f"{PACKAGE}.const",
+    f"{PACKAGE}.config_flow",
+    f"{PACKAGE}.gyver_twink",
+    f"{PACKAGE}.coordinator",
+    f"{PACKAGE}.light",
+]
+
+# Модули, которые Home Assistant загружает до интеграции
+BASELINE = [
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+]
+
+PROBE = """
+import importlib, json, sys, time
+for name in {baseline!r}:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+before = set(sys.modules)
+start = time.perf_counter()
+try:
+    importlib.import_module({target!r})
+    error = None
+except Exception as err:
+    error = f"{{type(err).__name__}}: {{err}}"
+elapsed = time.perf_counter() - start
+new = sorted(set(sys.modules) - before)
+print(json.dumps({{"elapsed": elapsed, "modules": new, "error": error}}))
+"""
+
+
+def measure(target: str) -> dict:
+    """Импортирует модуль в новом процессе и возвращает результат замера."""
+    code = PROBE.format(baseline=BASELINE, target=target)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="число повторов")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    parser.add_argument(
+        "--verbose", action="store_true", help="показать импортированные модули"
+    )
+    args = parser.parse_args(argv)
+
+    report = []
+    for target in TARGETS:
+        runs = [measure(target) for _ in range(args.repeat)]
+        report.append(
+            {
+                "module": target,
+                "median_ms": round(
+                    statistics.median(r["elapsed"] for r in runs) * 1000, 2
+                ),
+                "modules": len(runs[0]["modules"]),
+                "imported": runs[0]["modules"],
+                "error": runs[0]["error"],
+            }
+        )
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"{'module':45} {'ms':>9} {'modules':>8}")
+    for row in report:
+        print(f"{row['module']:45} {row['median_ms']:9.2f} {row['modules']:8d}")
+        if row["error"]:
+            print(f"    ! {row['error']}")
+        if args.verbose:
+            for name in row["imported"]:
+                print(f"    {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+"""Сквозная задержка: от вызова сервиса до пакета на гирлянде и записи состояния.
+
+Поднимает тестовый Home Assistant с интеграцией, настроенной на виртуальную
+гирлянду (127.0.0.2:8888), и измеряет вызовы `light.turn_on` (яркость),
+`number.set_value` (масштаб) и `switch.turn_on` (автосмена). Для каждого
+вызова время раскладывается на составляющие (мс):
+
+    - dispatch: от вызова сервиса до команды coordinator;
+    - executor_hop: от команды coordinator до начала метода клиента в executor;
+    - pacing: паузы клиента перед отправкой команд (`sock()`);
+    - wire: от отправки последней команды до ее приема гирляндой;
+    - refresh: обновления coordinator после команд (вместе с их паузами);
+    - state_write: от вызова сервиса до первой записи состояния entity;
+    - total: от вызова сервиса до его завершения.
+
+Если p95 составляющей больше бюджета, скрипт завершается с кодом 1. Это
+ручная проверка после изменений `coordinator.py` и `sock()`, а не тест:
+pytest ее не запускает.
+
+Перед замером пауза между пакетами подбирается на виртуальной гирлянде так
+же, как в работе интеграции (`GyverTwinkCoordinator._async_tune`), и бюджеты
+паузы и обновлений пересчитываются по подобранной паузе. С --default-gap
+замер идет с `Pacer.DEFAULT_GAP`, как у гирлянды без подбора. Периодический
+опрос на время замера отключен, а cooldown обновления после команды по
+умолчанию равен нулю, чтобы каждый вызов включал свое обновление.
+
+Требуется pytest-homeassistant-custom-component. Запуск из корня репозитория:
+
+    python benchmarks/latency.py --iterations 20
+    python benchmarks/latency.py --budget light.turn_on:total=800 --json
+    python benchmarks/latency.py --default-gap
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.gyvertwink.const import CONF_EFFECTS, DOMAIN, EFFECTS  # noqa: E402
+from custom_components.gyvertwink.emulator import EmulatorThread  # noqa: E402
+from custom_components.gyvertwink.gyver_twink import GyverTwink  # noqa: E402
+from custom_components.gyvertwink.protocol import Pacer  # noqa: E402
+
+HOST = "127.0.0.2"
+
+COMPONENTS = [
+    "dispatch",
+    "executor_hop",
+    "pacing",
+    "wire",
+    "refresh",
+    "state_write",
+    "total",
+]
+
+# Бюджеты p95: (мс, число пауз sock() между пакетами). Бюджет в мс - первое
+# значение плюс паузы по паузе гирлянды (`budgets_for`). turn_on с яркостью
+# (питание, обновление, яркость, обновление) ждет больше пауз, чем одиночные
+# команды; с паузой по умолчанию 0,2 с бюджеты прежние: 300/600/1000 мс
+# для turn_on и 50/350/500 мс для остальных
+BUDGETS = {
+    "light.turn_on": {
+        "dispatch": (25, 0),
+        "executor_hop": (25, 0),
+        "pacing": (100, 1),
+        "wire": (10, 0),
+        "refresh": (200, 2),
+        "state_write": (600, 2),
+        "total": (600, 2),
+    },
+    "number.set_value": {
+        "dispatch": (25, 0),
+        "executor_hop": (25, 0),
+        "pacing": (50, 0),
+        "wire": (10, 0),
+        "refresh": (150, 1),
+        "state_write": (300, 1),
+        "total": (300, 1),
+    },
+    "switch.turn_on": {
+        "dispatch": (25, 0),
+        "executor_hop": (25, 0),
+        "pacing": (50, 0),
+        "wire": (10, 0),
+        "refresh": (150, 1),
+        "state_write": (300, 1),
+        "total": (300, 1),
+    },
+}
+
+
+def budgets_for(gap: float) -> dict:
+    """Бюджеты p95 в мс для паузы между пакетами `gap` секунд."""
+    return {
+        service: {
+            component: fixed + gaps * gap * 1000 for component, (fixed, gaps) in limits.items()
+        }
+        for service, limits in BUDGETS.items()
+    }
+
+# Пакет чтения настроек (обновление coordinator): GT 1
+SETTINGS_COMMAND = 1
+
+
+class Timeline:
+    """Отметки времени одного вызова: (событие, время, данные)."""
+
+    def __init__(self) -> None:
+        self.marks: list[tuple[str, float, object]] = []
+
+    def mark(self, name: str, data: object = None) -> None:
+        # list.append потокобезопасен: отметки ставят loop HA, executor и эмулятор
+        self.marks.append((name, time.monotonic(), data))
+
+    def times(self, name: str) -> list[float]:
+        return [at for event, at, _ in self.marks if event == name]
+
+    def breakdown(self, started: float, finished: float) -> dict[str, float]:
+        """Составляющие задержки вызова в мс."""
+        marks = sorted(self.marks, key=lambda mark: mark[1])
+        commands = self.times("command")
+        executors = self.times("executor")
+
+        # Пауза sock(): от входа в sock() до первой отправки этого вызова
+        pacing = 0.0
+        command_sends: list[tuple[float, bytes]] = []
+        entered = None
+        for event, at, data in marks:
+            if event == "sock":
+                entered = at
+            elif event == "send" and entered is not None:
+                if data[2] != SETTINGS_COMMAND:
+                    pacing += at - entered
+                entered = None
+            if event == "send" and data[2] != SETTINGS_COMMAND:
+                command_sends.append((at, data))
+
+        wire = None
+        if command_sends:
+            sent, data = command_sends[-1]
+            arrivals = [
+                at for event, at, payload in marks
+                if event == "arrival" and payload == data and at >= sent
+            ]
+            if arrivals:
+                wire = arrivals[0] - sent
+
+        refresh = sum(
+            end - start
+            for start, end in zip(self.times("refresh_start"), self.times("refresh_end"))
+        )
+        states = self.times("state")
+
+        result = {
+            "dispatch": commands[0] - started if commands else None,
+            "executor_hop": (
+                sum(e - c for c, e in zip(commands, executors)) if executors else None
+            ),
+            "pacing": pacing,
+            "wire": wire,
+            "refresh": refresh,
+            "state_write": states[0] - started if states else None,
+            "total": finished - started,
+        }
+        return {
+            key: None if value is None else round(value * 1000, 3)
+            for key, value in result.items()
+        }
+
+
+def instrument(coordinator, device, timeline: Timeline) -> None:
+    """Отметки времени на пути команды (обертки методов экземпляров)."""
+    twink = coordinator.twink
+
+    command = coordinator._async_command
+
+    async def timed_command(func, *args, **kwargs):
+        timeline.mark("command")
+        return await command(func, *args, **kwargs)
+
+    coordinator._async_command = timed_command
+
+    update = coordinator._async_update_data
+
+    async def timed_update():
+        timeline.mark("refresh_start")
+        try:
+            return await update()
+        finally:
+            timeline.mark("refresh_end")
+
+    coordinator._async_update_data = timed_update
+
+    def wrap(name: str, event: str, with_data: bool = False) -> None:
+        original = getattr(twink, name)
+
+        def wrapper(*args, **kwargs):
+            timeline.mark(event, args[0] if with_data else None)
+            return original(*args, **kwargs)
+
+        setattr(twink, name, wrapper)
+
+    for name in dir(GyverTwink):
+        if name.startswith("set_"):
+            wrap(name, "executor")
+    wrap("sock", "sock", with_data=True)
+
+    send = twink._send
+
+    def timed_send(sock, data):
+        timeline.mark("send", data)
+        return send(sock, data)
+
+    twink._send = timed_send
+
+    received = device.datagram_received
+
+    def timed_received(data, addr):
+        timeline.mark("arrival", data)
+        return received(data, addr)
+
+    device.datagram_received = timed_received
+
+
+def percentile(values: list[float], share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+async def run_latency(
+    iterations: int, interval: float, cooldown: float, default_gap: bool = False
+) -> dict:
+    """Замеры задержки каждого сервиса, `iterations` вызовов.
+
+    :return: Отчет по сервисам и пауза между пакетами, с которой шел замер
+        (ключ "gap_ms").
+    """
+    from homeassistant import loader
+    from homeassistant.const import CONF_HOST, EVENT_STATE_CHANGED
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+
+    emulator = EmulatorThread(HOST, 8888).start()
+    timeline = Timeline()
+    samples: dict[str, list[dict]] = {service: [] for service in BUDGETS}
+
+    try:
+        async with async_test_home_assistant() as hass:
+            hass.config.config_dir = str(ROOT)
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            MockConfigEntry(
+                domain=DOMAIN,
+                title=HOST,
+                data={CONF_HOST: HOST, CONF_EFFECTS: list(EFFECTS)},
+            ).add_to_hass(hass)
+
+            await async_setup_component(hass, DOMAIN, {})
+            await hass.async_block_till_done()
+
+            coordinator = next(iter(hass.data[DOMAIN].values()))
+            coordinator.update_interval = None
+            if default_gap:
+                coordinator.twink.pacer.learned(Pacer.DEFAULT_GAP)
+            else:
+                # Подбор паузы до замера, тем же путем, что и в работе интеграции
+                await coordinator._async_tune()
+            gap = coordinator.twink.pacer.gap
+            coordinator._debounced_refresh.cooldown = cooldown
+            instrument(coordinator, emulator.device, timeline)
+
+            light = hass.states.async_entity_ids("light")[0]
+            scale = next(
+                e for e in hass.states.async_entity_ids("number") if e.endswith("scale")
+            )
+            auto_change = next(
+                e for e in hass.states.async_entity_ids("switch") if e.endswith("auto_change")
+            )
+
+            target = None
+
+            def on_state(event) -> None:
+                if event.data["entity_id"] == target:
+                    timeline.mark("state")
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, on_state)
+
+            async def measure(service: str, entity_id: str, data: dict) -> None:
+                nonlocal target
+                domain, name = service.split(".")
+                # Пауза, чтобы первая команда не попадала под паузу sock()
+                await asyncio.sleep(interval)
+                target = entity_id
+                timeline.marks.clear()
+                started = time.monotonic()
+                await hass.services.async_call(
+                    domain, name, {"entity_id": entity_id, **data}, blocking=True
+                )
+                finished = time.monotonic()
+                await hass.async_block_till_done()
+                samples[service].append(timeline.breakdown(started, finished))
+                target = None
+
+            for i in range(iterations):
+                await measure("light.turn_on", light, {"brightness": 100 + i % 2 * 100})
+                await measure("number.set_value", scale, {"value": 50 + i % 2 * 100})
+
+                # Выключение не измеряется, оно только готовит следующее включение
+                await hass.services.async_call(
+                    "switch", "turn_off", {"entity_id": auto_change}, blocking=True
+                )
+                await measure("switch.turn_on", auto_change, {})
+
+            await hass.async_stop(force=True)
+    finally:
+        emulator.stop()
+
+    report = {"gap_ms": round(gap * 1000, 3)}
+    for service, rows in samples.items():
+        report[service] = {}
+        for component in COMPONENTS:
+            values = [row[component] for row in rows if row[component] is not None]
+            report[service][component] = {
+                "p50": round(statistics.median(values), 3) if values else None,
+                "p95": round(percentile(values, 0.95), 3) if values else None,
+                "missing": len(rows) - len(values),
+            }
+    return report
+
+
+def check_budgets(report: dict, budgets: dict) -> list[str]:
+    """Нарушения бюджетов: p95 больше бюджета или составляющая не измерена."""
+    violations = []
+    for service, limits in budgets.items():
+        for component, limit in limits.items():
+            stats = report[service][component]
+            if stats["p95"] is None:
+                violations.append(f"{service} {component}: not measured")
+            elif stats["p95"] > limit:
+                violations.append(
+                    f"{service} {component}: p95 {stats['p95']} ms > {limit} ms"
+                )
+    return violations
+
+
+def parse_budget(value: str) -> tuple[str, str, float]:
+    """Бюджет из аргумента вида "light.turn_on:total=800"."""
+    try:
+        service, rest = value.split(":")
+        component, limit = rest.split("=")
+        if service not in BUDGETS or component not in COMPONENTS:
+            raise ValueError
+        return service, component, float(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid budget: {value}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20, help="вызовов каждого сервиса")
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="пауза перед каждым вызовом, с"
+    )
+    parser.add_argument(
+        "--cooldown", type=float, default=0.0, help="cooldown обновления после команды, с"
+    )
+    parser.add_argument(
+        "--budget", type=parse_budget, action="append", default=[],
+        help="бюджет p95, например light.turn_on:total=800",
+    )
+    parser.add_argument(
+        "--default-gap", action="store_true",
+        help="замер с паузой по умолчанию вместо подобранной",
+    )
+    parser.add_argument("--no-assert", action="store_true", help="не проверять бюджеты")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run_latency(args.iterations, args.interval, args.cooldown, args.default_gap)
+    )
+    budgets = budgets_for(report["gap_ms"] / 1000)
+    for service, component, limit in args.budget:
+        budgets[service][component] = limit
+
+    violations = [] if args.no_assert else check_budgets(report, budgets)
+
+    if args.json:
+        print(json.dumps({"report": report, "violations": violations}, indent=2))
+    else:
+        print(f"{'':18}" + "".join(f"{c:>16}" for c in COMPONENTS))
+        for service, stats in report.items():
+            if service == "gap_ms":
+                continue
+            print(
+                f"{service:18}"
+                + "".join(
+                    f"{str(stats[c]['p50']) + ' / ' + str(stats[c]['p95']):>16}"
+                    for c in COMPONENTS
+                )
+            )
+        print(f"p50 / p95, мс; пауза между пакетами {report['gap_ms']} мс")
+        for violation in violations:
+            print(f"BUDGET EXCEEDED: {violation}")
+
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Бенчмарк памяти: байты и выделения на гирлянду и на цикл опроса.
+
+Запускает N виртуальных гирлянд (как `soak.py`) и через tracemalloc измеряет:
+
+    - байты, удерживаемые на одну гирлянду после подключения;
+    - байты, оставшиеся после цикла опроса всех гирлянд (должно быть ~0);
+    - пик временных выделений за цикл опроса на гирлянду;
+    - число сборок мусора поколения 0 на 1000 опросов (нагрузка на GC).
+
+Режим `client` измеряет только клиент GyverTwink и не требует Home Assistant.
+Режим `ha` поднимает тестовый Home Assistant с N config entries (coordinator,
+entities) и требует pytest-homeassistant-custom-component.
+
+    python benchmarks/memory.py client --devices 10,100,500
+    python benchmarks/memory.py ha --devices 10,50,100 --cycles 20
+"""
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.soak import EmulatorFleet  # noqa: E402
+from custom_components.gyvertwink.const import CONF_EFFECTS, DOMAIN, EFFECTS  # noqa: E402
+from custom_components.gyvertwink.gyver_twink import GyverTwink  # noqa: E402
+
+
+def gen0_collections() -> int:
+    return gc.get_stats()[0]["collections"]
+
+
+def report_row(count: int, setup_bytes: int, cycles: list[tuple[int, int]], gc_runs: int) -> dict:
+    """Строка отчета по замерам: (удержано, пик) за каждый цикл."""
+    polls = count * len(cycles)
+    return {
+        "devices": count,
+        "bytes_per_device": round(setup_bytes / count),
+        "retained_per_cycle": round(sum(r for r, _ in cycles) / len(cycles)),
+        "peak_per_poll": round(max(p for _, p in cycles) / count),
+        "gc0_per_1000_polls": round(gc_runs * 1000 / polls, 2),
+    }
+
+
+def run_client(count: int, cycles: int) -> dict:
+    """Клиенты GyverTwink без Home Assistant, опрос как у coordinator."""
+    fleet = EmulatorFleet(count).start()
+    try:
+        tracemalloc.start()
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+
+        # Как в coordinator: без stale-while-revalidate, опрос не чаще 1 с
+        twinks = [GyverTwink(host, settings_ttl=1.0, settings_stale=0) for host in fleet.hosts]
+        for twink in twinks:
+            twink.last_reqest_time = 0
+            twink.read_settings(0)
+        gc.collect()
+        setup = tracemalloc.get_traced_memory()[0] - before
+
+        results = []
+        gc_before = gen0_collections()
+        for _ in range(cycles):
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            for twink in twinks:
+                twink.last_reqest_time = 0
+                twink.read_settings(0)
+            current, peak = tracemalloc.get_traced_memory()
+            results.append((current - start, peak - start))
+        gc_runs = gen0_collections() - gc_before
+        tracemalloc.stop()
+    finally:
+        fleet.stop()
+
+    return report_row(count, setup, results, gc_runs)
+
+
+async def run_ha(count: int, cycles: int) -> dict:
+    """Coordinator и entities в тестовом Home Assistant."""
+    from homeassistant import loader
+    from homeassistant.const import CONF_HOST
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+
+    fleet = EmulatorFleet(count).start()
+    try:
+        async with async_test_home_assistant() as hass:
+            hass.config.config_dir = str(ROOT)
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            for host in fleet.hosts:
+                MockConfigEntry(
+                    domain=DOMAIN,
+                    title=host,
+                    data={CONF_HOST: host, CONF_EFFECTS: list(EFFECTS)},
+                ).add_to_hass(hass)
+
+            # Импорт модулей интеграции не относится к стоимости устройства
+            await async_setup_component(hass, "light", {})
+            tracemalloc.start()
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+
+            await async_setup_component(hass, DOMAIN, {})
+            await hass.async_block_till_done()
+            gc.collect()
+            setup = tracemalloc.get_traced_memory()[0] - before
+
+            coordinators = list(hass.data[DOMAIN].values())
+            results = []
+            gc_before = gen0_collections()
+            for _ in range(cycles):
+                for coordinator in coordinators:
+                    coordinator.twink.settings_time = 0
+                    coordinator.twink.last_reqest_time = 0
+                start = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                await asyncio.gather(*(c.async_refresh() for c in coordinators))
+                await hass.async_block_till_done()
+                current, peak = tracemalloc.get_traced_memory()
+                results.append((current - start, peak - start))
+            gc_runs = gen0_collections() - gc_before
+            tracemalloc.stop()
+
+            await hass.async_stop(force=True)
+    finally:
+        fleet.stop()
+
+    return report_row(count, setup, results, gc_runs)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["client", "ha"])
+    parser.add_argument("--devices", default="10,100", help="список N")
+    parser.add_argument("--cycles", type=int, default=20, help="циклов опроса")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    args = parser.parse_args(argv)
+
+    report = []
+    for n in args.devices.split(","):
+        if args.mode == "client":
+            report.append(run_client(int(n), args.cycles))
+        else:
+            report.append(asyncio.run(run_ha(int(n), args.cycles)))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    columns = list(report[0])
+    print(" ".join(f"{c:>20}" for c in columns))
+    for row in report:
+        print(" ".join(f"{str(row[c]):>20}" for c in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Нагрузочный тест: сотни виртуальных гирлянд против coordinator.
+
+Для каждого N из списка запускается N виртуальных гирлянд на адресах
+127.0.0.2, 127.0.0.3, ... (порт 8888, Linux маршрутизирует всю сеть 127/8
+на loopback) и тестовый экземпляр Home Assistant с N config entries.
+В течение заданного времени работает обычный опрос coordinator и случайные
+команды через сервисы, после чего выводится отчет:
+
+    - задержка event loop (p50 / p99 / max);
+    - глубина очереди executor (среднее / максимум);
+    - RSS процесса;
+    - записи состояний в секунду;
+    - доля успешных опросов.
+
+Требуется pytest-homeassistant-custom-component. Запуск из корня репозитория:
+
+    python benchmarks/soak.py --devices 10,50,100,200 --duration 120
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.gyvertwink.const import CONF_EFFECTS, DOMAIN, EFFECTS  # noqa: E402
+from custom_components.gyvertwink.emulator import async_start_emulator  # noqa: E402
+
+
+class EmulatorFleet(threading.Thread):
+    """N виртуальных гирлянд в отдельном потоке, чтобы не нагружать loop HA."""
+
+    def __init__(self, count: int) -> None:
+        super().__init__(daemon=True)
+        self.hosts = [f"127.0.{(i + 2) // 256}.{(i + 2) % 256}" for i in range(count)]
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        transports = self.loop.run_until_complete(
+            asyncio.gather(*(async_start_emulator(host, 8888) for host in self.hosts))
+        )
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            for transport, _ in transports:
+                transport.close()
+            # Сокеты закрываются в следующей итерации loop
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.loop.close()
+
+    def start(self) -> "EmulatorFleet":
+        super().start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+
+
+def rss_mb() -> float:
+    """Текущий RSS процесса в МБ."""
+    with open("/proc/self/statm") as file:
+        pages = int(file.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def run_soak(count: int, duration: float, command_rate: float) -> dict:
+    """Один прогон нагрузочного теста для `count` гирлянд."""
+    from homeassistant import loader
+    from homeassistant.const import CONF_HOST, EVENT_STATE_CHANGED
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+
+    fleet = EmulatorFleet(count).start()
+    try:
+        async with async_test_home_assistant() as hass:
+            hass.config.config_dir = str(ROOT)
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            for host in fleet.hosts:
+                MockConfigEntry(
+                    domain=DOMAIN,
+                    title=host,
+                    data={CONF_HOST: host, CONF_EFFECTS: list(EFFECTS)},
+                ).add_to_hass(hass)
+
+            setup_started = time.monotonic()
+            await async_setup_component(hass, DOMAIN, {})
+            await hass.async_block_till_done()
+            setup_time = time.monotonic() - setup_started
+
+            # Счетчики опросов по всем coordinator
+            polls = {"ok": 0, "failed": 0}
+            for coordinator in hass.data[DOMAIN].values():
+                original = coordinator._async_update_data
+
+                async def counted(original=original):
+                    try:
+                        result = await original()
+                    except Exception:
+                        polls["failed"] += 1
+                        raise
+                    polls["ok"] += 1
+                    return result
+
+                coordinator._async_update_data = counted
+
+            writes = 0
+
+            def count_write(_event) -> None:
+                nonlocal writes
+                writes += 1
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+
+            lags: list[float] = []
+            queue_depth: list[int] = []
+            rss: list[float] = []
+            stop = asyncio.Event()
+            executor = hass.loop._default_executor
+
+            async def monitor() -> None:
+                while not stop.is_set():
+                    expected = time.monotonic() + 0.05
+                    await asyncio.sleep(0.05)
+                    lags.append(max(0.0, time.monotonic() - expected))
+                    if executor is not None:
+                        queue_depth.append(executor._work_queue.qsize())
+                    if len(lags) % 20 == 0:
+                        rss.append(rss_mb())
+
+            async def commands() -> None:
+                lights = hass.states.async_entity_ids("light")
+                numbers = [
+                    e for e in hass.states.async_entity_ids("number") if e.endswith("scale")
+                ]
+                while not stop.is_set():
+                    await asyncio.sleep(random.expovariate(command_rate))
+                    if random.random() < 0.5 and lights:
+                        hass.async_create_task(
+                            hass.services.async_call(
+                                "light",
+                                "turn_on",
+                                {
+                                    "entity_id": random.choice(lights),
+                                    "brightness": random.randint(1, 255),
+                                },
+                            )
+                        )
+                    elif numbers:
+                        hass.async_create_task(
+                            hass.services.async_call(
+                                "number",
+                                "set_value",
+                                {
+                                    "entity_id": random.choice(numbers),
+                                    "value": random.randint(1, 255),
+                                },
+                            )
+                        )
+
+            started = time.monotonic()
+            tasks = [asyncio.create_task(monitor()), asyncio.create_task(commands())]
+            await asyncio.sleep(duration)
+            stop.set()
+            await asyncio.gather(*tasks)
+            elapsed = time.monotonic() - started
+
+            await hass.async_stop(force=True)
+    finally:
+        fleet.stop()
+
+    lags.sort()
+    total_polls = polls["ok"] + polls["failed"]
+    return {
+        "devices": count,
+        "setup_s": round(setup_time, 2),
+        "loop_lag_p50_ms": round(statistics.median(lags) * 1000, 2),
+        "loop_lag_p99_ms": round(lags[int(len(lags) * 0.99)] * 1000, 2),
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2),
+        "executor_queue_avg": round(statistics.mean(queue_depth or [0]), 2),
+        "executor_queue_max": max(queue_depth or [0]),
+        "rss_mb": round(max(rss or [rss_mb()]), 1),
+        "state_writes_per_s": round(writes / elapsed, 1),
+        "poll_success": round(polls["ok"] / total_polls, 4) if total_polls else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", default="10,50,100,200", help="список N")
+    parser.add_argument("--duration", type=float, default=60, help="длительность, с")
+    parser.add_argument(
+        "--command-rate", type=float, default=2.0, help="команд в секунду на весь парк"
+    )
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    args = parser.parse_args(argv)
+
+    report = [
+        asyncio.run(run_soak(int(n), args.duration, args.command_rate))
+        for n in args.devices.split(",")
+    ]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    columns = list(report[0])
+    print(" ".join(f"{c:>20}" for c in columns))
+    for row in report:
+        print(" ".join(f"{str(row[c]):>20}" for c in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,41 @@
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from __future__ import annotations
 
-from .coordinator import GyverTwinkCoordinator
+from typing import TYPE_CHECKING
 
-DOMAIN = "gyvertwink"
+from .const import (
+    CONF_EFFECTS,
+    CONF_FLEET_POLL,
+    CONF_KEEP_WARM,
+    CONF_PREFETCH,
+    DOMAIN,
+    PLATFORMS,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
 
 
 async def async_setup(hass, hass_config):
     """Настройка интеграции (используется только для GUI setup)."""
+    from .services import async_setup_services
+
     hass.data.setdefault(DOMAIN, {})
+    await async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Настройка из config entry."""
+    # Координатор и клиент загружаются только при реальной настройке устройства,
+    # чтобы импорт пакета (например, из config flow) оставался дешевым
+    from homeassistant.const import CONF_HOST
+
+    from .coordinator import GyverTwinkCoordinator
+    from .fleet import GyverTwinkFleet
+    from .playlist import GyverTwinkPlaylist
+    from .scanner import SCANNER_KEY, GyverTwinkScanner
+
     # Миграция данных (после первой настройки) в options
     if entry.data:
         hass.config_entries.async_update_entry(entry, data={}, options=entry.data)
@@ -25,21 +46,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         hass,
         entry.options[CONF_HOST],
         entry.entry_id,
+        entry.options.get(CONF_EFFECTS),
+        entry.options.get(CONF_KEEP_WARM, False),
+        entry.options.get(CONF_PREFETCH, False),
+        entry.options.get(CONF_FLEET_POLL, False),
+        entry.title,
     )
 
-    # Первичное получение данных
+    # Сохраненные параметры эффектов и пауза между пакетами, первичное получение данных
+    await coordinator.async_load_effects()
+    await coordinator.async_load_pacing()
     await coordinator.async_config_entry_first_refresh()
+    coordinator.async_start_keep_warm()
+
+    # Дальнейший опрос - общим broadcast-запросом со всеми такими гирляндами
+    if coordinator.fleet:
+        entry.async_on_unload(await GyverTwinkFleet.async_get(hass).async_add(coordinator))
 
     # Сохраняем coordinator для доступа из entities
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # Фоновый поиск новых гирлянд - пока добавлена хотя бы одна гирлянда
+    if SCANNER_KEY not in hass.data:
+        scanner = hass.data[SCANNER_KEY] = GyverTwinkScanner(hass)
+        scanner.async_start()
+
     # Добавляем обработчик обновления опций
     entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     # Пробрасываем настройку на платформы light, number, switch и button
-    await hass.config_entries.async_forward_entry_setups(
-        entry, ["light", "number", "switch", "button"]
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Продолжаем плейлист, который играл до перезапуска
+    coordinator.playlist = GyverTwinkPlaylist(hass, coordinator)
+    entry.async_on_unload(coordinator.playlist.async_shutdown)
+    entry.async_create_background_task(
+        hass, coordinator.playlist.async_restore(), f"{DOMAIN} playlist restore"
     )
 
     return True
@@ -53,13 +96,15 @@ async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Выгрузка config entry."""
+    from .scanner import SCANNER_KEY
+
     # Выгружаем все платформы
-    unload_ok = await hass.config_entries.async_unload_platforms(
-        entry, ["light", "number", "switch", "button"]
-    )
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     # Удаляем coordinator из памяти
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN] and SCANNER_KEY in hass.data:
+            hass.data.pop(SCANNER_KEY).async_stop()
 
     return unload_ok
@@ -1,15 +1,10 @@
-import logging
-
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import DOMAIN
+from .const import DOMAIN
 from .coordinator import GyverTwinkCoordinator
-
-_LOGGER = logging.getLogger(__name__)
+from .entity import GyverTwinkEntity
 
 
 async def async_setup_entry(
@@ -23,30 +18,20 @@ async def async_setup_entry(
     # Создаем button entity
     entity = GyverTwinkNextEffect(coordinator, entry.entry_id)
     
-    async_add_entities([entity], True)
+    # Данные уже получены coordinator, обновление перед добавлением не нужно
+    async_add_entities([entity])
 
 
-class GyverTwinkNextEffect(CoordinatorEntity, ButtonEntity):
+class GyverTwinkNextEffect(GyverTwinkEntity, ButtonEntity):
     """Button entity для переключения на следующий эффект.
     
     Эквивалент кнопки в родном приложении - переключает эффекты по порядку.
     """
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация NextEffect button."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Next Effect"
-        self._attr_unique_id = f"{unique_id}_next_effect"
-        self._attr_icon = "mdi:skip-next"
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | NextEffect | {message}")
+    _key = "next_effect"
+    _log_name = "NextEffect"
+    _attr_name = "Gyver Twink Next Effect"
+    _attr_icon = "mdi:skip-next"
 
     async def async_press(self) -> None:
         """Обработка нажатия кнопки - переключение на следующий эффект."""
@@ -0,0 +1,353 @@
+"""Поиск положения светодиодов GyverTwink по снимкам.
+
+Для 2D-карты гирлянды светодиоды зажигаются по одному (`GyverTwink.calibrate`),
+и для каждого снимается кадр. Анализатор находит координаты светодиода на каждом
+кадре: вычитает фон, ищет самый яркий пиксель и уточняет положение центром
+яркости в окне вокруг него. Все кадры обрабатываются пачками целиком средствами
+NumPy, без циклов по пикселям.
+
+Кадры - файлы `.npy` (массив H x W или H x W x 3) или изображения, которые
+читаются через Pillow. Номер светодиода - последнее число в имени файла
+(led_9.png идет раньше led_10.png).
+
+Требуется numpy (и Pillow для изображений). Проверка без камеры и гирлянды:
+синтетические кадры и виртуальная гирлянда на localhost:
+
+    python -m custom_components.gyvertwink.calibration demo --leds 500
+    python -m custom_components.gyvertwink.calibration synthetic frames/ --leds 50
+    python -m custom_components.gyvertwink.calibration analyse frames/*.npy
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Кадров в одной пачке: ограничивает память при сотнях кадров высокого разрешения
+CHUNK = 32
+
+
+class CalibrationResult(NamedTuple):
+    """Результат анализа кадров."""
+
+    # Координаты (x, y) в пикселях для каждого кадра, NaN - светодиод не найден
+    coords: np.ndarray
+    # Яркость светодиода над фоном
+    contrast: np.ndarray
+    # Время этапов в секундах
+    timings: dict
+
+    @property
+    def found(self) -> np.ndarray:
+        return ~np.isnan(self.coords[:, 0])
+
+
+def load_frame(path) -> np.ndarray:
+    """Загружает кадр в оттенках серого как массив float32."""
+    path = Path(path)
+    if path.suffix == ".npy":
+        frame = np.load(path)
+    else:
+        try:
+            from PIL import Image
+        except ImportError as err:
+            raise ImportError(f"Pillow is required to read {path.suffix} frames") from err
+        with Image.open(path) as image:
+            frame = np.asarray(image.convert("L"))
+
+    frame = np.asarray(frame, dtype=np.float32)
+    if frame.ndim == 3:
+        frame = frame.mean(axis=2)
+    return frame
+
+
+def frame_order(path) -> tuple[int, str]:
+    """Ключ сортировки кадров: номер светодиода из имени файла.
+
+    Файлы без номера идут первыми в порядке имен.
+    """
+    name = Path(path).stem
+    numbers = re.findall(r"\d+", name)
+    return (int(numbers[-1]) if numbers else -1, name)
+
+
+def load_frames(paths: Sequence) -> np.ndarray:
+    """Загружает кадры в один массив N x H x W."""
+    frames = None
+    for index, path in enumerate(paths):
+        frame = load_frame(path)
+        if frames is None:
+            frames = np.empty((len(paths), *frame.shape), dtype=np.float32)
+        frames[index] = frame
+    if frames is None:
+        raise ValueError("No frames")
+    return frames
+
+
+def locate_leds(
+    frames: np.ndarray,
+    background: Optional[np.ndarray] = None,
+    radius: int = 6,
+    threshold: float = 0.3,
+    min_contrast: float = 20.0,
+    min_step: float = 0.5,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Находит светодиод на каждом кадре.
+
+    :param frames: Кадры N x H x W.
+    :param background: Кадр без горящих светодиодов. По умолчанию - поэлементный
+        минимум всех кадров (каждый светодиод горит только на своем кадре).
+    :param radius: Полуширина окна вокруг самого яркого пикселя.
+    :param threshold: Доля яркости пика, ниже которой пиксели окна не учитываются.
+    :param min_contrast: Минимальная яркость пика над фоном, иначе светодиод не найден.
+    :param min_step: Если светодиод ближе этого расстояния (в пикселях) к светодиоду
+        предыдущего кадра, это тот же светодиод: команда потерялась и горит
+        прежний. Такой кадр помечается ненайденным.
+
+    :return: Координаты (x, y) N x 2 (NaN для ненайденных) и яркость пиков.
+    """
+    count, height, width = frames.shape
+    if background is None:
+        background = frames.min(axis=0)
+    background = background.astype(np.float32, copy=False)
+
+    ys = np.arange(height, dtype=np.float32)
+    xs = np.arange(width, dtype=np.float32)
+    coords = np.full((count, 2), np.nan, dtype=np.float32)
+    contrast = np.zeros(count, dtype=np.float32)
+
+    for start in range(0, count, CHUNK):
+        diff = frames[start : start + CHUNK] - background
+        np.maximum(diff, 0, out=diff)
+
+        flat = diff.reshape(len(diff), -1)
+        peak_index = flat.argmax(axis=1)
+        peak = flat[np.arange(len(diff)), peak_index]
+        py, px = np.divmod(peak_index, width)
+
+        # Окно вокруг пика и порог по доле его яркости
+        near_y = np.abs(ys[None, :] - py[:, None]) <= radius
+        near_x = np.abs(xs[None, :] - px[:, None]) <= radius
+        mask = near_y[:, :, None] & near_x[:, None, :]
+        mask &= diff >= (peak * threshold)[:, None, None]
+        weights = np.where(mask, diff, 0)
+
+        total = weights.sum(axis=(1, 2))
+        total[total == 0] = 1
+        cy = weights.sum(axis=2) @ ys / total
+        cx = weights.sum(axis=1) @ xs / total
+
+        found = peak >= min_contrast
+        coords[start : start + len(diff)][found] = np.stack([cx, cy], axis=1)[found]
+        contrast[start : start + len(diff)] = peak
+
+    repeated = np.linalg.norm(coords[1:] - coords[:-1], axis=1) < min_step
+    coords[1:][repeated] = np.nan
+
+    return coords, contrast
+
+
+def analyse(
+    paths: Sequence, background_path=None, **kwargs
+) -> CalibrationResult:
+    """Загружает кадры с диска и находит светодиоды (см. `locate_leds`)."""
+    started = time.perf_counter()
+    frames = load_frames(paths)
+    background = load_frame(background_path) if background_path else None
+    loaded = time.perf_counter()
+
+    coords, contrast = locate_leds(frames, background, **kwargs)
+    located = time.perf_counter()
+
+    return CalibrationResult(
+        coords,
+        contrast,
+        {
+            "frames": len(frames),
+            "load_s": round(loaded - started, 4),
+            "locate_s": round(located - loaded, 4),
+            "frames_per_s": round(len(frames) / max(located - loaded, 1e-9), 1),
+        },
+    )
+
+
+def to_map(coords: np.ndarray, size: int = 255) -> np.ndarray:
+    """
+    Переводит координаты в пикселях в карту 0..size с сохранением пропорций.
+
+    Ненайденные светодиоды получают -1.
+    """
+    found = ~np.isnan(coords[:, 0])
+    result = np.full(coords.shape, -1, dtype=np.int32)
+    if not found.any():
+        return result
+
+    low = coords[found].min(axis=0)
+    span = float((coords[found].max(axis=0) - low).max()) or 1.0
+    result[found] = np.rint((coords[found] - low) / span * size).astype(np.int32)
+    return result
+
+
+def synthetic_frames(
+    positions: np.ndarray,
+    shape: tuple[int, int] = (240, 320),
+    sigma: float = 1.5,
+    brightness: float = 200.0,
+    noise: float = 4.0,
+    ambient: float = 30.0,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Синтетические кадры: на кадре i горит светодиод в точке positions[i].
+
+    Строки с NaN дают кадр без светодиода (светодиод вне кадра).
+
+    :param positions: Координаты (x, y) N x 2 в пикселях.
+    :param shape: Размер кадра (H, W).
+    :param sigma: Радиус пятна светодиода.
+    :param brightness: Яркость центра пятна.
+    :param noise: СКО шума сенсора.
+    :param ambient: Средняя яркость неравномерного фона.
+    """
+    rng = np.random.default_rng(seed)
+    height, width = shape
+    ys = np.arange(height, dtype=np.float32)
+    xs = np.arange(width, dtype=np.float32)
+
+    # Фон с плавным градиентом, одинаковый на всех кадрах
+    background = ambient * (0.5 + xs[None, :] / width) * (0.5 + ys[:, None] / height)
+
+    positions = np.asarray(positions, dtype=np.float32)
+    lit = ~np.isnan(positions[:, 0])
+    px = np.where(lit, positions[:, 0], -1e6)
+    py = np.where(lit, positions[:, 1], -1e6)
+    gx = np.exp(-((xs[None, :] - px[:, None]) ** 2) / (2 * sigma**2))
+    gy = np.exp(-((ys[None, :] - py[:, None]) ** 2) / (2 * sigma**2))
+
+    frames = brightness * gy[:, :, None] * gx[:, None, :] + background
+    frames += rng.normal(0, noise, frames.shape).astype(np.float32)
+    return np.clip(frames, 0, 255).astype(np.float32)
+
+
+def random_layout(count: int, shape: tuple[int, int], seed: int = 0) -> np.ndarray:
+    """Случайное расположение светодиодов с отступом от края кадра."""
+    rng = np.random.default_rng(seed)
+    height, width = shape
+    margin = 8
+    return np.stack(
+        [
+            rng.uniform(margin, width - margin, count),
+            rng.uniform(margin, height - margin, count),
+        ],
+        axis=1,
+    ).astype(np.float32)
+
+
+def run_demo(
+    count: int, shape: tuple[int, int], loss: float = 0.0, repeat: int = 1
+) -> dict:
+    """
+    Полный цикл без камеры: виртуальная гирлянда, обход светодиодов клиентом
+    и анализ синтетических кадров того, что "видит" камера.
+    """
+    from .emulator import EmulatorThread
+    from .gyver_twink import GyverTwink
+
+    layout = random_layout(count, shape)
+    seen = np.full((count, 2), np.nan, dtype=np.float32)
+    emulator = EmulatorThread(loss=loss).start()
+
+    def capture(index: int) -> None:
+        lit = emulator.device.lit_led
+        if lit is not None and lit < count:
+            seen[index] = layout[lit]
+
+    try:
+        twink = GyverTwink("127.0.0.1", emulator.port)
+        stepping = twink.calibrate(range(count), capture, repeat=repeat)
+    finally:
+        emulator.stop()
+
+    frames = synthetic_frames(seen, shape)
+    started = time.perf_counter()
+    coords, _ = locate_leds(frames)
+    elapsed = time.perf_counter() - started
+
+    found = ~np.isnan(coords[:, 0])
+    error = np.linalg.norm(coords[found] - layout[found], axis=1)
+    return {
+        "stepping": stepping,
+        "analysis": {
+            "frames": count,
+            "locate_s": round(elapsed, 4),
+            "frames_per_s": round(count / max(elapsed, 1e-9), 1),
+            "found": int(found.sum()),
+            "error_px_mean": round(float(error.mean()), 3) if found.any() else None,
+            "error_px_max": round(float(error.max()), 3) if found.any() else None,
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Калибровка положения светодиодов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyse_ = commands.add_parser("analyse", help="найти светодиоды на кадрах")
+    analyse_.add_argument("frames", nargs="+", help="кадры в порядке светодиодов")
+    analyse_.add_argument("--background", help="кадр без горящих светодиодов")
+    analyse_.add_argument("--radius", type=int, default=6)
+    analyse_.add_argument("--threshold", type=float, default=0.3)
+    analyse_.add_argument("--min-contrast", type=float, default=20.0)
+    analyse_.add_argument("--min-step", type=float, default=0.5)
+
+    synthetic = commands.add_parser("synthetic", help="создать синтетические кадры")
+    synthetic.add_argument("directory")
+    synthetic.add_argument("--leds", type=int, default=50)
+    synthetic.add_argument("--width", type=int, default=320)
+    synthetic.add_argument("--height", type=int, default=240)
+
+    demo = commands.add_parser("demo", help="обход виртуальной гирлянды и анализ")
+    demo.add_argument("--leds", type=int, default=200)
+    demo.add_argument("--width", type=int, default=320)
+    demo.add_argument("--height", type=int, default=240)
+    demo.add_argument("--loss", type=float, default=0.0, help="доля потерь, 0-1")
+    demo.add_argument("--repeat", type=int, default=1, help="копий каждой команды")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "analyse":
+        result = analyse(
+            sorted(args.frames, key=frame_order),
+            args.background,
+            radius=args.radius,
+            threshold=args.threshold,
+            min_contrast=args.min_contrast,
+            min_step=args.min_step,
+        )
+        mapped = to_map(result.coords)
+        leds = [
+            {"led": index, "x": int(x), "y": int(y), "contrast": round(float(c), 1)}
+            for index, ((x, y), c) in enumerate(zip(mapped, result.contrast))
+        ]
+        print(json.dumps({"leds": leds, "stats": result.timings}, indent=2))
+    elif args.command == "synthetic":
+        shape = (args.height, args.width)
+        layout = random_layout(args.leds, shape)
+        directory = Path(args.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for index, frame in enumerate(synthetic_frames(layout, shape)):
+            np.save(directory / f"led_{index:04d}.npy", frame)
+        (directory / "layout.json").write_text(json.dumps(layout.tolist()))
+    else:
+        report = run_demo(args.leds, (args.height, args.width), args.loss, args.repeat)
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Командная строка для управления гирляндами GyverTwink без Home Assistant.
+
+Примеры:
+
+    python -m custom_components.gyvertwink.cli discover --net 192.168.0.255 --net 10.0.0.255
+    python -m custom_components.gyvertwink.cli discover --sweep 192.168.1.0/24 -f json
+    python -m custom_components.gyvertwink.cli get 192.168.0.10 192.168.0.11 -f ndjson
+    python -m custom_components.gyvertwink.cli set 192.168.0.10 192.168.0.11 power=on brightness=120 effect="Warm grad"
+    python -m custom_components.gyvertwink.cli watch 192.168.0.10 --interval 2
+    python -m custom_components.gyvertwink.cli bench --emulator -n 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .const import EFFECTS
+from .gyver_twink import GyverTwink
+
+# Параметры команды set: имя -> (метод клиента, преобразование значения)
+BOOL_VALUES = {"1": True, "on": True, "true": True, "0": False, "off": False, "false": False}
+
+
+def parse_bool(value: str) -> bool:
+    try:
+        return BOOL_VALUES[value.lower()]
+    except KeyError:
+        raise ValueError(f"Expected on/off, got {value!r}") from None
+
+
+def parse_effect(value: str) -> int:
+    return EFFECTS.index(value) if value in EFFECTS else int(value)
+
+
+SETTERS: dict[str, tuple[str, Callable[[str], Any]]] = {
+    "power": ("set_power", parse_bool),
+    "brightness": ("set_brightness", int),
+    "auto_change": ("set_auto_change", parse_bool),
+    "random_change": ("set_random_change", parse_bool),
+    "change_period": ("set_change_period", int),
+    "timer": ("set_timer", parse_bool),
+    "timer_value": ("set_timer_value", int),
+    "leds": ("set_leds", int),
+    "effect": ("select_effect", parse_effect),
+    "favorite": ("set_favorite", parse_bool),
+    "scale": ("set_scale", int),
+    "speed": ("set_speed", int),
+}
+
+
+def output(rows: list[dict], fmt: str) -> None:
+    """Вывод результатов в виде таблицы, JSON или NDJSON."""
+    if fmt == "json":
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    elif fmt == "ndjson":
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False), flush=True)
+    else:
+        for row in rows:
+            print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+
+
+def run_parallel(hosts: list[str], func: Callable[[str], dict], jobs: int) -> list[dict]:
+    """Выполняет func для каждого хоста параллельно, сохраняя порядок."""
+
+    def safe(host: str) -> dict:
+        started = time.monotonic()
+        try:
+            row = {"host": host, **func(host)}
+        except Exception as err:  # noqa
+            row = {"host": host, "error": f"{type(err).__name__}: {err}"}
+        row["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return row
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(hosts)))) as pool:
+        return list(pool.map(safe, hosts))
+
+
+def cmd_discover(args) -> int:
+    hosts: set[str] = set()
+
+    if args.net:
+        # Широковещательный поиск во всех сетях одновременно
+        with ThreadPoolExecutor(max_workers=len(args.net)) as pool:
+            for twinks in pool.map(lambda net: GyverTwink.discover(net, args.timeout), args.net):
+                hosts.update(twink.twink_ip for twink in twinks)
+
+    if args.sweep:
+        from .discovery import async_sweep
+
+        async def sweep() -> list[list[str]]:
+            return await asyncio.gather(
+                *(async_sweep(network, args.timeout) for network in args.sweep)
+            )
+
+        for found in asyncio.run(sweep()):
+            hosts.update(found)
+
+    output([{"host": host} for host in sorted(hosts)], args.format)
+    return 0
+
+
+def cmd_get(args) -> int:
+    rows = run_parallel(args.hosts, lambda host: GyverTwink(host).get_settings() or {}, args.jobs)
+    output(rows, args.format)
+    return 1 if any("error" in row for row in rows) else 0
+
+
+def cmd_set(args) -> int:
+    commands = []
+    for assignment in args.values:
+        key, _, value = assignment.partition("=")
+        if key == "next":
+            commands.append(("next_effect", ()))
+            continue
+        if key not in SETTERS:
+            raise SystemExit(f"Unknown parameter: {key}")
+        method, convert = SETTERS[key]
+        commands.append((method, (convert(value),)))
+
+    def apply(host: str) -> dict:
+        twink = GyverTwink(host)
+        for method, values in commands:
+            getattr(twink, method)(*values)
+        return {"commands": len(commands)}
+
+    rows = run_parallel(args.hosts, apply, args.jobs)
+    output(rows, args.format)
+    return 1 if any("error" in row for row in rows) else 0
+
+
+def cmd_watch(args) -> int:
+    twinks = {host: GyverTwink(host) for host in args.hosts}
+    last: dict[str, dict] = {}
+
+    def poll(host: str) -> dict:
+        return twinks[host].get_settings() or {}
+
+    try:
+        while True:
+            for row in run_parallel(args.hosts, poll, args.jobs):
+                host = row.pop("host")
+                row.pop("latency_ms")
+                previous = last.get(host)
+                changes = {k: v for k, v in row.items() if previous is None or previous.get(k) != v}
+                if changes:
+                    last[host] = row
+                    output([{"time": round(time.time(), 3), "host": host, **changes}], args.format)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+def cmd_bench(args) -> int:
+    emulator = None
+    host, port = args.host, args.port
+    if args.emulator:
+        from .emulator import EmulatorThread
+
+        emulator = EmulatorThread(delay=args.delay).start()
+        host, port = "127.0.0.1", emulator.port
+    elif host is None:
+        raise SystemExit("Specify --host or --emulator")
+
+    twink = GyverTwink(host, port)
+    commands = {
+        "get_settings": lambda: twink.get_settings(),
+        "set_brightness": lambda: twink.set_brightness(100),
+        "select_effect": lambda: twink.select_effect(0),
+        "ping": lambda: twink.ping(),
+    }
+
+    rows = []
+    try:
+        for name, command in commands.items():
+            samples = []
+            for _ in range(args.count):
+                if not args.pacing:
+                    # Замер самой команды без паузы клиента между запросами
+                    twink.last_reqest_time = 0
+                started = time.perf_counter()
+                command()
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            rows.append(
+                {
+                    "command": name,
+                    "count": len(samples),
+                    "p50_ms": round(statistics.median(samples), 3),
+                    "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+                    "max_ms": round(samples[-1], 3),
+                }
+            )
+    finally:
+        if emulator is not None:
+            emulator.stop()
+
+    output(rows, args.format)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="gyvertwink", description="Управление гирляндами GyverTwink"
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "-f", "--format", choices=["table", "json", "ndjson"], default="table"
+    )
+    common.add_argument("-j", "--jobs", type=int, default=32, help="параллельных запросов")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    discover = commands.add_parser("discover", parents=[common], help="поиск гирлянд")
+    discover.add_argument(
+        "--net", action="append", default=[], help="broadcast-адрес сети (можно несколько)"
+    )
+    discover.add_argument(
+        "--sweep", action="append", default=[], help="сеть CIDR для перебора адресов"
+    )
+    discover.add_argument("--timeout", type=float, default=2, help="таймаут, с")
+    discover.set_defaults(func=cmd_discover)
+
+    get = commands.add_parser("get", parents=[common], help="прочитать настройки")
+    get.add_argument("hosts", nargs="+")
+    get.set_defaults(func=cmd_get)
+
+    set_ = commands.add_parser("set", parents=[common], help="изменить параметры")
+    set_.add_argument("hosts", nargs="+", help="адреса гирлянд, затем ключ=значение")
+    set_.set_defaults(func=cmd_set)
+
+    watch = commands.add_parser("watch", parents=[common], help="следить за изменениями")
+    watch.add_argument("hosts", nargs="+")
+    watch.add_argument("--interval", type=float, default=5, help="период опроса, с")
+    watch.set_defaults(func=cmd_watch)
+
+    bench = commands.add_parser("bench", parents=[common], help="задержка команд")
+    bench.add_argument("--host")
+    bench.add_argument("--port", type=int, default=8888)
+    bench.add_argument("--emulator", action="store_true", help="виртуальная гирлянда")
+    bench.add_argument("--delay", type=float, default=0.0, help="задержка эмулятора, с")
+    bench.add_argument("-n", "--count", type=int, default=50, help="повторов на команду")
+    bench.add_argument("--pacing", action="store_true", help="с паузами клиента")
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "set":
+        # Адреса и присваивания идут одним списком: разделяем по "="
+        args.values = [item for item in args.hosts if "=" in item or item == "next"]
+        args.hosts = [item for item in args.hosts if item not in args.values]
+        if not args.hosts or not args.values:
+            raise SystemExit("Usage: set HOST [HOST ...] KEY=VALUE [KEY=VALUE ...]")
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
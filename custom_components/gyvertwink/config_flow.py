@@ -1,3 +1,4 @@
+import ipaddress
 import re
 
 import homeassistant.helpers.config_validation as cv
@@ -5,10 +6,19 @@ import voluptuous as vol
 from homeassistant.config_entries import ConfigFlow, OptionsFlow, ConfigEntry
 from homeassistant.const import CONF_HOST
 from homeassistant.core import callback
+from homeassistant.data_entry_flow import AbortFlow
 
 
-from . import DOMAIN
-from .light import CONF_EFFECTS, EFFECTS
+from .const import (
+    CONF_EFFECTS,
+    CONF_FLEET_POLL,
+    CONF_KEEP_WARM,
+    CONF_PREFETCH,
+    DOMAIN,
+    EFFECTS,
+)
+
+CONF_NETWORK = "network"
 
 
 def parse_effects(data: str) -> list:
@@ -18,15 +28,51 @@ def parse_effects(data: str) -> list:
 class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    def __init__(self):
+        self.found_hosts: list[str] = []
+        self.discovered_host: str | None = None
+
+    def _configured_hosts(self) -> set[str]:
+        """IP-адреса уже добавленных гирлянд."""
+        return {
+            entry.options.get(CONF_HOST) or entry.data.get(CONF_HOST)
+            for entry in self._async_current_entries()
+        }
+
+    async def _async_abort_if_configured(self, host: str) -> None:
+        """Прерывает flow, если гирлянда с этим адресом уже добавлена.
+
+        Записи, созданные до появления unique_id, проверяются по адресу.
+        """
+        await self.async_set_unique_id(host)
+        self._abort_if_unique_id_configured()
+        if host in self._configured_hosts():
+            raise AbortFlow("already_configured")
+
+    async def _default_network(self) -> str:
+        """Сеть /24 основного интерфейса Home Assistant."""
+        from homeassistant.components.network import async_get_source_ip
+
+        try:
+            source_ip = await async_get_source_ip(self.hass)
+        except Exception:  # noqa
+            return "192.168.1.0/24"
+
+        return str(ipaddress.ip_network(f"{source_ip}/24", strict=False))
+
     async def async_step_user(self, user_input=None):
+        return self.async_show_menu(step_id="user", menu_options=["manual", "scan"])
+
+    async def async_step_manual(self, user_input=None):
         if user_input is not None:
             host = user_input[CONF_HOST]
+            await self._async_abort_if_configured(host)
             user_input[CONF_EFFECTS] = parse_effects(user_input[CONF_EFFECTS])
             return self.async_create_entry(title=host, data=user_input)
 
         effects = ",".join(EFFECTS)
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_HOST): cv.string,
@@ -35,6 +81,73 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
             ),
         )
 
+    async def async_step_scan(self, user_input=None):
+        """Поиск гирлянд перебором адресов сети (без broadcast)."""
+        from .discovery import async_sweep
+
+        errors = {}
+        if user_input is not None:
+            try:
+                found = await async_sweep(user_input[CONF_NETWORK])
+            except ValueError:
+                errors["base"] = "invalid_network"
+            else:
+                configured = self._configured_hosts()
+                self.found_hosts = [host for host in found if host not in configured]
+                if not self.found_hosts:
+                    return self.async_abort(reason="no_devices_found")
+                return await self.async_step_pick()
+
+        network = await self._default_network()
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_NETWORK, default=network): cv.string}
+            ),
+            errors=errors,
+        )
+
+    async def async_step_pick(self, user_input=None):
+        """Выбор одной из найденных гирлянд."""
+        if user_input is not None:
+            host = user_input[CONF_HOST]
+            await self._async_abort_if_configured(host)
+            return self.async_create_entry(
+                title=host, data={CONF_HOST: host, CONF_EFFECTS: list(EFFECTS)}
+            )
+
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOST, default=self.found_hosts[0]): vol.In(
+                        self.found_hosts
+                    )
+                }
+            ),
+        )
+
+    async def async_step_integration_discovery(self, discovery_info):
+        """Гирлянда, найденная фоновым поиском."""
+        host = discovery_info[CONF_HOST]
+        await self._async_abort_if_configured(host)
+
+        self.discovered_host = host
+        self.context["title_placeholders"] = {"host": host}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(self, user_input=None):
+        """Подтверждение добавления найденной гирлянды."""
+        host = self.discovered_host
+        if user_input is not None:
+            return self.async_create_entry(
+                title=host, data={CONF_HOST: host, CONF_EFFECTS: list(EFFECTS)}
+            )
+
+        return self.async_show_form(
+            step_id="discovery_confirm", description_placeholders={"host": host}
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -48,12 +161,18 @@ class OptionsFlowHandler(OptionsFlow):
     async def async_step_init(self, user_input=None):
         host = self.config_entry.options[CONF_HOST]
         effects = ",".join(self.config_entry.options[CONF_EFFECTS])
+        keep_warm = self.config_entry.options.get(CONF_KEEP_WARM, False)
+        prefetch = self.config_entry.options.get(CONF_PREFETCH, False)
+        fleet_poll = self.config_entry.options.get(CONF_FLEET_POLL, False)
         return self.async_show_form(
             step_id="user",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_HOST, default=host): cv.string,
                     vol.Optional(CONF_EFFECTS, default=effects): cv.string,
+                    vol.Optional(CONF_KEEP_WARM, default=keep_warm): cv.boolean,
+                    vol.Optional(CONF_PREFETCH, default=prefetch): cv.boolean,
+                    vol.Optional(CONF_FLEET_POLL, default=fleet_poll): cv.boolean,
                 }
             ),
         )
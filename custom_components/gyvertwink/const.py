@@ -0,0 +1,40 @@
+"""Константы интеграции GyverTwink.
+
+Модуль намеренно не импортирует Home Assistant и платформы, чтобы его можно
+было дешево загружать из config flow и вспомогательных инструментов.
+"""
+
+DOMAIN = "gyvertwink"
+
+# Платформы, которые поднимаются для каждой гирлянды
+PLATFORMS = ["light", "number", "switch", "button"]
+
+CONF_EFFECTS = "effects"
+CONF_KEEP_WARM = "keep_warm"
+CONF_PREFETCH = "prefetch"
+CONF_FLEET_POLL = "fleet_poll"
+
+EFFECTS = [
+    "Party grad",
+    "Raibow grad",
+    "Stripe grad",
+    "Sunset grad",
+    "Pepsi grad",
+    "Warm grad",
+    "Cold grad",
+    "Hot grad",
+    "Pink grad",
+    "Cyber grad",
+    "RedWhite grad",
+    "Party noise",
+    "Raibow noise",
+    "Stripe noise",
+    "Sunset noise",
+    "Pepsi noise",
+    "Warm noise",
+    "Cold noise",
+    "Hot noise",
+    "Pink noise",
+    "Cyber noise",
+    "RedWhite noise",
+]
@@ -1,29 +1,194 @@
 """DataUpdateCoordinator для GyverTwink."""
 import logging
+import threading
+import time
 from datetime import timedelta
-from typing import Any
+from functools import partial
+from typing import Any, Callable, Hashable
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .gyver_twink import GyverTwink as GTwink
+from .const import DOMAIN, EFFECTS
+from .gyver_twink import (
+    GyverTwink as GTwink,
+    TwinkSettings,
+    speed_from_firmware,
+    speed_to_firmware,
+)
+from .policy import (
+    CircuitBreaker,
+    CommandElider,
+    DeviceOffline,
+    EffectPrefetch,
+    KeepWarm,
+)
+from .recorder import TrafficRecorder
+from .tracker import CONFIDENCE_THRESHOLD, EffectTracker
 
 _LOGGER = logging.getLogger(__name__)
 
+UPDATE_INTERVAL = timedelta(seconds=15)
+
+# Настройки, прочитанные не раньше этого срока, не запрашиваются повторно
+SETTINGS_MAX_AGE = 1.0
+
+# Circuit breaker: после FAILURE_THRESHOLD неудачных опросов подряд гирлянда
+# считается недоступной и вместо полного опроса получает только короткие
+# проверочные запросы с экспоненциально растущим интервалом
+FAILURE_THRESHOLD = 3
+PROBE_TIMEOUT = 0.5
+PROBE_INTERVAL_MIN = timedelta(seconds=15)
+PROBE_INTERVAL_MAX = timedelta(minutes=5)
+
+# Не чаще одного сообщения о недоступности гирлянды за этот интервал
+OFFLINE_LOG_INTERVAL = 300
+
+# Keep-warm: короткие проверочные запросы между опросами, чтобы радиомодуль
+# гирлянды не засыпал перед командами пользователя. Если гирлянда выключена
+# или команд не было INTERACTION_WINDOW секунд, интервал увеличивается
+INTERACTION_WINDOW = 600
+KEEP_WARM_RELAXED_FACTOR = 4
+
+# Предзагрузка параметров эффектов: пока гирлянда выключена, эффекты
+# выбираются по очереди и их параметры сохраняются. Повторный обход - не чаще
+# PREFETCH_INTERVAL, повтор после неудачи - не раньше PREFETCH_RETRY секунд
+PREFETCH_INTERVAL = 12 * 3600
+PREFETCH_RETRY = 300
+
+EFFECTS_STORAGE_VERSION = 1
+EFFECTS_SAVE_DELAY = 10
+
+# Подбор паузы между пакетами (GyverTwink.tune_pacing): при первом запуске и
+# после устойчивых потерь, если гирляндой не управляли TUNE_IDLE секунд.
+# Повтор после неудачи или остановки - не раньше TUNE_RETRY секунд
+TUNE_IDLE = 60
+TUNE_RETRY = 600
+
+PACING_STORAGE_VERSION = 1
+
+# Пропуск повторных команд: установка параметра не отправляется, если
+# гирлянда уже в этом состоянии по данным не старше ELISION_FRESHNESS секунд
+# (опрос или последняя отправленная команда, смотря что новее)
+ELISION_FRESHNESS = 30
+
+# Параметры из get_settings, которые задаются отдельной командой:
+# ключ данных -> метод клиента
+SETTERS = {
+    "power": "set_power",
+    "brightness": "set_brightness",
+    "auto_change": "set_auto_change",
+    "random_change": "set_random_change",
+    "change_period": "set_change_period",
+    "timer_active": "set_timer",
+    "timer_value": "set_timer_value",
+}
+
+# Команды GT 2 <ключ> <значение> протокола -> ключ данных
+FRAME_SETTINGS = {
+    1: "power",
+    2: "brightness",
+    3: "auto_change",
+    4: "random_change",
+    5: "change_period",
+    7: "timer_active",
+    8: "timer_value",
+}
+BOOL_SETTINGS = {"power", "auto_change", "random_change", "timer_active"}
+
 
 class GyverTwinkCoordinator(DataUpdateCoordinator):
     """Координатор обновлений для GyverTwink.
-    
+
     Делает один запрос к устройству и распределяет данные между всеми entities.
     Это предотвращает множественные одновременные запросы и таймауты.
     """
 
-    def __init__(self, hass: HomeAssistant, host: str, entry_id: str) -> None:
-        """Инициализация координатора."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        entry_id: str,
+        effect_list: list[str] | None = None,
+        keep_warm: bool = False,
+        prefetch: bool = False,
+        fleet: bool = False,
+        name: str | None = None,
+    ) -> None:
+        """Инициализация координатора.
+
+        :param name: Имя устройства (заголовок записи интеграции).
+        """
         self.host = host
         self.entry_id = entry_id
-        self.twink = GTwink(host)
-        
+        # Без stale-while-revalidate: coordinator нужны данные не старше опроса
+        self.twink = GTwink(host, settings_ttl=SETTINGS_MAX_AGE, settings_stale=0)
+        self.effect_list = effect_list or EFFECTS
+
+        # Одно описание устройства на все entities гирлянды
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
+            manufacturer="@AlexGyver",
+            model="GyverTwink",
+            name=name or "Gyver Twink",
+        )
+
+        # Текущий эффект и известные параметры эффектов (favorite, scale, speed).
+        # get_settings их не возвращает, поэтому эффект оценивается по
+        # отправленным командам и настройкам автосмены, а параметры
+        # запоминаются по ответам select_effect и сохраняются в хранилище
+        self.tracker = EffectTracker()
+        self.effects: dict[int, dict[str, Any]] = {}
+        self._effects_store = Store(
+            hass, EFFECTS_STORAGE_VERSION, f"{DOMAIN}.effects.{entry_id}"
+        )
+
+        # Предзагрузка параметров эффектов
+        self.prefetch = prefetch
+        self.prefetcher = EffectPrefetch(self.twink, PREFETCH_INTERVAL, PREFETCH_RETRY)
+        self._prefetch_task = None
+
+        # Пауза между пакетами, подобранная для этой гирлянды
+        self._pacing_store = Store(
+            hass, PACING_STORAGE_VERSION, f"{DOMAIN}.pacing.{entry_id}"
+        )
+        self._tune_attempt = 0.0
+        self._tune_cancel = threading.Event()
+        self._tune_task = None
+
+        # Пропуск повторных команд и счетчики команд
+        self.elider = CommandElider(ELISION_FRESHNESS)
+        self.commands_sent = 0
+        self.commands_elided = 0
+
+        # Circuit breaker
+        self.breaker = CircuitBreaker(
+            FAILURE_THRESHOLD, PROBE_INTERVAL_MIN, PROBE_INTERVAL_MAX
+        )
+        self._last_offline_log = 0.0
+
+        # Keep-warm
+        self.keep_warm = keep_warm
+        self.warmer = KeepWarm(
+            self.twink,
+            UPDATE_INTERVAL.total_seconds(),
+            INTERACTION_WINDOW,
+            KEEP_WARM_RELAXED_FACTOR,
+        )
+        # Отсчет простоя - с настройки, чтобы подбор паузы не начинался сразу
+        self.last_interaction = time.monotonic()
+        self._keep_warm_unsub: CALLBACK_TYPE | None = None
+
+        # Опрос общим broadcast-запросом (fleet.GyverTwinkFleet): собственный
+        # опрос отключен, координатор получает ответы от fleet
+        self.fleet = fleet
+        self.fleet_replies = 0
+        self.fleet_misses = 0
+
         # Интервал опроса - можно настроить от 5 до 60 секунд
         # Рекомендуется: 10-15 секунд для быстрого отклика
         # По умолчанию: 15 секунд (баланс между скоростью и нагрузкой)
@@ -31,89 +196,634 @@ class GyverTwinkCoordinator(DataUpdateCoordinator):
             hass,
             _LOGGER,
             name=f"GyverTwink {host}",
-            update_interval=timedelta(seconds=15),
+            update_interval=self._poll_interval,
         )
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    @property
+    def _poll_interval(self) -> timedelta | None:
+        """Интервал собственного опроса доступного устройства."""
+        return None if self.fleet else UPDATE_INTERVAL
+
+    def _log_offline(self, message: str) -> None:
+        """Логирование недоступности устройства с ограничением частоты."""
+        now = time.monotonic()
+        if now - self._last_offline_log >= OFFLINE_LOG_INTERVAL:
+            self._last_offline_log = now
+            _LOGGER.warning(f"{self.host} | {message}")
+        else:
+            _LOGGER.debug(f"{self.host} | {message}")
+
+    @property
+    def circuit_open(self) -> bool:
+        """Считается ли устройство недоступным (circuit breaker открыт)."""
+        return self.breaker.open
+
+    @property
+    def failures(self) -> int:
+        """Количество неудачных опросов подряд."""
+        return self.breaker.failures
+
+    def _circuit_changed(self, was_open: bool) -> None:
+        """Интервал опроса и журнал после смены состояния circuit breaker."""
+        if self.breaker.open == was_open:
+            return
+        if self.breaker.open:
+            self.update_interval = self.breaker.probe_interval
+            self._log_offline(
+                f"Device is offline after {self.failures} failed polls, "
+                f"switching to probes every {self.breaker.probe_interval.seconds} s"
+            )
+        else:
+            _LOGGER.info(f"{self.host} | Device is back online")
+            self._last_offline_log = 0.0
+            self.update_interval = self._poll_interval
+
+    async def async_ping(self) -> bool:
+        """Короткий запрос поиска: будит радиомодуль и уточняет оценку RTT.
+
+        Недоступное устройство не опрашивается сверх проверочных запросов.
+        """
+        if self.circuit_open:
+            return False
+        return await self._async_probe()
+
+    async def _async_probe(self) -> bool:
+        """Проверочный запрос к устройству."""
+        return await self.hass.async_add_executor_job(self.twink.ping, PROBE_TIMEOUT)
+
+    async def _async_read_settings(self) -> TwinkSettings:
+        # Выполняем запрос в executor thread (блокирующая операция)
+        data = await self.hass.async_add_executor_job(self.twink.read_settings)
+        if data is None:
+            raise UpdateFailed("Device returned no data")
+        return data
+
+    async def _async_update_data(self) -> TwinkSettings:
         """Получение данных от устройства.
-        
+
         Этот метод вызывается автоматически каждые 15 секунд.
         Все entities получат эти данные без дополнительных запросов.
+        Для недоступного устройства сначала выполняется короткая проверка
+        (см. `policy.CircuitBreaker`).
         """
+        was_open = self.breaker.open
         try:
-            # Выполняем запрос в executor thread (блокирующая операция)
-            data = await self.hass.async_add_executor_job(self.twink.get_settings)
-            
-            if data is None:
-                raise UpdateFailed("Device returned no data")
-            
-            _LOGGER.debug(f"{self.host} | Coordinator update: {data}")
-            return data
-            
+            data = await self.breaker.async_call(
+                self._async_read_settings, self._async_probe
+            )
+        except DeviceOffline as err:
+            self.update_interval = self.breaker.probe_interval
+            self._log_offline(
+                "Device is still offline, next probe in "
+                f"{self.breaker.probe_interval.seconds} s"
+            )
+            raise UpdateFailed("Device is offline") from err
         except Exception as err:
-            _LOGGER.error(f"{self.host} | Error fetching data: {err}")
+            self._circuit_changed(was_open)
+            if not self.breaker.open:
+                _LOGGER.debug(f"{self.host} | Error fetching data: {err}")
             raise UpdateFailed(f"Error communicating with device: {err}")
 
-    async def async_set_power(self, state: bool) -> None:
+        self._circuit_changed(was_open)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(f"{self.host} | Coordinator update: {data}")
+        self._polled(data)
+        return data
+
+    def _polled(self, data: TwinkSettings) -> None:
+        """Учитывает успешно прочитанные настройки."""
+        self.elider.polled(data, time.monotonic())
+        self._check_effect(data)
+        self._check_prefetch(data)
+        self._check_tuning()
+
+    @callback
+    def async_set_fleet_data(self, data: bytes) -> None:
+        """Настройки из ответа на broadcast-запрос fleet."""
+        settings = self.twink.feed_settings(data)
+        was_open = self.breaker.open
+        self.breaker.succeeded()
+        self._circuit_changed(was_open)
+        self.fleet_replies += 1
+        self._polled(settings)
+        self.async_set_updated_data(settings)
+
+    @callback
+    def async_start_keep_warm(self) -> None:
+        """Запускает keep-warm, если он включен в настройках."""
+        if self.keep_warm and self._keep_warm_unsub is None:
+            self._schedule_keep_warm()
+
+    @property
+    def _powered(self) -> bool:
+        """Включена ли гирлянда по последнему опросу."""
+        return bool((self.data or {}).get("power"))
+
+    def keep_warm_interval(self) -> float:
+        """Интервал keep-warm, выученный по замерам RTT."""
+        return self.warmer.interval(time.monotonic(), self.last_interaction, self._powered)
+
+    def _schedule_keep_warm(self) -> None:
+        delay = self.warmer.delay(time.monotonic(), self.last_interaction, self._powered)
+        self._keep_warm_unsub = async_call_later(self.hass, delay, self._async_keep_warm)
+
+    async def _async_keep_warm(self, _now) -> None:
+        self._keep_warm_unsub = None
+        if self.warmer.due(
+            time.monotonic(), self.last_interaction, self._powered, self.circuit_open
+        ):
+            await self.hass.async_add_executor_job(self.twink.ping, PROBE_TIMEOUT)
+
+        self._schedule_keep_warm()
+
+    async def async_shutdown(self) -> None:
+        """Остановка coordinator, keep-warm и предзагрузки эффектов."""
+        if self._keep_warm_unsub:
+            self._keep_warm_unsub()
+            self._keep_warm_unsub = None
+        self.prefetcher.cancel.set()
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+        self._tune_cancel.set()
+        if self._tune_task is not None:
+            self._tune_task.cancel()
+        await self.async_set_recording(False)
+        await super().async_shutdown()
+
+    @property
+    def recording(self) -> str | None:
+        """Путь к журналу трафика, если запись включена."""
+        recorder = self.twink.recorder
+        return recorder.path if recorder is not None else None
+
+    async def async_set_recording(self, enabled: bool) -> str | None:
+        """Включает или отключает журнал трафика клиента гирлянды.
+
+        Журнал пишется в файл gyvertwink_<host>.log в каталоге конфигурации
+        и воспроизводится сервисом replay_traffic или модулем recorder.
+
+        :return: Путь к журналу, если запись включена.
+        """
+        if enabled and self.twink.recorder is None:
+            path = self.hass.config.path(f"{DOMAIN}_{self.host}.log")
+            # Открытие файла блокирует, поэтому в executor
+            self.twink.recorder = await self.hass.async_add_executor_job(
+                TrafficRecorder, path
+            )
+            _LOGGER.debug(f"{self.host} | Traffic recording to {path}")
+        elif not enabled and self.twink.recorder is not None:
+            recorder, self.twink.recorder = self.twink.recorder, None
+            await self.hass.async_add_executor_job(recorder.close)
+            _LOGGER.debug(f"{self.host} | Traffic recording stopped")
+        return self.recording
+
+    async def _async_command(
+        self, func: Callable[..., Any], *args: Any, refresh: bool = True
+    ) -> Any:
+        """Выполнение команды устройства.
+
+        Пока устройство недоступно, команда сразу завершается ошибкой
+        без обращения к сети.
+        """
+        if self.circuit_open:
+            self._log_offline(f"Command {func.__name__} rejected, device is offline")
+            raise HomeAssistantError(f"GyverTwink {self.host} is offline")
+
+        self.last_interaction = time.monotonic()
+        self.commands_sent += 1
+        # Команда пользователя останавливает обход эффектов и подбор паузы
+        self.prefetcher.cancel.set()
+        self._tune_cancel.set()
+        result = await self.hass.async_add_executor_job(func, *args)
+        if refresh:
+            await self.async_request_refresh()
+        return result
+
+    def _elision_key(self, key: str) -> Hashable | None:
+        """Ключ параметра для пропуска повторных команд.
+
+        Параметры эффекта относятся к текущему эффекту: после его смены
+        (в том числе автосменой) прежнее значение не действует.
+        """
+        if key not in ("scale", "speed"):
+            return key
+        effect = self.current_effect
+        return None if effect is None else (key, effect)
+
+    async def _async_set(
+        self, key: str, func: Callable[..., Any], value: Any, refresh: bool = True
+    ) -> bool:
+        """Установка параметра, если гирлянда еще не в этом состоянии.
+
+        :return: Была ли отправлена команда.
+        """
+        elision_key = self._elision_key(key)
+        if elision_key is not None and self.elider.is_current(
+            elision_key, value, time.monotonic()
+        ):
+            self.commands_elided += 1
+            _LOGGER.debug(f"{self.host} | Command {func.__name__}({value}) elided")
+            return False
+
+        await self._async_command(func, value, refresh=refresh)
+        elision_key = self._elision_key(key)
+        if elision_key is not None:
+            self.elider.sent(elision_key, value, time.monotonic())
+        return True
+
+    async def async_set_power(self, state: bool) -> bool:
         """Установка питания с немедленным обновлением данных."""
-        await self.hass.async_add_executor_job(self.twink.set_power, state)
-        await self.async_request_refresh()
+        return await self._async_set("power", self.twink.set_power, state)
 
-    async def async_set_brightness(self, value: int) -> None:
+    async def async_set_brightness(self, value: int) -> bool:
         """Установка яркости с немедленным обновлением данных."""
-        await self.hass.async_add_executor_job(self.twink.set_brightness, value)
-        await self.async_request_refresh()
+        return await self._async_set("brightness", self.twink.set_brightness, value)
 
-    async def async_select_effect(self, effect_id: int) -> dict | None:
+    async def async_select_effect(
+        self, effect_id: int, refresh: bool = True
+    ) -> dict | None:
         """Выбор эффекта и получение его параметров."""
-        result = await self.hass.async_add_executor_job(
-            self.twink.select_effect, effect_id
+        result = await self._async_command(
+            self.twink.select_effect, effect_id, refresh=refresh
         )
-        await self.async_request_refresh()
+        self.current_effect = effect_id
+        if result:
+            self.effects[effect_id] = result
+            self._effects_changed()
+            now = time.monotonic()
+            for key in ("scale", "speed"):
+                self.elider.sent((key, effect_id), result.get(key), now)
         return result
 
-    async def async_set_auto_change(self, state: bool) -> None:
+    @property
+    def current_effect(self) -> int | None:
+        """Текущий эффект, если уверенность в оценке не ниже порога."""
+        effect, confidence = self.tracker.predict(time.monotonic(), self._favorites())
+        if confidence < CONFIDENCE_THRESHOLD:
+            return None
+        return effect
+
+    @current_effect.setter
+    def current_effect(self, effect_id: int | None) -> None:
+        if effect_id is None:
+            self.tracker.lost()
+        else:
+            self.tracker.selected(effect_id, time.monotonic())
+
+    @property
+    def effect_confidence(self) -> float:
+        """Уверенность в оценке текущего эффекта (0-1)."""
+        return self.tracker.predict(time.monotonic(), self._favorites())[1]
+
+    def _favorites(self) -> list[bool]:
+        """Флаги избранных эффектов; неизвестный флаг считается установленным."""
+        return [
+            self.effects.get(effect_id, {}).get("favorite", True)
+            for effect_id in range(len(self.effect_list))
+        ]
+
+    def _check_effect(self, data: TwinkSettings) -> None:
+        """Обновляет модель автосмены по прочитанным настройкам.
+
+        Номер эффекта гирлянда не сообщает, а выбор эффекта - команда, которая
+        сбрасывает таймер автосмены. Поэтому при низкой уверенности эффект
+        только считается неизвестным, команды гирлянде не отправляются.
+        """
+        self.tracker.update_settings(
+            data.get("auto_change"),
+            data.get("random_change"),
+            data.get("change_period"),
+            time.monotonic(),
+            self._favorites(),
+        )
+
+    def effect_param(self, key: str) -> Any:
+        """Известное значение параметра текущего эффекта или None."""
+        if self.current_effect is None:
+            return None
+        return self.effects.get(self.current_effect, {}).get(key)
+
+    def _set_effect_param(self, key: str, value: Any) -> None:
+        """Запоминает отправленный параметр текущего эффекта."""
+        if self.current_effect is not None and self.current_effect in self.effects:
+            self.effects[self.current_effect][key] = value
+            self._effects_changed()
+
+    async def async_load_effects(self) -> None:
+        """Загружает сохраненные параметры эффектов."""
+        stored = await self._effects_store.async_load()
+        if stored:
+            self.effects = {int(key): value for key, value in stored["effects"].items()}
+            self.prefetcher.prefetched = stored.get("prefetched", 0.0)
+
+    @callback
+    def _effects_changed(self) -> None:
+        """Планирует сохранение параметров эффектов."""
+        self._effects_store.async_delay_save(self._effects_to_save, EFFECTS_SAVE_DELAY)
+
+    @callback
+    def _effects_to_save(self) -> dict[str, Any]:
+        return {
+            "effects": {str(key): value for key, value in self.effects.items()},
+            "prefetched": self.prefetcher.prefetched,
+        }
+
+    @property
+    def effects_complete(self) -> bool:
+        """Известны ли параметры всех эффектов списка."""
+        return all(
+            "scale" in self.effects.get(effect_id, {})
+            for effect_id in range(len(self.effect_list))
+        )
+
+    def _check_prefetch(self, data: TwinkSettings) -> None:
+        """Запускает обход эффектов, если гирлянда выключена и он нужен."""
+        if not self.prefetcher.should_start(
+            bool(data.get("power")),
+            not self.prefetch
+            or self._prefetch_task is not None
+            or self._tune_task is not None,
+            self.current_effect,
+            self.effects_complete,
+            time.monotonic(),
+            time.time(),
+        ):
+            return
+
+        self._prefetch_task = self.hass.async_create_background_task(
+            self._async_prefetch(), f"{DOMAIN} prefetch {self.host}"
+        )
+
+    async def _async_prefetch(self) -> None:
+        """Обходит все эффекты и восстанавливает выбранный эффект."""
+        try:
+            effects, restore = await self.prefetcher.async_run(
+                len(self.effect_list),
+                lambda: self.current_effect,
+                self.hass.async_add_executor_job,
+            )
+            self.effects.update(effects)
+            self._effects_changed()
+            self.async_update_listeners()
+            _LOGGER.debug(
+                f"{self.host} | Prefetched {len(effects)} effects, restored {restore}"
+            )
+        except Exception as err:  # noqa
+            _LOGGER.debug(f"{self.host} | Effect prefetch failed: {err}")
+        finally:
+            self._prefetch_task = None
+
+    async def async_load_pacing(self) -> None:
+        """Загружает подобранную паузу между пакетами."""
+        stored = await self._pacing_store.async_load()
+        if stored:
+            self.twink.pacer.learned(stored["gap"])
+
+    def _check_tuning(self) -> None:
+        """Запускает подбор паузы, если ее еще не подбирали или есть потери."""
+        pacer = self.twink.pacer
+        if pacer.tuned and not pacer.needs_tuning:
+            return
+        now = time.monotonic()
+        if (
+            self._tune_task is not None
+            or self._prefetch_task is not None
+            or now - self.last_interaction < TUNE_IDLE
+            or now - self._tune_attempt < TUNE_RETRY
+        ):
+            return
+
+        self._tune_cancel.clear()
+        self._tune_attempt = now
+        self._tune_task = self.hass.async_create_background_task(
+            self._async_tune(), f"{DOMAIN} pacing {self.host}"
+        )
+
+    async def _async_tune(self) -> None:
+        """Подбирает и сохраняет паузу между пакетами."""
+        try:
+            result = await self.hass.async_add_executor_job(
+                partial(self.twink.tune_pacing, cancel=self._tune_cancel)
+            )
+            _LOGGER.debug(f"{self.host} | Pacing tuning: {result}")
+            if not result["cancelled"]:
+                await self._pacing_store.async_save({"gap": self.twink.pacer.gap})
+        except Exception as err:  # noqa
+            _LOGGER.debug(f"{self.host} | Pacing tuning failed: {err}")
+        finally:
+            self._tune_task = None
+
+    async def async_set_auto_change(self, state: bool) -> bool:
         """Установка автосмены эффектов."""
-        await self.hass.async_add_executor_job(self.twink.set_auto_change, state)
-        await self.async_request_refresh()
+        return await self._async_set("auto_change", self.twink.set_auto_change, state)
 
-    async def async_set_random_change(self, state: bool) -> None:
+    async def async_set_random_change(self, state: bool) -> bool:
         """Установка случайной смены эффектов."""
-        await self.hass.async_add_executor_job(self.twink.set_random_change, state)
-        await self.async_request_refresh()
+        return await self._async_set("random_change", self.twink.set_random_change, state)
 
-    async def async_set_change_period(self, value: int) -> None:
+    async def async_set_change_period(self, value: int) -> bool:
         """Установка периода смены эффектов."""
-        await self.hass.async_add_executor_job(self.twink.set_change_period, value)
-        await self.async_request_refresh()
+        return await self._async_set("change_period", self.twink.set_change_period, value)
 
-    async def async_set_timer(self, state: bool) -> None:
+    async def async_set_timer(self, state: bool) -> bool:
         """Установка таймера выключения."""
-        await self.hass.async_add_executor_job(self.twink.set_timer, state)
-        await self.async_request_refresh()
+        return await self._async_set("timer_active", self.twink.set_timer, state)
 
-    async def async_set_timer_value(self, value: int) -> None:
+    async def async_set_timer_value(self, value: int) -> bool:
         """Установка времени таймера."""
-        await self.hass.async_add_executor_job(self.twink.set_timer_value, value)
-        await self.async_request_refresh()
+        return await self._async_set("timer_value", self.twink.set_timer_value, value)
 
-    async def async_set_leds(self, count: int) -> None:
+    async def async_set_leds(self, count: int) -> bool:
         """Установка количества светодиодов."""
-        await self.hass.async_add_executor_job(self.twink.set_leds, count)
-        await self.async_request_refresh()
+        return await self._async_set("leds", self.twink.set_leds, count)
 
-    async def async_set_speed(self, value: int) -> None:
+    async def async_set_speed(self, value: int) -> bool:
         """Установка скорости эффекта."""
-        await self.hass.async_add_executor_job(self.twink.set_speed, value)
+        value = max(1, min(255, value))
         # Не обновляем данные, т.к. speed не возвращается в get_settings
+        if not await self._async_set("speed", self.twink.set_speed, value, refresh=False):
+            return False
+        self._set_effect_param("speed", value)
+        return True
 
-    async def async_set_scale(self, value: int) -> None:
+    def firmware_speed(self, speed: int | None, direction: bool | None) -> int:
+        """Скорость в формате прошивки из скорости 0-127 и направления.
+
+        Не заданные скорость или направление берутся из текущего эффекта
+        (по умолчанию скорость 64, прямое направление).
+        """
+        current = self.effect_param("speed")
+        current_speed, current_direction = (
+            speed_from_firmware(current) if current not in (None, 128) else (64, False)
+        )
+        return speed_to_firmware(
+            current_speed if speed is None else speed,
+            current_direction if direction is None else direction,
+        )
+
+    async def async_set_scale(self, value: int) -> bool:
         """Установка масштаба эффекта."""
-        await self.hass.async_add_executor_job(self.twink.set_scale, value)
+        value = max(1, min(255, value))
         # Не обновляем данные, т.к. scale не возвращается в get_settings
+        if not await self._async_set("scale", self.twink.set_scale, value, refresh=False):
+            return False
+        self._set_effect_param("scale", value)
+        return True
 
     async def async_next_effect(self) -> None:
         """Переключение на следующий эффект."""
-        await self.hass.async_add_executor_job(self.twink.next_effect)
-        # Не обновляем данные, т.к. текущий эффект не возвращается в get_settings
+        # Не обновляем данные, т.к. текущий эффект не возвращается в get_settings.
+        # Команда не идемпотентна и отправляется всегда
+        await self._async_command(self.twink.next_effect, refresh=False)
+        self.tracker.next_effect(time.monotonic(), self._favorites())
+
+    async def async_set_favorites(self, favorites: list[str]) -> int:
+        """Приводит набор избранных эффектов к заданному.
+
+        Меняются только эффекты, флаг которых отличается от известного
+        (неизвестные флаги устанавливаются всегда). Команды отправляются
+        одним проходом, в конце выбирается исходный эффект, если он известен.
+
+        :param favorites: Имена избранных эффектов, остальные - не избранные.
+
+        :return: Количество отправленных команд.
+        """
+        unknown = [name for name in favorites if name not in self.effect_list]
+        if unknown:
+            raise HomeAssistantError(f"Unknown effects: {', '.join(unknown)}")
+
+        flags = {}
+        for effect_id, name in enumerate(self.effect_list):
+            flag = name in favorites
+            if self.effects.get(effect_id, {}).get("favorite") != flag:
+                flags[effect_id] = flag
+        if not flags:
+            return 0
+
+        restore = self.current_effect
+        effects, restored = await self._async_command(
+            self.twink.set_favorites, flags, restore, refresh=False
+        )
+
+        for (effect_id, flag), params in zip(flags.items(), effects):
+            params = params or self.effects.get(effect_id, {})
+            self.effects[effect_id] = {**params, "favorite": flag}
+
+        if restore is None:
+            # Исходный эффект неизвестен: активен последний измененный
+            self.current_effect = list(flags)[-1]
+        elif restored:
+            self.effects[restore] = restored
+
+        self._effects_changed()
+        self.async_update_listeners()
+        return len(flags) * 2 + (restore is not None)
+
+    async def async_apply(self, target: dict[str, Any]) -> int:
+        """Приводит устройство к целевому состоянию минимальным набором команд.
+
+        Отправляются только команды, значения которых отличаются от свежего
+        известного состояния устройства. Данные обновляются один раз в конце.
+
+        :param target: Целевое состояние: ключи get_settings, а также
+            effect (имя эффекта), scale, speed (0-127) и direction
+            (см. `firmware_speed`).
+
+        :return: Количество отправленных команд.
+        """
+        sent = 0
+        refresh = False
+
+        # Включаем до остальных команд, выключаем после них
+        power = target.get("power")
+        if power and await self._async_set("power", self.twink.set_power, True, refresh=False):
+            sent += 1
+            refresh = True
+
+        for key, setter in SETTERS.items():
+            if key == "power" or key not in target:
+                continue
+            func = getattr(self.twink, setter)
+            if await self._async_set(key, func, target[key], refresh=False):
+                sent += 1
+                refresh = True
+
+        effect = target.get("effect")
+        if effect is not None:
+            if effect not in self.effect_list:
+                raise HomeAssistantError(f"Unknown effect: {effect}")
+            effect_id = self.effect_list.index(effect)
+            if self.current_effect != effect_id:
+                await self.async_select_effect(effect_id, refresh=False)
+                sent += 1
+
+        scale = target.get("scale")
+        if scale is not None and await self.async_set_scale(scale):
+            sent += 1
+
+        speed = target.get("speed")
+        direction = target.get("direction")
+        if speed is not None or direction is not None:
+            if await self.async_set_speed(self.firmware_speed(speed, direction)):
+                sent += 1
+
+        if power is False and await self._async_set(
+            "power", self.twink.set_power, False, refresh=False
+        ):
+            sent += 1
+            refresh = True
+
+        if refresh:
+            await self.async_request_refresh()
+        else:
+            self.async_update_listeners()
+
+        return sent
+
+    async def async_send_frame(self, frame: bytes) -> bool:
+        """Выполняет пакет протокола соответствующей командой coordinator.
+
+        Записанный трафик проходит через circuit breaker, пропуск повторных
+        команд и оценку текущего эффекта так же, как команды entities.
+        Данные не обновляются, вызывающий обновляет их в конце.
+
+        :return: Была ли отправлена команда (False - пропущена как повторная).
+        """
+        if len(frame) < 3 or frame[:2] != b"GT":
+            raise ValueError(f"Not a GyverTwink frame: {frame.hex(' ')}")
+
+        command, args = frame[2], frame[3:]
+        if command == 1:
+            await self.async_refresh()
+            return True
+
+        if command == 2 and args:
+            key = args[0]
+            if key == 0 and len(args) >= 3:
+                return await self._async_set(
+                    "leds", self.twink.set_leds, args[1] * 100 + args[2], refresh=False
+                )
+            if key == 6:
+                await self.async_next_effect()
+                return True
+            if key in FRAME_SETTINGS and len(args) >= 2:
+                name = FRAME_SETTINGS[key]
+                value = bool(args[1]) if name in BOOL_SETTINGS else args[1]
+                func = getattr(self.twink, SETTERS[name])
+                return await self._async_set(name, func, value, refresh=False)
+
+        if command == 4 and len(args) >= 2:
+            key, value = args[0], args[1]
+            if key == 0 and value < len(self.effect_list):
+                await self.async_select_effect(value, refresh=False)
+                return True
+            if key == 1:
+                await self._async_command(self.twink.set_favorite, bool(value), refresh=False)
+                self._set_effect_param("favorite", bool(value))
+                return True
+            if key == 2:
+                return await self.async_set_scale(value)
+            if key == 3:
+                return await self.async_set_speed(value)
 
+        raise ValueError(f"Unsupported frame: {frame.hex(' ')}")
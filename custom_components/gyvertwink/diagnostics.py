@@ -0,0 +1,68 @@
+"""Диагностика GyverTwink: состояние связи и замеры задержек."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+def _ms(value: float | None) -> float | None:
+    return None if value is None else round(value * 1000, 2)
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Диагностика config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    twink = coordinator.twink
+
+    return {
+        "host": coordinator.host,
+        "data": dict(coordinator.data or {}),
+        "circuit_open": coordinator.circuit_open,
+        "failures": coordinator.failures,
+        "rtt": {
+            "srtt_ms": _ms(twink.rtt.srtt),
+            "rttvar_ms": _ms(twink.rtt.rttvar),
+            "p95_ms": _ms(twink.rtt.p95),
+            "timeout_ms": _ms(twink.rtt.timeout),
+        },
+        "commands": {
+            "sent": coordinator.commands_sent,
+            "elided": coordinator.commands_elided,
+        },
+        "pacing": {
+            "gap_ms": _ms(twink.pacer.gap),
+            "tuned": twink.pacer.tuned,
+            "needs_tuning": twink.pacer.needs_tuning,
+            "loss": round(twink.pacer.loss, 3),
+        },
+        "keep_warm": {
+            "enabled": coordinator.keep_warm,
+            "interval_s": round(coordinator.keep_warm_interval(), 2),
+            "warm_rtt_ms": _ms(twink.warmth.warm_rtt),
+            "first_packet_rtt_ms": _ms(twink.warmth.first_packet_rtt),
+        },
+        "effects": {
+            "known": len(coordinator.effects),
+            "complete": coordinator.effects_complete,
+            "prefetch": coordinator.prefetch,
+            "prefetched": coordinator.prefetcher.prefetched or None,
+        },
+        "recording": coordinator.recording,
+        "fleet": {
+            "enabled": coordinator.fleet,
+            "replies": coordinator.fleet_replies,
+            "unicast_follow_ups": coordinator.fleet_misses,
+        },
+        "effect_tracker": {
+            "current": coordinator.current_effect,
+            "confidence": round(coordinator.effect_confidence, 3),
+            "auto_change": coordinator.tracker.auto_change,
+            "random_change": coordinator.tracker.random_change,
+        },
+    }
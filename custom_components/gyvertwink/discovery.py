@@ -0,0 +1,251 @@
+"""Асинхронный поиск гирлянд GyverTwink в сети.
+
+Модуль не зависит от Home Assistant и работает поверх asyncio, поэтому
+используется и из config flow, и из вспомогательных инструментов.
+"""
+import asyncio
+import ipaddress
+import logging
+import socket
+
+_LOGGER = logging.getLogger(__name__)
+
+PORT = 8888
+
+# {0} - запрос поиска, гирлянда отвечает последним октетом своего IP
+DISCOVERY_REQUEST = bytes([ord("G"), ord("T"), 0])
+
+# {1} - запрос настроек, адреса в нем нет, поэтому на broadcast отвечают все
+SETTINGS_REQUEST = bytes([ord("G"), ord("T"), 1])
+# Ответ: GT 1 и 9 байт настроек
+SETTINGS_REPLY_SIZE = 12
+
+# Не сканируем сети больше /22, чтобы случайно не отправить тысячи пакетов
+MAX_SWEEP_HOSTS = 1024
+
+# Фоновый поиск: интервал удваивается, пока новых гирлянд нет
+BACKGROUND_MIN_INTERVAL = 300
+BACKGROUND_MAX_INTERVAL = 3600
+
+
+class DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Принимает ответы гирлянд на запрос поиска."""
+
+    def __init__(self) -> None:
+        self.found: set[str] = set()
+        self.waiters: dict[str, asyncio.Future] = {}
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if not data.startswith(b"GT"):
+            return
+
+        host = addr[0]
+        self.found.add(host)
+
+        waiter = self.waiters.pop(host, None)
+        if waiter and not waiter.done():
+            waiter.set_result(True)
+
+    def error_received(self, exc: Exception) -> None:
+        # ICMP "port unreachable" от адресов без гирлянды - не ошибка поиска
+        _LOGGER.debug(f"Discovery socket error: {exc}")
+
+
+async def async_sweep(
+    network: str,
+    timeout: float = 0.5,
+    limit: int = 256,
+    port: int = PORT,
+) -> list[str]:
+    """
+    Поиск гирлянд перебором адресов сети без broadcast.
+
+    Запрос поиска отправляется на каждый адрес сети отдельным unicast-пакетом.
+    Одновременно ожидается не больше `limit` ответов, поэтому сеть /24
+    сканируется примерно за одно окно `timeout`.
+
+    :param network: Сеть в формате CIDR, например "192.168.1.0/24".
+    :param timeout: Время ожидания ответа от каждого адреса.
+    :param limit: Максимальное количество одновременных запросов.
+    :param port: UDP-порт гирлянд.
+
+    :return: Отсортированный список IP-адресов ответивших гирлянд.
+    """
+    net = ipaddress.ip_network(network, strict=False)
+    if net.version != 4:
+        raise ValueError("Only IPv4 networks are supported")
+    if net.num_addresses > MAX_SWEEP_HOSTS:
+        raise ValueError(f"Network {net} is too large to sweep")
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        DiscoveryProtocol, family=socket.AF_INET
+    )
+    semaphore = asyncio.Semaphore(limit)
+
+    async def probe(host: str) -> None:
+        async with semaphore:
+            waiter = loop.create_future()
+            protocol.waiters[host] = waiter
+            try:
+                transport.sendto(DISCOVERY_REQUEST, (host, port))
+                await asyncio.wait_for(waiter, timeout)
+            except (asyncio.TimeoutError, OSError):
+                pass
+            finally:
+                protocol.waiters.pop(host, None)
+
+    try:
+        hosts = [str(host) for host in net.hosts()] or [str(net.network_address)]
+        await asyncio.gather(*(probe(host) for host in hosts))
+    finally:
+        transport.close()
+
+    return sorted(protocol.found, key=ipaddress.ip_address)
+
+
+async def async_broadcast(
+    addresses,
+    timeout: float = 1.0,
+    port: int = PORT,
+) -> set[str]:
+    """
+    Поиск гирлянд одним broadcast-запросом на каждый адрес.
+
+    Все запросы отправляются из одного сокета, ответы принимаются в течение
+    `timeout` без блокировки event loop.
+
+    :param addresses: Broadcast-адреса интерфейсов, например "192.168.1.255".
+    :param timeout: Время ожидания ответов.
+    :param port: UDP-порт гирлянд.
+
+    :return: IP-адреса ответивших гирлянд.
+    """
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        DiscoveryProtocol, family=socket.AF_INET, allow_broadcast=True
+    )
+    try:
+        for address in addresses:
+            try:
+                transport.sendto(DISCOVERY_REQUEST, (str(address), port))
+            except OSError as err:
+                _LOGGER.debug(f"Broadcast to {address} failed: {err}")
+        await asyncio.sleep(timeout)
+    finally:
+        transport.close()
+
+    return protocol.found
+
+
+async def async_resolve_host(host: str) -> str:
+    """
+    IPv4-адрес гирлянды по адресу или имени хоста из настроек.
+
+    Ответы на broadcast сопоставляются по адресу отправителя, поэтому имя
+    хоста нужно заранее перевести в адрес. Если имя не разрешается, оно
+    возвращается без изменений.
+    """
+    try:
+        return str(ipaddress.ip_address(host))
+    except ValueError:
+        pass
+
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+    except OSError as err:
+        _LOGGER.debug(f"{host} | Address lookup failed: {err}")
+        return host
+    return infos[0][4][0] if infos else host
+
+
+class SettingsCollector(asyncio.DatagramProtocol):
+    """Принимает ответы гирлянд на broadcast-запрос настроек."""
+
+    def __init__(self, expected: set[str]) -> None:
+        self.expected = expected
+        self.replies: dict[str, bytes] = {}
+        self.complete = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if len(data) < SETTINGS_REPLY_SIZE or data[:3] != SETTINGS_REQUEST:
+            return
+
+        host = addr[0]
+        if host not in self.replies:
+            # Как ответ GyverTwink.sock(): без префикса GT
+            self.replies[host] = data[2:]
+        if self.expected <= self.replies.keys() and not self.complete.done():
+            self.complete.set_result(True)
+
+    def error_received(self, exc: Exception) -> None:
+        _LOGGER.debug(f"Settings broadcast socket error: {exc}")
+
+
+async def async_poll_settings(
+    addresses,
+    expected: set[str],
+    window: float,
+    port: int = PORT,
+) -> dict[str, bytes]:
+    """
+    Чтение настроек всех гирлянд сети одним broadcast-запросом на адрес.
+
+    Ответы собираются, пока не ответят все ожидаемые гирлянды или не
+    истечет `window`, поэтому стоимость опроса не зависит от числа гирлянд.
+
+    :param addresses: Broadcast-адреса интерфейсов, например "192.168.1.255".
+    :param expected: IP-адреса гирлянд, ответы которых нужны.
+    :param window: Максимальное время ожидания ответов в секундах.
+    :param port: UDP-порт гирлянд.
+
+    :return: Ответы по IP-адресам гирлянд: байт команды 1 и 9 байт настроек
+        (см. `TwinkSettings.parse`). Ответы неожидаемых гирлянд тоже входят.
+    """
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: SettingsCollector(set(expected)),
+        family=socket.AF_INET,
+        allow_broadcast=True,
+    )
+    try:
+        for address in addresses:
+            try:
+                transport.sendto(SETTINGS_REQUEST, (str(address), port))
+            except OSError as err:
+                _LOGGER.debug(f"Broadcast to {address} failed: {err}")
+        try:
+            await asyncio.wait_for(asyncio.shield(protocol.complete), window)
+        except asyncio.TimeoutError:
+            pass
+    finally:
+        transport.close()
+
+    return protocol.replies
+
+
+class DiscoveryBackoff:
+    """Интервал фонового поиска.
+
+    После находки новой гирлянды поиск повторяется через минимальный интервал,
+    иначе интервал удваивается до максимального. На стабильной сети это один
+    запрос на интерфейс в час независимо от числа гирлянд.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = BACKGROUND_MIN_INTERVAL,
+        max_interval: float = BACKGROUND_MAX_INTERVAL,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+
+    def next(self, found_new: bool) -> float:
+        """Интервал до следующего поиска по результату текущего."""
+        if found_new:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return self.interval
@@ -0,0 +1,251 @@
+"""Виртуальная гирлянда GyverTwink для локальной отладки.
+
+Эмулятор отвечает на UDP-протокол гирлянды так же, как прошивка: хранит
+настройки и параметры эффектов, отвечает на запрос поиска, чтение настроек
+и выбор эффекта, помнит горящий светодиод в режиме калибровки. Используется для воспроизведения журналов трафика,
+бенчмарков и нагрузочных тестов без реального устройства.
+
+Запуск отдельным процессом:
+
+    python -m custom_components.gyvertwink.emulator --host 127.0.0.1 --port 8888
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+from .const import EFFECTS
+
+
+class VirtualGyverTwink(asyncio.DatagramProtocol):
+    """
+    Протокол виртуальной гирлянды.
+
+    :param delay: Задержка ответа в секундах (имитация медленной обработки).
+    :param loss: Вероятность потери входящего пакета (от 0 до 1).
+    :param min_gap: Пакеты, пришедшие раньше этой паузы после предыдущего,
+        теряются (имитация медленной прошивки).
+    """
+
+    def __init__(self, delay: float = 0.0, loss: float = 0.0, min_gap: float = 0.0) -> None:
+        self.delay = delay
+        self.loss = loss
+        self.min_gap = min_gap
+        self._last_packet = float("-inf")
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+        self.settings = {
+            "leds": 100,
+            "power": True,
+            "brightness": 200,
+            "auto_change": False,
+            "random_change": False,
+            "change_period": 1,
+            "timer_active": False,
+            "timer_value": 60,
+        }
+        self.effects = [
+            {"favorite": True, "scale": 128, "speed": 128 - 64} for _ in EFFECTS
+        ]
+        self.effect = 0
+
+        # Режим калибровки: горит только светодиод lit_led
+        self.calibrating = False
+        self.lit_led: Optional[int] = None
+
+        # Счетчики принятых пакетов: номер команды -> количество
+        self.received: dict[int, int] = {}
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if not data.startswith(b"GT") or len(data) < 3:
+            return
+        if self.loss and random.random() < self.loss:
+            return
+        if self.min_gap:
+            now = time.monotonic()
+            busy = now - self._last_packet < self.min_gap
+            self._last_packet = now
+            if busy:
+                return
+
+        self.received[data[2]] = self.received.get(data[2], 0) + 1
+
+        reply = self.handle(data[2:])
+        if reply is None or self.transport is None:
+            return
+
+        if self.delay:
+            asyncio.get_running_loop().call_later(
+                self.delay, self.transport.sendto, b"GT" + reply, addr
+            )
+        else:
+            self.transport.sendto(b"GT" + reply, addr)
+
+    def handle(self, data: bytes) -> Optional[bytes]:
+        """Обрабатывает команду (без префикса GT) и возвращает ответ."""
+        command = data[0]
+        args = data[1:]
+
+        if command == 0:
+            host = self.transport.get_extra_info("sockname")[0]
+            return bytes([0, int(host.split(".")[-1])])
+
+        if command == 1:
+            s = self.settings
+            return bytes(
+                [
+                    1,
+                    s["leds"] // 100,
+                    s["leds"] % 100,
+                    int(s["power"]),
+                    s["brightness"],
+                    int(s["auto_change"]),
+                    int(s["random_change"]),
+                    s["change_period"],
+                    int(s["timer_active"]),
+                    s["timer_value"],
+                ]
+            )
+
+        if command == 2 and args:
+            self._handle_settings(args)
+            return None
+
+        if command == 3 and args:
+            self._handle_calibration(args)
+            return None
+
+        if command == 4 and len(args) >= 2:
+            effect = self.effects[self.effect]
+            if args[0] == 0:
+                self.effect = min(args[1], len(self.effects) - 1)
+                effect = self.effects[self.effect]
+                return bytes([4, int(effect["favorite"]), effect["scale"], effect["speed"]])
+            if args[0] == 1:
+                effect["favorite"] = bool(args[1])
+            elif args[0] == 2:
+                effect["scale"] = args[1]
+            elif args[0] == 3:
+                effect["speed"] = args[1]
+
+        return None
+
+    def _handle_settings(self, args: bytes) -> None:
+        key = args[0]
+        value = args[1] if len(args) > 1 else 0
+        s = self.settings
+
+        if key == 0 and len(args) >= 3:
+            s["leds"] = args[1] * 100 + args[2]
+        elif key == 1:
+            s["power"] = bool(value)
+        elif key == 2:
+            s["brightness"] = value
+        elif key == 3:
+            s["auto_change"] = bool(value)
+        elif key == 4:
+            s["random_change"] = bool(value)
+        elif key == 5:
+            s["change_period"] = value
+        elif key == 6:
+            self.next_effect()
+        elif key == 7:
+            s["timer_active"] = bool(value)
+        elif key == 8:
+            s["timer_value"] = value
+
+    def _handle_calibration(self, args: bytes) -> None:
+        if args[0] == 0:
+            self.calibrating = True
+            self.lit_led = None
+        elif args[0] == 1 and self.calibrating and len(args) >= 3:
+            self.lit_led = args[1] * 100 + args[2]
+        elif args[0] == 2:
+            self.calibrating = False
+            self.lit_led = None
+
+    def next_effect(self) -> None:
+        """Переход к следующему избранному эффекту, как в прошивке."""
+        for step in range(1, len(self.effects) + 1):
+            index = (self.effect + step) % len(self.effects)
+            if self.effects[index]["favorite"]:
+                self.effect = index
+                return
+
+
+async def async_start_emulator(
+    host: str = "127.0.0.1", port: int = 8888, **kwargs
+) -> tuple[asyncio.DatagramTransport, VirtualGyverTwink]:
+    """Запускает виртуальную гирлянду в текущем event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(
+        lambda: VirtualGyverTwink(**kwargs), local_addr=(host, port)
+    )
+
+
+class EmulatorThread(threading.Thread):
+    """Виртуальная гирлянда в отдельном потоке (для синхронного клиента)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **kwargs) -> None:
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.kwargs = kwargs
+        self.device: Optional[VirtualGyverTwink] = None
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        transport, self.device = self.loop.run_until_complete(
+            async_start_emulator(self.host, self.port, **self.kwargs)
+        )
+        self.port = transport.get_extra_info("sockname")[1]
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            transport.close()
+            self.loop.close()
+
+    def start(self) -> "EmulatorThread":
+        super().start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Виртуальная гирлянда GyverTwink")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--delay", type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument("--loss", type=float, default=0.0, help="доля потерь, 0-1")
+    parser.add_argument(
+        "--min-gap", type=float, default=0.0, help="минимальная пауза между пакетами, с"
+    )
+    args = parser.parse_args(argv)
+
+    async def serve() -> None:
+        await async_start_emulator(
+            args.host, args.port, delay=args.delay, loss=args.loss, min_gap=args.min_gap
+        )
+        print(f"Virtual GyverTwink on {args.host}:{args.port}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
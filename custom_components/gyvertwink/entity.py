@@ -0,0 +1,41 @@
+"""Базовый класс entities GyverTwink."""
+import logging
+
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import GyverTwinkCoordinator
+
+
+class GyverTwinkEntity(CoordinatorEntity):
+    """Entity гирлянды с данными из coordinator.
+
+    Описание устройства - общий объект coordinator, а не копия в каждой
+    entity. Неизменные атрибуты (имя, иконка, пределы) задаются в подклассах
+    на уровне класса, поэтому экземпляр хранит только свое состояние.
+    """
+
+    # Суффикс unique_id и имя entity в логах
+    _key: str
+    _log_name: str
+
+    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{unique_id}_{self._key}"
+        self._attr_device_info = coordinator.device_info
+
+        # Начальное значение из уже полученных данных coordinator
+        self._update_from_data()
+
+    def debug(self, message) -> None:
+        """Логирование отладочной информации."""
+        logging.getLogger(type(self).__module__).debug(
+            f"{self.coordinator.host} | {self._log_name} | {message}"
+        )
+
+    def _handle_coordinator_update(self) -> None:
+        """Обработка обновления данных от coordinator."""
+        self._update_from_data()
+        self.async_write_ha_state()
+
+    def _update_from_data(self) -> None:
+        """Обновляет атрибуты из данных coordinator без записи состояния."""
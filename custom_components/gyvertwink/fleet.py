@@ -0,0 +1,117 @@
+"""Опрос нескольких гирлянд одним broadcast-запросом.
+
+Запрос настроек GT 1 не содержит адреса, поэтому на broadcast отвечают все
+гирлянды сети. Для гирлянд с включенным параметром fleet_poll координаторы не
+опрашивают устройства сами: раз в интервал опроса на broadcast-адрес каждого
+интерфейса Home Assistant отправляется один запрос, ответы распределяются по
+координаторам по адресу отправителя (имена хостов из настроек заранее
+переводятся в IP-адреса). Только не ответившие гирлянды
+опрашиваются обычным unicast-запросом.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+from .discovery import async_poll_settings, async_resolve_host
+
+if TYPE_CHECKING:
+    from .coordinator import GyverTwinkCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+FLEET_KEY = f"{DOMAIN}_fleet"
+
+# Окно ожидания ответов - максимальный таймаут по RTT участников, не больше
+MAX_WINDOW = 1.0
+
+
+class GyverTwinkFleet:
+    """Общий опрос гирлянд broadcast-запросом."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.members: dict[str, GyverTwinkCoordinator] = {}
+        self.polls = 0
+        self._unsub: Callable[[], None] | None = None
+        self._polling = False
+
+    @classmethod
+    @callback
+    def async_get(cls, hass: HomeAssistant) -> GyverTwinkFleet:
+        """Единственный fleet интеграции."""
+        fleet = hass.data.get(FLEET_KEY)
+        if fleet is None:
+            fleet = hass.data[FLEET_KEY] = cls(hass)
+        return fleet
+
+    async def async_add(self, coordinator: GyverTwinkCoordinator) -> Callable[[], None]:
+        """Добавляет координатор в общий опрос.
+
+        :return: Функция исключения координатора из опроса.
+        """
+        from .coordinator import UPDATE_INTERVAL
+
+        # Ответы сопоставляются по адресу отправителя, а не по имени хоста
+        address = await async_resolve_host(coordinator.host)
+        self.members[address] = coordinator
+        if self._unsub is None:
+            self._unsub = async_track_time_interval(
+                self.hass, self._async_poll, UPDATE_INTERVAL
+            )
+
+        @callback
+        def _remove() -> None:
+            if self.members.get(address) is coordinator:
+                del self.members[address]
+            if not self.members and self._unsub is not None:
+                self._unsub()
+                self._unsub = None
+
+        return _remove
+
+    def _window(self) -> float:
+        """Время ожидания ответов по оценкам RTT участников."""
+        return min(
+            max(coordinator.twink.rtt.timeout for coordinator in self.members.values()),
+            MAX_WINDOW,
+        )
+
+    async def _async_poll(self, _now=None) -> None:
+        if self._polling or not self.members:
+            return
+        from homeassistant.components.network import async_get_ipv4_broadcast_addresses
+
+        self._polling = True
+        try:
+            members = dict(self.members)
+            try:
+                addresses = await async_get_ipv4_broadcast_addresses(self.hass)
+                replies = await async_poll_settings(addresses, set(members), self._window())
+            except Exception as err:  # noqa
+                _LOGGER.debug(f"Fleet poll failed: {err}")
+                replies = {}
+            self.polls += 1
+
+            follow_up = []
+            for address, coordinator in members.items():
+                data = replies.get(address)
+                if data is not None:
+                    coordinator.async_set_fleet_data(data)
+                elif not coordinator.circuit_open:
+                    # Недоступные гирлянды проверяются собственными запросами
+                    coordinator.fleet_misses += 1
+                    follow_up.append(coordinator.async_refresh())
+
+            if follow_up:
+                await asyncio.gather(*follow_up)
+            _LOGGER.debug(
+                f"Fleet poll: {len(replies)} replies, {len(follow_up)} unicast follow-ups"
+            )
+        finally:
+            self._polling = False
@@ -0,0 +1,290 @@
+"""Локальный UDP-шлюз GyverTwink для нескольких управляющих клиентов.
+
+Home Assistant, приложение и скрипты обращаются не к гирлянде, а к шлюзу: он
+говорит на том же UDP-протоколе, держит для каждой гирлянды одну очередь
+команд с паузами между ними и кэш настроек. Чтение настроек отдается из кэша,
+пока он не старше `freshness`, одновременные чтения объединяются в один запрос,
+команды пересылаются на гирлянду в порядке поступления. Поэтому число опросов
+гирлянды не растет с числом клиентов.
+
+Каждой гирлянде соответствует свой локальный порт:
+
+    python -m custom_components.gyvertwink.gateway \\
+        --device 192.168.1.50=8890 --device 192.168.1.51=8891 --freshness 2
+"""
+import argparse
+import asyncio
+import logging
+import socket
+import time
+from typing import Optional
+
+from .gyver_twink import expects_reply
+from .protocol import PREFIX
+from .transport import AsyncGyverTwink
+
+_LOGGER = logging.getLogger(__name__)
+
+PORT = 8888
+
+# Позиция значения в ответе на чтение настроек (с префиксом GT) для команд {2, key, val}
+SETTINGS_OFFSETS = {1: 5, 2: 6, 3: 7, 4: 8, 5: 9, 7: 10, 8: 11}
+
+
+def source_address(peer: str) -> str:
+    """Адрес своего интерфейса, через который уходят пакеты к `peer`.
+
+    connect() для UDP-сокета только выбирает маршрут и не отправляет пакетов.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect((peer, PORT))
+        return sock.getsockname()[0]
+
+
+class _Endpoint(asyncio.DatagramProtocol):
+    """Передает принятые пакеты обработчику канала."""
+
+    def __init__(self, handler) -> None:
+        self.handler = handler
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.handler(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        _LOGGER.debug(f"Gateway socket error: {exc}")
+
+
+class DeviceChannel:
+    """
+    Канал к одной гирлянде: очередь команд, кэш настроек и счетчики.
+
+    Обмен с гирляндой идет через `transport.AsyncGyverTwink`: паузы между
+    пакетами, таймауты по RTT, повторы и проверку ответов выполняет
+    `protocol.ProtocolEngine`, как и у клиента Home Assistant.
+
+    :param host: IP-адрес гирлянды.
+    :param port: UDP-порт гирлянды.
+    :param freshness: Сколько секунд кэш настроек отдается без запроса к гирлянде.
+    :param gap: Минимальная пауза между пакетами на гирлянду в секундах.
+    """
+
+    def __init__(
+        self, host: str, port: int = PORT, freshness: float = 2.0, gap: float = 0.1
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.freshness = freshness
+        self.gap = gap
+        self.client: Optional[AsyncGyverTwink] = None
+
+        self.settings: Optional[bytearray] = None
+        self.settings_time = 0.0
+
+        self.stats = {"requests": 0, "cache_hits": 0, "upstream_reads": 0, "writes": 0}
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._read_waiters: Optional[list] = None
+        # Команды в очереди: кэш уже учитывает их, даже если ответ на чтение пришел раньше
+        self._queued_writes: list[bytes] = []
+        self._local: Optional[asyncio.DatagramTransport] = None
+        # Адрес шлюза для ответа на поиск по адресу клиента (шлюз на 0.0.0.0)
+        self._peer_addresses: dict[str, str] = {}
+        self._worker: Optional[asyncio.Task] = None
+
+    async def async_start(self, bind_host: str, local_port: int) -> None:
+        """Открывает локальный порт для клиентов и сокет к гирлянде."""
+        loop = asyncio.get_running_loop()
+        self._local, _ = await loop.create_datagram_endpoint(
+            lambda: _Endpoint(self.client_request), local_addr=(bind_host, local_port)
+        )
+        self.client = await AsyncGyverTwink.async_connect(self.host, self.port, self.gap)
+        self._worker = asyncio.create_task(self._run())
+
+    def close(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+        if self._local:
+            self._local.close()
+        if self.client:
+            self.client.close()
+
+    @property
+    def rtt(self):
+        """Оценка RTT гирлянды (`protocol.RttEstimator`)."""
+        return self.client.rtt
+
+    @property
+    def local_address(self) -> tuple:
+        return self._local.get_extra_info("sockname")
+
+    def _reply_address(self, peer: str) -> str:
+        """Адрес шлюза, видимый клиенту `peer`.
+
+        Шлюз на 0.0.0.0 принимает пакеты на всех интерфейсах, поэтому адрес
+        определяется по маршруту к клиенту, как адрес Home Assistant при поиске.
+        """
+        host = self.local_address[0]
+        if host != "0.0.0.0":
+            return host
+        address = self._peer_addresses.get(peer)
+        if address is None:
+            address = self._peer_addresses[peer] = source_address(peer)
+        return address
+
+    def client_request(self, data: bytes, addr) -> None:
+        """Пакет от клиента шлюза."""
+        if not data.startswith(b"GT") or len(data) < 3:
+            return
+        self.stats["requests"] += 1
+        command = data[2]
+
+        if command == 0:
+            # Поиск: отвечаем за гирлянду последним октетом адреса шлюза
+            octet = int(self._reply_address(addr[0]).split(".")[-1])
+            self._local.sendto(bytes([ord("G"), ord("T"), 0, octet]), addr)
+            return
+
+        if command == 1:
+            if self.settings and time.monotonic() - self.settings_time <= self.freshness:
+                self.stats["cache_hits"] += 1
+                self._local.sendto(bytes(self.settings), addr)
+                return
+            # Объединяем одновременные чтения в один запрос к гирлянде
+            if self._read_waiters is not None:
+                self._read_waiters.append(addr)
+                return
+            self._read_waiters = [addr]
+            self._queue.put_nowait((bytes(data[:3]), None))
+            return
+
+        if expects_reply(data):
+            self._queue.put_nowait((bytes(data), addr))
+            return
+
+        # Следующие чтения сразу видят новое значение
+        self._queued_writes.append(bytes(data))
+        self._patch_settings(data)
+        self._queue.put_nowait((bytes(data), None))
+
+    def _patch_settings(self, frame: bytes) -> None:
+        """Обновляет кэш настроек по отправленной команде {2, key, val}."""
+        if self.settings is None or len(frame) < 5 or frame[2] != 2:
+            return
+        key = frame[3]
+        if key == 0 and len(frame) >= 6:
+            self.settings[3:5] = frame[4:6]
+        elif key in SETTINGS_OFFSETS:
+            self.settings[SETTINGS_OFFSETS[key]] = frame[4]
+
+    async def _run(self) -> None:
+        """Последовательно отправляет команды на гирлянду.
+
+        Ошибка одного запроса (например, OSError сокета) не останавливает
+        обработку очереди: ожидающие чтения сбрасываются (клиенты повторят
+        запрос), а кэш настроек устаревает.
+        """
+        while True:
+            frame, reply_to = await self._queue.get()
+            try:
+                await self._async_handle(frame, reply_to)
+            except Exception as err:  # noqa
+                _LOGGER.warning(f"{self.host} | Request {frame.hex(' ')} failed: {err}")
+                if frame[2] == 1:
+                    self._read_waiters = None
+                # Кэш мог учесть команду, которая не дошла до гирлянды
+                self.settings_time = 0.0
+
+    async def _async_handle(self, frame: bytes, reply_to) -> None:
+        """Выполняет один запрос из очереди и отвечает клиентам."""
+        if not expects_reply(frame):
+            try:
+                await self.client.async_send(frame)
+            finally:
+                self._queued_writes.pop(0)
+            self.stats["writes"] += 1
+            return
+
+        reply = await self._request(frame)
+
+        if frame[2] == 1:
+            self.stats["upstream_reads"] += 1
+            waiters, self._read_waiters = self._read_waiters or [], None
+            if reply is not None:
+                self.settings = bytearray(reply)
+                self.settings_time = time.monotonic()
+                for write in self._queued_writes:
+                    self._patch_settings(write)
+                reply = bytes(self.settings)
+        else:
+            waiters = [reply_to]
+
+        if reply is not None:
+            for addr in waiters:
+                self._local.sendto(reply, addr)
+
+    async def _request(self, frame: bytes) -> Optional[bytes]:
+        """Запрос к гирлянде; ответ с префиксом GT или None."""
+        try:
+            # Чтение настроек идемпотентно, его можно дублировать
+            data = await self.client.async_request(
+                frame, wait_answer=True, hedge=frame[2] == 1
+            )
+        except TimeoutError:
+            data = None
+        if data is None:
+            _LOGGER.debug(f"{self.host} | No reply to {frame.hex(' ')}")
+            return None
+        return PREFIX + data
+
+
+async def async_run_gateway(
+    devices: dict[str, int],
+    bind_host: str = "0.0.0.0",
+    freshness: float = 2.0,
+    gap: float = 0.1,
+) -> list[DeviceChannel]:
+    """Запускает каналы шлюза: {IP гирлянды: локальный порт}."""
+    channels = []
+    for host, local_port in devices.items():
+        channel = DeviceChannel(host, freshness=freshness, gap=gap)
+        await channel.async_start(bind_host, local_port)
+        channels.append(channel)
+    return channels
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="UDP-шлюз GyverTwink")
+    parser.add_argument(
+        "--device",
+        action="append",
+        required=True,
+        help="IP гирлянды и локальный порт: 192.168.1.50=8890",
+    )
+    parser.add_argument("--bind", default="0.0.0.0", help="локальный адрес шлюза")
+    parser.add_argument("--freshness", type=float, default=2.0, help="свежесть кэша, с")
+    parser.add_argument("--gap", type=float, default=0.1, help="пауза между пакетами, с")
+    parser.add_argument("--stats", type=float, default=60, help="период вывода статистики, с")
+    args = parser.parse_args(argv)
+
+    devices = {}
+    for item in args.device:
+        host, _, port = item.partition("=")
+        devices[host] = int(port or PORT)
+
+    async def serve() -> None:
+        channels = await async_run_gateway(devices, args.bind, args.freshness, args.gap)
+        for channel in channels:
+            print(f"{channel.host} <- {args.bind}:{channel.local_address[1]}")
+        while True:
+            await asyncio.sleep(args.stats)
+            for channel in channels:
+                print(f"{channel.host} {channel.stats}", flush=True)
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,125 @@
 import socket
+import threading
 import time
-from typing import Optional
+from collections.abc import Mapping
+from typing import Callable, Iterable, Optional
+
+from .protocol import (
+    Pacer,
+    ProtocolEngine,
+    RttEstimator,
+    Send,
+    WarmthTracker,
+    parse_effect,
+)
+
+# Пауза между пакетами кадра шоу (см. `show`)
+BATCH_GAP = 0.02
+
+
+def speed_to_firmware(speed: int, reverse: bool = False) -> int:
+    """
+    Скорость эффекта в формате прошивки.
+
+    Протокол GyverTwink: 128 - остановка, <128 - вперед, >128 - назад.
+
+    :param speed: Скорость 0-127 (0 - остановка).
+    :param reverse: Обратное направление.
+    """
+    speed = max(0, min(127, int(speed)))
+    return 128 + speed if reverse else 128 - speed
+
+
+def speed_from_firmware(value: int) -> tuple[int, bool]:
+    """Скорость 0-127 и признак обратного направления из формата прошивки."""
+    return min(127, abs(value - 128)), value > 128
+
+
+def expects_reply(frame: bytes) -> bool:
+    """Ожидает ли команда ответа гирлянды (поиск, настройки, выбор эффекта)."""
+    return frame[2] in (0, 1) or frame[2:4] == b"\x04\x00"
+
+
+class TwinkSettings(Mapping):
+    """
+    Настройки гирлянды из ответа на запрос {1}.
+
+    Объект не меняется после публикации: каждый ответ и каждая команда дают
+    новый снимок, который клиент подставляет одним присваиванием. Поэтому
+    снимок, полученный в цикле событий, не меняется из потоков executor и
+    фонового обновления. Читается как словарь только для чтения:
+    `settings["power"]`, `settings.get("brightness")`, `dict(settings)`.
+    Пустой (ложный), пока настройки не получены.
+    """
+
+    KEYS = (
+        "leds",
+        "power",
+        "brightness",
+        "auto_change",
+        "random_change",
+        "change_period",
+        "timer_active",
+        "timer_value",
+    )
+
+    __slots__ = KEYS + ("loaded",)
+
+    def __init__(self) -> None:
+        for key in self.KEYS:
+            setattr(self, key, None)
+        self.loaded = False
+
+    @classmethod
+    def parse(cls, data: bytes) -> "TwinkSettings":
+        """Снимок настроек из ответа {колво_led/100, колво_led%100, питание, яркость, ...}."""
+        settings = cls()
+        settings.leds = data[0] * 100 + data[1]
+        settings.power = bool(data[2])
+        settings.brightness = data[3]
+        settings.auto_change = bool(data[4])
+        settings.random_change = bool(data[5])
+        settings.change_period = data[6]
+        settings.timer_active = bool(data[7])
+        settings.timer_value = data[8]
+        settings.loaded = True
+        return settings
+
+    def replace(self, key: str, value) -> "TwinkSettings":
+        """Новый снимок с измененным значением `key`."""
+        settings = TwinkSettings()
+        for name in self.__slots__:
+            setattr(settings, name, getattr(self, name))
+        setattr(settings, key, value)
+        return settings
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS) if self.loaded else 0
+
+    def __bool__(self) -> bool:
+        return self.loaded
+
+    def __repr__(self) -> str:
+        return repr(dict(self)) if self.loaded else "{}"
+
+
+class _SettingsFlight:
+    """Выполняющийся запрос настроек, общий для всех одновременных читателей."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[dict] = None
+        self.error: Optional[BaseException] = None
 
 
 class GyverTwink:
@@ -11,11 +130,14 @@ class GyverTwink:
         - `discover(net_ip: str, timeout: int = 2) -> List["GyverTwink"]`:
           Поиск гирлянд в указанной сети и возвращает список найденных гирлянд.
 
+        - `ping(timeout: float = 0.5) -> bool`:
+          Проверяет доступность гирлянды одним коротким запросом.
+
         - `set_leds(count: int) -> None`:
           Устанавливает количество светодиодов гирлянды.
 
-        - `get_settings() -> Dict[str, Any]`:
-          Получает настройки гирлянды и возвращает словарь с настройками.
+        - `get_settings() -> TwinkSettings`:
+          Получает настройки гирлянды (`TwinkSettings`, читается как словарь).
             - leds: Количество светодиодов.
             - power: Состояние питания.
             - brightness: Яркость (от 0 до 255).
@@ -25,6 +147,10 @@ class GyverTwink:
             - timer_active: Флаг активности таймера выключения.
             - timer_value: Время до выключения (от 1 до 240 минут).
 
+        - `read_settings(max_age: Optional[float] = None) -> Optional[dict]`:
+          Возвращает настройки из кэша, если они не старше `max_age`,
+          иначе запрашивает их у гирлянды (см. `get_settings`).
+
         - `set_power(_on: bool) -> None`:
           Устанавливает состояние питания гирлянды.
 
@@ -64,15 +190,40 @@ class GyverTwink:
         - `set_favorite(_on: bool) -> None`:
           Устанавливает флаг избранного для текущего эффекта.
 
+        - `set_favorites(flags: dict[int, bool], restore: Optional[int] = None)`:
+          Устанавливает флаг избранного нескольким эффектам за один проход
+          и выбирает эффект `restore` в конце.
+
+        - `read_effects(numbers: Iterable[int]) -> dict[int, dict]`:
+          Читает параметры нескольких эффектов за один проход.
+
         - `set_scale(value: int) -> None`:
           Устанавливает масштаб текущего эффекта.
 
         - `set_speed(value: int) -> None`:
           Устанавливает скорость текущего эффекта.
 
+        - `start_calibration() -> None`, `show_led(index: int) -> None`,
+          `stop_calibration() -> None`:
+          Режим калибровки: все светодиоды гаснут, горит только выбранный.
+
+        - `tune_pacing(trials: int = 8) -> dict`:
+          Подбирает минимальную паузу между пакетами на эту гирлянду.
+
+        - `calibrate(leds: Iterable[int], capture: Callable[[int], None]) -> dict`:
+          Зажигает светодиоды по одному и вызывает `capture` для каждого.
+
     Атрибуты:
         - `twink_ip`: IP-адрес гирлянды.
         - `last_reqest_time`: Время последнего запроса к гирлянде.
+        - `warmth`: Зависимость RTT от простоя (`WarmthTracker`).
+        - `recorder`: Журнал трафика или None (запись отключена).
+        - `rtt`: Оценка времени ответа гирлянды (`RttEstimator`), по которой
+          выбирается таймаут ожидания ответа.
+        - `pacer`: Минимальная пауза между пакетами (`protocol.Pacer`),
+          подбирается `tune_pacing`.
+        - `engine`: Логика запросов без ввода-вывода (`protocol.ProtocolEngine`),
+          `sock()` - ее синхронный драйвер.
 
     Примеры использования:
         ```python
@@ -101,69 +252,153 @@ class GyverTwink:
 
     """
 
-    def __init__(self, twink_ip: str) -> None:
+    def __init__(
+        self,
+        twink_ip: str,
+        port: int = 8888,
+        recorder=None,
+        settings_ttl: float = 1.0,
+        settings_stale: float = 10.0,
+    ) -> None:
         """
         Создает объект GyverTwink для управления гирляндой по указанному IP-адресу.
 
         :param twink_ip: IP-адрес гирлянды.
+        :param port: UDP-порт гирлянды.
+        :param recorder: Необязательный журнал трафика (`recorder.TrafficRecorder`),
+            в который записываются все отправленные и полученные пакеты.
+        :param settings_ttl: Сколько секунд настройки из кэша считаются свежими.
+        :param settings_stale: Сколько секунд после устаревания кэш еще отдается
+            сразу, а настройки обновляются в фоне (stale-while-revalidate).
         """
 
         self.twink_ip = twink_ip
-        self.server_address = (twink_ip, 8888)
-        self.settings_ = {}
-        self.last_reqest_time = time.time()
+        self.server_address = (twink_ip, port)
+        self.settings_ = TwinkSettings()
+        self.settings_time = 0.0
+        self.settings_ttl = settings_ttl
+        self.settings_stale = settings_stale
+        self._settings_lock = threading.Lock()
+        self._settings_flight: Optional[_SettingsFlight] = None
+        self._settings_version = 0
+        self.rtt = RttEstimator()
+        self.warmth = WarmthTracker()
+        self.pacer = Pacer()
+        self.engine = ProtocolEngine(self.rtt, self.warmth, self.pacer)
+        self._io_lock = threading.Lock()
+        self.last_reqest_time = time.monotonic()
+        self.recorder = recorder
+
+    @property
+    def last_reqest_time(self) -> float:
+        """Время завершения последнего запроса к гирлянде (time.monotonic)."""
+        return self.engine.last_request
+
+    @last_reqest_time.setter
+    def last_reqest_time(self, value: float) -> None:
+        self.engine.last_request = value
+
+    def _send(self, sock: socket.socket, data: bytes) -> None:
+        """Отправляет пакет гирлянде и записывает его в журнал трафика."""
+        sock.sendto(data, self.server_address)
+        # Журнал могут отключить из другого потока
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_sent(self.server_address, data)
+
+    def _record_received(self, server: tuple, data: bytes) -> None:
+        """Записывает полученный пакет в журнал трафика."""
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_received(server, data)
 
     def sock(
         self,
         send_data: bytes,
         wait_answer: bool = False,
-        timeout: int = 2,
+        timeout: Optional[float] = None,
         __bufsize: int = 30,
         retry: int = 1,
+        hedge: bool = False,
+        gap: Optional[float] = None,
     ) -> Optional[bytes]:
         """
         Отправляет данные по UDP и получает ответные данные.
 
         :param send_data: Данные для отправки.
         :param wait_answer: Ожидать ли ответные данные.
-        :param timeout: Таймаут ожидания ответа.
+        :param timeout: Таймаут ожидания ответа. По умолчанию берется из оценки RTT.
         :param __bufsize: Размер буфера для получения данных.
         :param retry: Количество попыток повторной отправки в случае таймаута.
+        :param hedge: Отправить дубликат запроса, если ответа нет дольше p95 RTT.
+            Только для идемпотентных запросов на чтение.
+        :param gap: Пауза перед запросом вместо подобранной `pacer.gap`.
+
+        Логика запроса (паузы, таймауты, повторы, hedging) - в `ProtocolEngine`,
+        здесь только сокет и ожидание. Запросы из разных потоков выполняются
+        по очереди.
 
         :return: Ответные данные (если ожидается) или None.
         """
+        with self._io_lock, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            return self._request(
+                sock, send_data, wait_answer, timeout, retry, hedge, gap, __bufsize
+            )
 
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-        try:
-            _ = time.time() - self.last_reqest_time
-            if _ < 0.5:
-                time.sleep(_ + 0.2)
-
-            sock.sendto(send_data, self.server_address)
+    def _request(
+        self,
+        sock: socket.socket,
+        send_data: bytes,
+        wait_answer: bool = False,
+        timeout: Optional[float] = None,
+        retry: int = 1,
+        hedge: bool = False,
+        gap: Optional[float] = None,
+        bufsize: int = 30,
+    ) -> Optional[bytes]:
+        """
+        Выполняет запрос через `ProtocolEngine` на открытом сокете (см. `sock`).
 
-            if wait_answer:
-                # Получение данных
-                sock.settimeout(timeout)
+        Вызывается под `_io_lock`: так несколько запросов (выбор эффекта и
+        команда для него, проверка паузы) выполняются подряд, без чужих
+        запросов между ними.
+        """
+        engine = self.engine
+        request = engine.request(
+            send_data,
+            time.monotonic(),
+            wait_answer=wait_answer,
+            timeout=timeout,
+            retry=retry,
+            hedge=hedge,
+            gap=gap,
+        )
+        while True:
+            for event in engine.events():
+                if isinstance(event, Send):
+                    self._send(sock, event.frame)
+            if request.done:
+                break
+
+            wait = engine.deadline - time.monotonic()
+            if wait > 0 and not engine.awaiting_reply:
+                # Пауза перед запросом
+                time.sleep(wait)
+            elif wait > 0:
+                sock.settimeout(wait)
                 try:
-                    data, server = sock.recvfrom(__bufsize)
+                    data, server = sock.recvfrom(bufsize)
                 except TimeoutError:
-                    if retry > 0:
-                        return self.sock(
-                            send_data, wait_answer, timeout, __bufsize, retry - 1
-                        )
-                    else:
-                        raise TimeoutError("Timeout")
-
-                if not data.startswith(b"GT"):
-                    return None
-
-                return data[2:]
+                    pass
+                else:
+                    self._record_received(server, data)
+                    engine.datagram_received(data, time.monotonic())
+                    continue
+            engine.tick(time.monotonic())
 
-        finally:
-            self.last_reqest_time = time.time()
-
-            sock.close()
+        if request.error is not None:
+            raise request.error
+        return request.result
 
     @classmethod
     def discover(cls, net_ip, timeout=2) -> list["GyverTwink"]:
@@ -209,6 +444,28 @@ class GyverTwink:
         finally:
             sock.close()
 
+    def ping(self, timeout: float = 0.5) -> bool:
+        """
+        Проверяет доступность гирлянды одним коротким запросом поиска.
+
+        Запрос отправляется без повторов, поэтому проверка недоступной
+        гирлянды занимает не больше `timeout` секунд.
+
+        :param timeout: Таймаут ожидания ответа. (по умолчанию 0.5 секунды)
+
+        :return: True, если гирлянда ответила.
+        """
+        # {0} - запрос поиска, гирлянда отвечает последним октетом своего IP
+
+        request_data = bytes([ord("G"), ord("T"), 0])
+
+        try:
+            data = self.sock(request_data, wait_answer=True, timeout=timeout, retry=0)
+        except (TimeoutError, OSError):
+            return False
+
+        return data is not None
+
     def set_leds(self, count: int) -> None:
         """
         Устанавливает количество светодиодов гирлянды.
@@ -221,12 +478,15 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 0, count // 100, count % 100])
 
         self.sock(request_data)
+        self._patch_settings("leds", count)
 
     def get_settings(self):
         """
         Получает настройки гирлянды.
 
-        :return: Словарь с настройками гирлянды.
+        Одновременные вызовы из разных потоков разделяют один запрос к гирлянде.
+
+        :return: Настройки гирлянды (`TwinkSettings`, читается как словарь).
             - leds: Количество светодиодов.
             - power: Состояние питания.
             - brightness: Яркость (от 0 до 255).
@@ -237,34 +497,115 @@ class GyverTwink:
             - timer_value: Время до выключения (от 1 до 240 минут).
 
         """
+        with self._settings_lock:
+            flight = self._settings_flight
+            leader = flight is None
+            if leader:
+                flight = self._settings_flight = _SettingsFlight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        self._run_settings_flight(flight)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _run_settings_flight(self, flight: _SettingsFlight) -> None:
+        """Выполняет запрос настроек и сообщает результат всем ожидающим."""
+        version = self._settings_version
+        try:
+            flight.result = self._fetch_settings()
+        except BaseException as err:
+            flight.error = err
+        finally:
+            with self._settings_lock:
+                self._settings_flight = None
+            flight.done.set()
+
+        if flight.result is not None:
+            # Команда во время запроса: ответ мог ее не учесть, кэш сразу устарел
+            self.settings_time = time.monotonic() if version == self._settings_version else 0.0
+
+    def _fetch_settings(self) -> Optional[TwinkSettings]:
+        """Запрос настроек у гирлянды без кэша, ответ разбирается в `settings_`."""
         # {колво_led/100, колво_led%100, питание, яркость, автосмена, случайная_смена, период, таймер активен, время таймера}
         request_data = bytes([ord("G"), ord("T"), 1])
 
-        data = self.sock(request_data, wait_answer=True)
+        data = self.sock(request_data, wait_answer=True, hedge=True)
 
         if not data:
             return None
-        else:
-            data = data[1:]
 
-            settings = {
-                "leds": data[0] * 100 + data[1],
-                "power": True if data[2] else False,
-                "brightness": data[3],
-                "auto_change": True if data[4] else False,
-                "random_change": True if data[5] else False,
-                "change_period": data[6],
-                "timer_active": True if data[7] else False,
-                "timer_value": data[8],
-            }
+        settings = self.settings_ = TwinkSettings.parse(data[1:])
+        return settings
+
+    def feed_settings(self, data: bytes) -> TwinkSettings:
+        """
+        Принимает ответ на запрос настроек, полученный не через `sock()`.
+
+        Используется при опросе нескольких гирлянд одним broadcast-запросом.
+
+        :param data: Ответ без префикса GT: байт команды 1 и 9 байт настроек.
+
+        :return: Обновленные настройки (см. `get_settings`).
+        """
+        settings = self.settings_ = TwinkSettings.parse(data[1:])
+        self.settings_time = time.monotonic()
+        # Гирлянда только что ответила: пауза между пакетами отсчитывается от ответа
+        self.last_reqest_time = time.monotonic()
+        return settings
+
+    def read_settings(self, max_age: Optional[float] = None) -> Optional[TwinkSettings]:
+        """
+        Настройки гирлянды из кэша или с устройства.
+
+        - Кэш моложе `max_age` возвращается без запроса.
+        - Кэш, устаревший не больше чем на `settings_stale`, возвращается сразу,
+          а свежие настройки запрашиваются в фоне.
+        - Иначе настройки запрашиваются у гирлянды (один запрос на всех
+          одновременных читателей).
+
+        :param max_age: Допустимый возраст кэша в секундах (по умолчанию `settings_ttl`).
+
+        :return: Настройки гирлянды (см. `get_settings`).
+        """
+        ttl = self.settings_ttl if max_age is None else max_age
+        age = time.monotonic() - self.settings_time
+
+        if self.settings_ and age <= ttl:
+            return self.settings_
+
+        if self.settings_ and age <= ttl + self.settings_stale:
+            self._revalidate_settings()
+            return self.settings_
+
+        return self.get_settings()
 
-            self.settings_ = settings
+    def _revalidate_settings(self) -> None:
+        """Фоновое обновление кэша настроек, если запрос еще не идет."""
+        with self._settings_lock:
+            if self._settings_flight is not None:
+                return
+            flight = self._settings_flight = _SettingsFlight()
 
-            return settings
+        threading.Thread(
+            target=self._run_settings_flight, args=(flight,), daemon=True
+        ).start()
+
+    def _patch_settings(self, key: str, value) -> None:
+        """Обновляет кэш настроек после отправленной команды."""
+        with self._settings_lock:
+            self._settings_version += 1
+            if self.settings_:
+                self.settings_ = self.settings_.replace(key, value)
 
     @property
     def settings(self):
-        return self.settings_ or self.get_settings()
+        return self.read_settings()
 
     def set_power(self, _on: bool) -> None:
         """
@@ -278,6 +619,7 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 1, value])
 
         self.sock(request_data)
+        self._patch_settings("power", bool(value))
 
     def on(self):  # noqa
         """Включает гирлянду."""
@@ -299,6 +641,7 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 2, value])
 
         self.sock(request_data)
+        self._patch_settings("brightness", value)
 
     def set_auto_change(self, _on: bool) -> None:
         """
@@ -312,6 +655,7 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 3, value])
 
         self.sock(request_data)
+        self._patch_settings("auto_change", bool(value))
 
     def set_random_change(self, _on: bool) -> None:
         """
@@ -325,6 +669,7 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 4, value])
 
         self.sock(request_data)
+        self._patch_settings("random_change", bool(value))
 
     def set_change_period(self, value: int) -> None:
         """
@@ -338,6 +683,7 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 5, value])
 
         self.sock(request_data)
+        self._patch_settings("change_period", value)
 
     def next_effect(self):
         """
@@ -361,6 +707,7 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 7, value])
 
         self.sock(request_data)
+        self._patch_settings("timer_active", bool(value))
 
     def set_timer_value(self, value: int) -> None:
         """
@@ -374,6 +721,7 @@ class GyverTwink:
         request_data = bytes([ord("G"), ord("T"), 2, 8, value])
 
         self.sock(request_data)
+        self._patch_settings("timer_value", value)
 
     def select_effect(self, number: int) -> Optional[dict]:
         """
@@ -391,16 +739,7 @@ class GyverTwink:
 
         if not data:
             return None
-        else:
-            data = data[1:]
-
-            effect = {
-                "favorite": True if data[0] else False,
-                "scale": data[1],
-                "speed": data[2],
-            }
-
-            return effect
+        return parse_effect(data)
 
     def set_favorite(self, _on: bool) -> None:
         """
@@ -415,6 +754,109 @@ class GyverTwink:
 
         self.sock(request_data)
 
+    def set_favorites(
+        self,
+        flags: dict[int, bool],
+        restore: Optional[int] = None,
+        gap: Optional[float] = None,
+        retry: int = 1,
+    ) -> tuple[list[Optional[dict]], Optional[dict]]:
+        """
+        Устанавливает флаг избранного сразу нескольким эффектам.
+
+        Для каждого эффекта пара команд "выбрать эффект" + "установить флаг"
+        отправляется подряд с паузой `gap`: флаг - после ответа на выбор
+        эффекта, без чужих запросов между ними. Без ответа выбор повторяется,
+        а флаг не отправляется (иначе он достался бы другому эффекту).
+
+        :param flags: Номер эффекта -> флаг избранного.
+        :param restore: Эффект, который выбирается в конце (обычно исходный).
+        :param gap: Пауза между пакетами в секундах (по умолчанию подобранная
+            пауза `pacer.gap`).
+        :param retry: Количество повторов пары при потере ответа.
+
+        :return: Параметры эффектов до изменения флага в порядке `flags`
+            (None, если ответ потерялся) и параметры эффекта `restore`.
+        """
+        effects = self._select_each(
+            [
+                (number, bytes([ord("G"), ord("T"), 4, 1, 1 if flag else 0]))
+                for number, flag in flags.items()
+            ],
+            gap,
+            retry,
+        )
+        restored = self.select_effect(restore) if restore is not None else None
+        return effects, restored
+
+    def read_effects(
+        self,
+        numbers: Iterable[int],
+        gap: Optional[float] = None,
+        retry: int = 1,
+        cancel: Optional[threading.Event] = None,
+    ) -> dict[int, dict]:
+        """
+        Читает параметры нескольких эффектов, выбирая их по очереди.
+
+        Выбор эффекта виден на включенной гирлянде, а исходный эффект не
+        восстанавливается: это делает вызывающий код, когда его знает.
+
+        :param numbers: Номера эффектов.
+        :param gap: Пауза между пакетами в секундах (по умолчанию подобранная
+            пауза `pacer.gap`).
+        :param retry: Количество повторов при потере ответа.
+        :param cancel: Событие досрочной остановки (проверяется между эффектами).
+
+        :return: Номер эффекта -> параметры (favorite, scale, speed) для
+            эффектов, ответ на выбор которых получен.
+        """
+        numbers = list(numbers)
+        effects = self._select_each([(number, None) for number in numbers], gap, retry, cancel)
+        return {
+            number: effect for number, effect in zip(numbers, effects) if effect is not None
+        }
+
+    def _select_each(
+        self,
+        items: list[tuple[int, Optional[bytes]]],
+        gap: Optional[float],
+        retry: int,
+        cancel: Optional[threading.Event] = None,
+    ) -> list[Optional[dict]]:
+        """
+        Выбирает эффекты по очереди с паузой `gap` между пакетами.
+
+        Запросы идут через `ProtocolEngine` (таймауты по RTT, повторы, проверка
+        байта команды в ответе). Выбор эффекта и его команда (если есть)
+        выполняются под `_io_lock` подряд, опрос и команды пользователя -
+        между эффектами.
+
+        :param items: Пары (номер эффекта, команда для него или None).
+
+        :return: Параметры эффектов до команды в порядке `items` (None, если
+            ответ потерялся или обход остановлен).
+        """
+        if gap is None:
+            gap = self.pacer.gap
+        effects: list[Optional[dict]] = [None] * len(items)
+
+        for index, (number, command) in enumerate(items):
+            if cancel is not None and cancel.is_set():
+                break
+
+            select = bytes([ord("G"), ord("T"), 4, 0, number])
+            with self._io_lock, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                try:
+                    reply = self._request(sock, select, wait_answer=True, retry=retry, gap=gap)
+                except TimeoutError:
+                    continue
+                effects[index] = parse_effect(reply) if reply else None
+                if command is not None and effects[index] is not None:
+                    self._request(sock, command, gap=gap)
+
+        return effects
+
     def set_scale(self, value: int) -> None:
         """
         Устанавливает масштаб текущего эффекта.
@@ -441,15 +883,223 @@ class GyverTwink:
 
         self.sock(request_data)
 
-    def __repr__(self):
-        return f"GyverTwink({self.twink_ip})"
+    def start_calibration(self) -> None:
+        """Включает режим калибровки: все светодиоды гаснут."""
+        # {3, 0} - начать калибровку
+
+        request_data = bytes([ord("G"), ord("T"), 3, 0])
+
+        self.sock(request_data)
+
+    def show_led(self, index: int) -> None:
+        """
+        Зажигает в режиме калибровки один светодиод.
+
+        :param index: Номер светодиода (с нуля).
+        """
+        # {3, 1, n/100, n%100} - зажечь светодиод n
+
+        request_data = bytes([ord("G"), ord("T"), 3, 1, index // 100, index % 100])
+
+        self.sock(request_data)
+
+    def stop_calibration(self) -> None:
+        """Выключает режим калибровки."""
+        # {3, 2} - закончить калибровку
+
+        request_data = bytes([ord("G"), ord("T"), 3, 2])
+
+        self.sock(request_data)
+
+    def tune_pacing(
+        self,
+        trials: int = 8,
+        candidates: Iterable[float] = Pacer.CANDIDATES,
+        cancel: Optional[threading.Event] = None,
+    ) -> dict:
+        """
+        Подбирает минимальную паузу между пакетами на гирлянду.
+
+        Для каждой паузы из `candidates` (от большей к меньшей) `trials` раз
+        отправляется команда яркости, отличающейся от текущей на единицу,
+        через паузу - чтение настроек, затем исходная яркость возвращается.
+        Проверка не прошла, если ответа на чтение нет или в нем прежняя
+        яркость: слишком частые пакеты гирлянда теряет. Случайные потери сети
+        видны уже на самой длинной паузе, поэтому пауза проходит, если неудач
+        не больше чем на ней плюс одна. Результат - наименьшая пауза, до
+        которой все более длинные тоже прошли.
+
+        Запросы идут через `ProtocolEngine` с явным таймаутом, поэтому потери
+        на слишком коротких паузах не учитываются в `pacer.loss`. `_io_lock`
+        занимается только на время одной проверки, поэтому опрос и команды
+        пользователя выполняются между проверками.
+
+        :param trials: Количество проверок каждой паузы.
+        :param candidates: Проверяемые паузы в секундах.
+        :param cancel: Событие досрочной остановки (проверяется перед каждой
+            проверкой); остановленный замер паузу не меняет.
+
+        :return: Подобранная пауза, результаты проверок по паузам и признак
+            остановки.
+        """
+        if not self.read_settings():
+            raise TimeoutError("No settings")
+
+        learned = None
+        results = {}
+        baseline = None
+        cancelled = False
+        finished = None
+
+        for gap in candidates:
+            failed = 0
+            for _ in range(trials):
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    break
+                passed, finished = self._pacing_trial(gap, finished)
+                if not passed:
+                    failed += 1
+
+            if cancelled:
+                break
+            results[round(gap * 1000, 1)] = f"{trials - failed}/{trials}"
+            if baseline is None:
+                baseline = failed
+            if failed == trials or failed > baseline + 1:
+                break
+            learned = gap
+
+        if not cancelled:
+            # Не прошла даже самая длинная пауза - остаемся на медленной
+            self.pacer.learned(learned if learned is not None else Pacer.MAX_GAP / 2)
+        return {
+            "gap_ms": round(self.pacer.gap * 1000, 1),
+            "trials": results,
+            "cancelled": cancelled,
+        }
+
+    def _pacing_trial(self, gap: float, previous: Optional[float]) -> tuple[bool, float]:
+        """
+        Одна проверка паузы `gap`: измененная яркость, чтение настроек и
+        возврат исходной яркости.
+
+        :param previous: Время окончания предыдущей проверки. Если после нее
+            были другие запросы, перед проверкой выдерживается обычная пауза.
+
+        :return: Прочитана ли измененная яркость и время окончания проверки.
+        """
+        with self._io_lock, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            pause = gap if self.last_reqest_time == previous else None
+            # Текущая яркость с учетом команд, отправленных между проверками
+            original = self.settings_.brightness
+            probe = original + 1 if original < 255 else original - 1
+
+            try:
+                self._request(sock, bytes([ord("G"), ord("T"), 2, 2, probe]), gap=pause)
+                try:
+                    reply = self._request(
+                        sock,
+                        bytes([ord("G"), ord("T"), 1]),
+                        wait_answer=True,
+                        timeout=self.rtt.timeout,
+                        retry=0,
+                        gap=gap,
+                    )
+                except TimeoutError:
+                    reply = None
+            finally:
+                # Исходная яркость - с обычной паузой, чтобы команда дошла
+                self._request(
+                    sock,
+                    bytes([ord("G"), ord("T"), 2, 2, original]),
+                    gap=max(gap, self.pacer.gap),
+                )
+
+            passed = (
+                reply is not None
+                and len(reply) >= 10
+                and TwinkSettings.parse(reply[1:]).brightness == probe
+            )
+            return passed, self.last_reqest_time
+
+    def calibration_dwell(self, settle: float = 0.03) -> float:
+        """
+        Время от отправки команды до момента, когда светодиод гарантированно горит.
+
+        Оценка сверху задержки в одну сторону (половина `srtt + 4 * rttvar`)
+        плюс время, за которое гирлянда выводит кадр.
+
+        :param settle: Время вывода кадра гирляндой в секундах.
+        """
+        if self.rtt.srtt is None:
+            return self.rtt.timeout / 2 + settle
+        return (self.rtt.srtt + 4 * self.rtt.rttvar) / 2 + settle
+
+    def calibrate(
+        self,
+        leds: Iterable[int],
+        capture: Callable[[int], None],
+        dwell: Optional[float] = None,
+        settle: float = 0.03,
+        repeat: int = 1,
+    ) -> dict:
+        """
+        Зажигает светодиоды по одному и вызывает `capture` для каждого.
+
+        Команды идут через `sock()` без пауз клиента между запросами и без
+        ожидания ответа: следующая команда уходит сразу после возврата из
+        `capture`, а `capture` вызывается через `dwell` после отправки. Если
+        `dwell` не задан, он считается по RTT гирлянды (см. `calibration_dwell`);
+        для первого замера RTT гирлянда опрашивается запросом поиска.
+
+        Команды калибровки не подтверждаются гирляндой: при потере команды
+        продолжает гореть предыдущий светодиод. Анализатор снимков помечает
+        такие кадры ненайденными, эти светодиоды можно пройти повторно
+        отдельным вызовом. В сетях с потерями `repeat` отправляет каждую
+        команду несколько раз подряд.
+
+        :param leds: Номера светодиодов в порядке обхода.
+        :param capture: Функция снимка кадра, получает номер горящего светодиода.
+        :param dwell: Пауза от отправки команды до снимка в секундах.
+        :param settle: Время вывода кадра гирляндой (при расчете `dwell` по RTT).
+        :param repeat: Сколько раз отправлять каждую команду.
+
+        :return: Статистика: количество светодиодов, пауза, общее время и
+            среднее время на светодиод.
+        """
+        if dwell is None and self.rtt.srtt is None:
+            self.ping()
+        if dwell is None:
+            dwell = self.calibration_dwell(settle)
 
+        self.start_calibration()
+        started = time.monotonic()
+        count = 0
 
-if __name__ == "__main__":
-    net_ip = input("Введите ip адрес сети. Например 192.168.0.255\n")
+        try:
+            for index in leds:
+                sent = time.monotonic()
+                request_data = bytes([ord("G"), ord("T"), 3, 1, index // 100, index % 100])
+                for _ in range(repeat):
+                    # Интервалы задает dwell, пауза клиента не нужна
+                    self.sock(request_data, gap=0.0)
+                delay = sent + dwell - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                capture(index)
+                count += 1
+        finally:
+            self.stop_calibration()
+
+        duration = time.monotonic() - started
+        return {
+            "leds": count,
+            "dwell_ms": round(dwell * 1000, 1),
+            "duration_s": round(duration, 3),
+            "per_led_ms": round(duration / count * 1000, 1) if count else None,
+        }
 
-    twinks = GyverTwink.discover(net_ip)
+    def __repr__(self):
+        return f"GyverTwink({self.twink_ip})"
 
-    print("Найденные гирлянды:")
-    for twink in twinks:
-        print(twink)
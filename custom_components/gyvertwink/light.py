@@ -14,40 +14,11 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import DOMAIN
+from .const import CONF_EFFECTS, DOMAIN, EFFECTS
 from .coordinator import GyverTwinkCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-CONF_EFFECTS = "effects"
-
-
-EFFECTS = [
-    "Party grad",
-    "Raibow grad",
-    "Stripe grad",
-    "Sunset grad",
-    "Pepsi grad",
-    "Warm grad",
-    "Cold grad",
-    "Hot grad",
-    "Pink grad",
-    "Cyber grad",
-    "RedWhite grad",
-    "Party noise",
-    "Raibow noise",
-    "Stripe noise",
-    "Sunset noise",
-    "Pepsi noise",
-    "Warm noise",
-    "Cold noise",
-    "Hot noise",
-    "Pink noise",
-    "Cyber noise",
-    "RedWhite noise",
-]
-
-
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_HOST): cv.string,
@@ -61,7 +32,7 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
     """Настройка платформы через YAML (legacy)."""
     # Для YAML конфигурации создаем упрощенный entity без coordinator
     unique_id = config.get(CONF_HOST, "gyvertwink").replace(".", "_")
-    add_entities([GyverTwinkLight(config, unique_id, None)], True)
+    add_entities([GyverTwinkLight(config, unique_id, None)])
 
 
 async def async_setup_entry(
@@ -71,14 +42,20 @@ async def async_setup_entry(
     # Получаем coordinator из hass.data
     coordinator: GyverTwinkCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    # Создаем light entity с coordinator
+    # Создаем light entity с coordinator.
+    # Данные уже получены в async_config_entry_first_refresh, поэтому
+    # entity добавляется без update_before_add (без лишних запросов).
     entity = GyverTwinkLight(entry.options, entry.entry_id, coordinator)
-    async_add_entities([entity], True)
+    async_add_entities([entity])
 
 
 class GyverTwinkLight(CoordinatorEntity, LightEntity):
     """Light entity для управления GyverTwink гирляндой."""
 
+    _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
+    _attr_color_mode = ColorMode.BRIGHTNESS
+    _attr_supported_features = LightEntityFeature.EFFECT
+
     def __init__(
         self,
         config: dict,
@@ -95,24 +72,31 @@ class GyverTwinkLight(CoordinatorEntity, LightEntity):
         self.host = config[CONF_HOST]
         self._coordinator = coordinator
 
-        # Настройки light
-        self._attr_effect_list = config.get(CONF_EFFECTS, EFFECTS)
-        self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
-        self._attr_color_mode = ColorMode.BRIGHTNESS
-        self._attr_supported_features = LightEntityFeature.EFFECT
-
-        # Информация об устройстве
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-            manufacturer="@AlexGyver",
-            model="GyverTwink",
-            name=self._attr_name,
+        # Список эффектов общий с coordinator
+        self._attr_effect_list = (
+            coordinator.effect_list if coordinator else config.get(CONF_EFFECTS, EFFECTS)
         )
 
+        # Информация об устройстве (общая для всех entities гирлянды)
+        if coordinator:
+            self._attr_device_info = coordinator.device_info
+        else:
+            self._attr_device_info = DeviceInfo(
+                identifiers={(DOMAIN, unique_id)},
+                manufacturer="@AlexGyver",
+                model="GyverTwink",
+                name=self._attr_name,
+            )
+
         # Текущий эффект
         self._attr_effect = None
         self._current_effect_index = 0
 
+        # Начальное состояние из уже полученных данных coordinator
+        self._attr_is_on = None
+        self._attr_brightness = None
+        self._update_from_data()
+
     def debug(self, message):
         """Логирование отладочной информации."""
         _LOGGER.debug(f"{self.host} | Light | {message}")
@@ -196,15 +180,31 @@ class GyverTwinkLight(CoordinatorEntity, LightEntity):
         Этот метод вызывается автоматически когда coordinator получает новые данные.
         Все entities получают данные из одного запроса - нет множественных таймаутов.
         """
-        if not self._coordinator or not self.coordinator.data:
+        if not self._update_from_data():
             return
 
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            self.debug(f"Coordinator update: {self.coordinator.data}")
+
+        # Записываем обновленное состояние
+        self.async_write_ha_state()
+
+    def _update_from_data(self) -> bool:
+        """Обновляет атрибуты из данных coordinator без записи состояния."""
+        if not self._coordinator or not self.coordinator.data:
+            return False
+
         data = self.coordinator.data
-        self.debug(f"Coordinator update: {data}")
 
         # Обновляем состояние на основе данных от устройства
         self._attr_is_on = data.get("power", False)
         self._attr_brightness = int(data.get("brightness", 0))
 
-        # Записываем обновленное состояние
-        self.async_write_ha_state()
+        # Эффект мог смениться без участия entity (плейлистом, автосменой)
+        effect = self._coordinator.current_effect
+        if effect is not None and effect < len(self._attr_effect_list):
+            self._attr_effect = self._attr_effect_list[effect]
+            self._current_effect_index = effect
+        else:
+            self._attr_effect = None
+        return True
@@ -1,15 +1,11 @@
-import logging
-
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import DOMAIN
+from .const import DOMAIN
 from .coordinator import GyverTwinkCoordinator
-
-_LOGGER = logging.getLogger(__name__)
+from .entity import GyverTwinkEntity
+from .gyver_twink import speed_from_firmware, speed_to_firmware
 
 
 async def async_setup_entry(
@@ -29,51 +25,35 @@ async def async_setup_entry(
         GyverTwinkTimerValue(coordinator, entry.entry_id),
     ]
     
-    async_add_entities(entities, True)
+    # Данные уже получены coordinator, обновление перед добавлением не нужно
+    async_add_entities(entities)
 
 
-class GyverTwinkSpeed(CoordinatorEntity, NumberEntity):
+class GyverTwinkSpeed(GyverTwinkEntity, NumberEntity):
     """Number entity для управления скоростью эффекта (1-127)."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация Speed entity."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Speed"
-        self._attr_unique_id = f"{unique_id}_speed"
-        self._attr_native_min_value = 1
-        self._attr_native_max_value = 127
-        self._attr_native_step = 1
-        self._attr_mode = NumberMode.SLIDER
-        self._attr_icon = "mdi:speedometer"
-        
-        # Начальное значение
-        self._attr_native_value = 64
-        self._direction = False  # False = прямое, True = обратное
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | Speed | {message}")
-
-    def _calculate_speed_value(self, speed: int, direction: bool) -> int:
-        """Вычисляет итоговое значение скорости с учетом направления.
-        
-        Протокол GyverTwink: 128 - центр, <128 - вперед, >128 - назад.
-        """
-        if direction:
-            return 128 + speed
-        else:
-            return 128 - speed
+    _key = "speed"
+    _log_name = "Speed"
+    _attr_name = "Gyver Twink Speed"
+    _attr_native_min_value = 1
+    _attr_native_max_value = 127
+    _attr_native_step = 1
+    _attr_mode = NumberMode.SLIDER
+    _attr_icon = "mdi:speedometer"
+    _attr_native_value = 64
+    _direction = False  # False = прямое, True = обратное
+
+    def _update_from_data(self) -> None:
+        """Обновляет значение из известных параметров текущего эффекта."""
+        speed = self.coordinator.effect_param("speed")
+        if speed is not None and speed != 128:
+            self._attr_native_value, self._direction = speed_from_firmware(speed)
 
     async def async_set_native_value(self, value: float) -> None:
         """Устанавливает скорость эффекта."""
         try:
             speed = int(value)
-            final_speed = self._calculate_speed_value(speed, self._direction)
+            final_speed = speed_to_firmware(speed, self._direction)
             
             await self.coordinator.async_set_speed(final_speed)
             
@@ -92,30 +72,24 @@ class GyverTwinkSpeed(CoordinatorEntity, NumberEntity):
         self._direction = direction
 
 
-class GyverTwinkScale(CoordinatorEntity, NumberEntity):
+class GyverTwinkScale(GyverTwinkEntity, NumberEntity):
     """Number entity для управления масштабом (пятном) эффекта."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация Scale entity."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Scale"
-        self._attr_unique_id = f"{unique_id}_scale"
-        self._attr_native_min_value = 1
-        self._attr_native_max_value = 255
-        self._attr_native_step = 1
-        self._attr_mode = NumberMode.SLIDER
-        self._attr_icon = "mdi:resize"
-        
-        self._attr_native_value = 128
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | Scale | {message}")
+    _key = "scale"
+    _log_name = "Scale"
+    _attr_name = "Gyver Twink Scale"
+    _attr_native_min_value = 1
+    _attr_native_max_value = 255
+    _attr_native_step = 1
+    _attr_mode = NumberMode.SLIDER
+    _attr_icon = "mdi:resize"
+    _attr_native_value = 128
+
+    def _update_from_data(self) -> None:
+        """Обновляет значение из известных параметров текущего эффекта."""
+        scale = self.coordinator.effect_param("scale")
+        if scale is not None:
+            self._attr_native_value = scale
 
     async def async_set_native_value(self, value: float) -> None:
         """Устанавливает масштаб эффекта."""
@@ -133,40 +107,27 @@ class GyverTwinkScale(CoordinatorEntity, NumberEntity):
             raise
 
 
-class GyverTwinkChangePeriod(CoordinatorEntity, NumberEntity):
+class GyverTwinkChangePeriod(GyverTwinkEntity, NumberEntity):
     """Number entity для управления периодом смены эффектов (1-10 минут)."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация ChangePeriod entity."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Change Period"
-        self._attr_unique_id = f"{unique_id}_change_period"
-        self._attr_native_min_value = 1
-        self._attr_native_max_value = 10
-        self._attr_native_step = 1
-        self._attr_mode = NumberMode.SLIDER
-        self._attr_icon = "mdi:timer-outline"
-        self._attr_native_unit_of_measurement = "min"
-        
-        self._attr_native_value = 5
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
-
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | ChangePeriod | {message}")
 
-    def _handle_coordinator_update(self) -> None:
-        """Обработка обновления данных от coordinator."""
+    _key = "change_period"
+    _log_name = "ChangePeriod"
+    _attr_name = "Gyver Twink Change Period"
+    _attr_native_min_value = 1
+    _attr_native_max_value = 10
+    _attr_native_step = 1
+    _attr_mode = NumberMode.SLIDER
+    _attr_icon = "mdi:timer-outline"
+    _attr_native_unit_of_measurement = "min"
+    _attr_native_value = 5
+
+    def _update_from_data(self) -> None:
+        """Обновляет значение из данных coordinator без записи состояния."""
         if self.coordinator.data:
             # Получаем актуальное значение от устройства
             period = self.coordinator.data.get("change_period")
             if period is not None:
                 self._attr_native_value = period
-        self.async_write_ha_state()
 
     async def async_set_native_value(self, value: float) -> None:
         """Устанавливает период смены эффектов."""
@@ -184,39 +145,26 @@ class GyverTwinkChangePeriod(CoordinatorEntity, NumberEntity):
             raise
 
 
-class GyverTwinkLEDAmount(CoordinatorEntity, NumberEntity):
+class GyverTwinkLEDAmount(GyverTwinkEntity, NumberEntity):
     """Number entity для настройки количества светодиодов."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация LEDAmount entity."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink LED Amount"
-        self._attr_unique_id = f"{unique_id}_led_amount"
-        self._attr_native_min_value = 1
-        self._attr_native_max_value = 1000
-        self._attr_native_step = 1
-        self._attr_mode = NumberMode.BOX
-        self._attr_icon = "mdi:led-strip-variant"
-        
-        self._attr_native_value = 100
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | LEDAmount | {message}")
-
-    def _handle_coordinator_update(self) -> None:
-        """Обработка обновления данных от coordinator."""
+    _key = "led_amount"
+    _log_name = "LEDAmount"
+    _attr_name = "Gyver Twink LED Amount"
+    _attr_native_min_value = 1
+    _attr_native_max_value = 1000
+    _attr_native_step = 1
+    _attr_mode = NumberMode.BOX
+    _attr_icon = "mdi:led-strip-variant"
+    _attr_native_value = 100
+
+    def _update_from_data(self) -> None:
+        """Обновляет значение из данных coordinator без записи состояния."""
         if self.coordinator.data:
             # Получаем актуальное количество LED от устройства
             leds = self.coordinator.data.get("leds")
             if leds is not None:
                 self._attr_native_value = leds
-        self.async_write_ha_state()
 
     async def async_set_native_value(self, value: float) -> None:
         """Устанавливает количество светодиодов."""
@@ -234,40 +182,27 @@ class GyverTwinkLEDAmount(CoordinatorEntity, NumberEntity):
             raise
 
 
-class GyverTwinkTimerValue(CoordinatorEntity, NumberEntity):
+class GyverTwinkTimerValue(GyverTwinkEntity, NumberEntity):
     """Number entity для настройки времени таймера выключения (1-240 минут)."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация TimerValue entity."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Turn Off In"
-        self._attr_unique_id = f"{unique_id}_timer_value"
-        self._attr_native_min_value = 1
-        self._attr_native_max_value = 240
-        self._attr_native_step = 1
-        self._attr_mode = NumberMode.SLIDER
-        self._attr_icon = "mdi:timer-off-outline"
-        self._attr_native_unit_of_measurement = "min"
-        
-        self._attr_native_value = 60
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
-
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | TimerValue | {message}")
 
-    def _handle_coordinator_update(self) -> None:
-        """Обработка обновления данных от coordinator."""
+    _key = "timer_value"
+    _log_name = "TimerValue"
+    _attr_name = "Gyver Twink Turn Off In"
+    _attr_native_min_value = 1
+    _attr_native_max_value = 240
+    _attr_native_step = 1
+    _attr_mode = NumberMode.SLIDER
+    _attr_icon = "mdi:timer-off-outline"
+    _attr_native_unit_of_measurement = "min"
+    _attr_native_value = 60
+
+    def _update_from_data(self) -> None:
+        """Обновляет значение из данных coordinator без записи состояния."""
         if self.coordinator.data:
             # Получаем актуальное значение таймера от устройства
             timer_value = self.coordinator.data.get("timer_value")
             if timer_value is not None:
                 self._attr_native_value = timer_value
-        self.async_write_ha_state()
 
     async def async_set_native_value(self, value: float) -> None:
         """Устанавливает время таймера выключения."""
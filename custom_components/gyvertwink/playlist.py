@@ -0,0 +1,197 @@
+"""Плейлист эффектов GyverTwink на стороне интеграции.
+
+Прошивка умеет только перебирать избранные эффекты с шагом от 1 до 10 минут.
+Плейлист позволяет задать для каждого эффекта свои масштаб, скорость и
+длительность (в том числе меньше минуты). Шаги запускаются таймерами event loop
+без опроса устройства, а состояние плейлиста сохраняется в хранилище Home
+Assistant и восстанавливается после перезапуска.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import GyverTwinkCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Минимальная длительность шага: быстрее гирлянда не успевает применить команды
+MIN_DURATION = 1.0
+
+
+@dataclass
+class PlaylistStep:
+    """Шаг плейлиста.
+
+    `speed` (0-127) и `direction` - как в сервисе apply: не заданное значение
+    берется из эффекта (см. `GyverTwinkCoordinator.firmware_speed`).
+    """
+
+    effect: int
+    duration: float
+    scale: int | None = None
+    speed: int | None = None
+    direction: bool | None = None
+
+
+class GyverTwinkPlaylist:
+    """Плейлист эффектов одной гирлянды."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: GyverTwinkCoordinator):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.steps: list[PlaylistStep] = []
+        self.repeat = True
+        self.index = 0
+        self.step_started = 0.0
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.playlist.{coordinator.entry_id}"
+        )
+        self._unsub: Callable[[], None] | None = None
+
+    def debug(self, message):
+        """Логирование отладочной информации."""
+        _LOGGER.debug(f"{self.coordinator.host} | Playlist | {message}")
+
+    @property
+    def running(self) -> bool:
+        return self._unsub is not None
+
+    def parse_steps(self, steps: list[dict[str, Any]]) -> list[PlaylistStep]:
+        """Преобразует шаги из данных сервиса (эффект задается по имени)."""
+        result = []
+        for step in steps:
+            effect = step["effect"]
+            if effect not in self.coordinator.effect_list:
+                raise HomeAssistantError(f"Unknown effect: {effect}")
+
+            result.append(
+                PlaylistStep(
+                    effect=self.coordinator.effect_list.index(effect),
+                    duration=max(MIN_DURATION, float(step["duration"])),
+                    scale=step.get("scale"),
+                    speed=step.get("speed"),
+                    direction=step.get("direction"),
+                )
+            )
+        return result
+
+    async def async_start(self, steps: list[PlaylistStep], repeat: bool = True) -> None:
+        """Запускает плейлист с первого шага."""
+        self._cancel()
+        self.steps = steps
+        self.repeat = repeat
+        self.index = 0
+        await self._async_run_step()
+
+    async def async_stop(self) -> None:
+        """Останавливает плейлист и удаляет сохраненное состояние."""
+        self._cancel()
+        self.steps = []
+        await self._store.async_remove()
+        self.debug("Stopped")
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Останавливает таймер без удаления состояния (выгрузка entry)."""
+        self._cancel()
+
+    async def async_restore(self) -> None:
+        """Продолжает сохраненный плейлист с учетом прошедшего времени."""
+        stored = await self._store.async_load()
+        if not stored or not stored.get("steps"):
+            return
+
+        self.steps = [PlaylistStep(**step) for step in stored["steps"]]
+        self.repeat = stored["repeat"]
+        index = stored["index"]
+        elapsed = time.time() - stored["step_started"]
+
+        # Пропускаем шаги, которые должны были закончиться за время простоя
+        total = sum(step.duration for step in self.steps)
+        if self.repeat and elapsed > total:
+            elapsed %= total
+        while elapsed >= self.steps[index].duration:
+            elapsed -= self.steps[index].duration
+            index += 1
+            if index >= len(self.steps):
+                if not self.repeat:
+                    await self._store.async_remove()
+                    self.steps = []
+                    return
+                index = 0
+
+        self.index = index
+        self.debug(f"Restored at step {index}")
+        await self._async_run_step(remaining=self.steps[index].duration - elapsed)
+
+    def _cancel(self) -> None:
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    async def _async_run_step(self, remaining: float | None = None) -> None:
+        """Отправляет команды текущего шага и планирует следующий."""
+        step = self.steps[self.index]
+        try:
+            await self._async_apply(step)
+        except (HomeAssistantError, TimeoutError, OSError) as err:
+            # Недоступная гирлянда или потерянный ответ не останавливают плейлист
+            self.debug(f"Step {self.index} failed: {err}")
+        except Exception:  # noqa
+            # Непредвиденная ошибка тоже не должна останавливать плейлист
+            _LOGGER.exception(
+                f"{self.coordinator.host} | Playlist | Step {self.index} failed"
+            )
+
+        duration = step.duration if remaining is None else remaining
+        self.step_started = time.time() - (step.duration - duration)
+        self._store.async_delay_save(self._data_to_save, 1)
+        self._unsub = async_call_later(self.hass, duration, self._async_next)
+
+    async def _async_apply(self, step: PlaylistStep) -> None:
+        """Выбирает эффект и отправляет только отличающиеся параметры."""
+        coordinator = self.coordinator
+        params = await coordinator.async_select_effect(step.effect, refresh=False)
+        params = params or {}
+
+        if step.scale is not None and params.get("scale") != step.scale:
+            await coordinator.async_set_scale(step.scale)
+        if step.speed is not None or step.direction is not None:
+            speed = coordinator.firmware_speed(step.speed, step.direction)
+            if params.get("speed") != speed:
+                await coordinator.async_set_speed(speed)
+
+        coordinator.async_update_listeners()
+        self.debug(f"Step {self.index}: effect {step.effect}")
+
+    async def _async_next(self, _now) -> None:
+        self._unsub = None
+        self.index += 1
+        if self.index >= len(self.steps):
+            if not self.repeat:
+                await self.async_stop()
+                return
+            self.index = 0
+        await self._async_run_step()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "steps": [asdict(step) for step in self.steps],
+            "repeat": self.repeat,
+            "index": self.index,
+            "step_started": self.step_started,
+        }
@@ -0,0 +1,264 @@
+"""Решения координатора GyverTwink без зависимости от Home Assistant.
+
+Координатор (coordinator.py) выполняет запросы и планирует задачи, а когда
+отправлять команду или запрос, решают классы этого модуля. Время и сами
+запросы передаются вызывающим, поэтому решения проверяются в тестах без
+Home Assistant.
+"""
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CommandElider:
+    """
+    Пропуск повторных команд установки параметра.
+
+    Известное значение параметра - из опроса или из последней отправленной
+    команды, смотря что новее. Команда не отправляется, если значение совпадает
+    с известным и известно не дольше `freshness` секунд. Поэтому A, B, A
+    отправляются тремя командами, даже если опрос после B еще не прошел.
+
+        elider.polled(settings, now)
+        if not elider.is_current("brightness", 50, now):
+            twink.set_brightness(50)
+            elider.sent("brightness", 50, now)
+    """
+
+    def __init__(self, freshness: float) -> None:
+        """
+        :param freshness: Сколько секунд известное значение считается верным.
+        """
+        self.freshness = freshness
+        self._known: dict[Hashable, tuple[Any, float]] = {}
+
+    def polled(self, data: Mapping[str, Any], now: float) -> None:
+        """Учитывает настройки, прочитанные у гирлянды."""
+        for key, value in data.items():
+            self._known[key] = (value, now)
+
+    def sent(self, key: Hashable, value: Any, now: float) -> None:
+        """Учитывает отправленную команду."""
+        self._known[key] = (value, now)
+
+    def is_current(self, key: Hashable, value: Any, now: float) -> bool:
+        """Совпадает ли значение со свежим известным состоянием гирлянды."""
+        current, known_at = self._known.get(key, (None, 0.0))
+        if current is None or now - known_at > self.freshness:
+            return False
+        if isinstance(current, bool):
+            return current == bool(value)
+        return current == value
+
+
+class DeviceOffline(Exception):
+    """Гирлянда недоступна: проверочный запрос остался без ответа."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker опроса гирлянды.
+
+    После `threshold` неудачных опросов подряд гирлянда считается недоступной
+    (breaker открыт): вместо полного опроса выполняется короткий проверочный
+    запрос, а интервал между проверками удваивается от `min_interval` до
+    `max_interval`. Первый ответ гирлянды закрывает breaker.
+
+        data = await breaker.async_call(async_read_settings, async_ping)
+
+    Атрибуты:
+        - `failures`: Количество неудачных опросов подряд.
+        - `open`: Открыт ли breaker.
+        - `probe_interval`: Интервал до следующей проверки.
+    """
+
+    def __init__(
+        self, threshold: int, min_interval: timedelta, max_interval: timedelta
+    ) -> None:
+        self.threshold = threshold
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.failures = 0
+        self.open = False
+        self.probe_interval = min_interval
+
+    async def async_call(
+        self, read: Callable[[], Awaitable[T]], probe: Callable[[], Awaitable[bool]]
+    ) -> T:
+        """
+        Опрос гирлянды через breaker.
+
+        :param read: Полный опрос; исключение считается неудачей.
+        :param probe: Проверочный запрос; True - гирлянда ответила.
+
+        :raise DeviceOffline: Breaker открыт и гирлянда не ответила на проверку,
+            опрос не выполнялся.
+        """
+        if self.open:
+            if not await probe():
+                self.probe_interval = min(self.probe_interval * 2, self.max_interval)
+                raise DeviceOffline("Device is offline")
+            self.succeeded()
+
+        try:
+            result = await read()
+        except Exception:
+            self.failed()
+            raise
+        self.succeeded()
+        return result
+
+    def failed(self) -> None:
+        """Учитывает неудачный опрос."""
+        self.failures += 1
+        if self.failures >= self.threshold and not self.open:
+            self.open = True
+            self.probe_interval = self.min_interval
+
+    def succeeded(self) -> None:
+        """Учитывает ответ гирлянды (в том числе на общий broadcast-опрос)."""
+        self.failures = 0
+        self.open = False
+
+
+class KeepWarm:
+    """
+    Keep-warm: короткие проверочные запросы между опросами, чтобы радиомодуль
+    гирлянды не засыпал перед командами пользователя.
+
+    Интервал выучен по замерам RTT (`WarmthTracker.interval` клиента). Если
+    гирлянда выключена или команд не было `interaction_window` секунд,
+    интервал увеличивается в `relaxed_factor` раз. Любой запрос клиента тоже
+    прогревает гирлянду, поэтому проверка нужна только после простоя, а при
+    интервале не короче опроса ее заменяет сам опрос.
+
+    :param twink: Клиент гирлянды (`GyverTwink`): `warmth` и `last_reqest_time`.
+    :param poll_interval: Интервал опроса в секундах.
+    """
+
+    # Минимальная задержка до следующей проверки
+    MIN_DELAY = 0.5
+
+    def __init__(
+        self,
+        twink,
+        poll_interval: float,
+        interaction_window: float,
+        relaxed_factor: float,
+    ) -> None:
+        self.twink = twink
+        self.poll_interval = poll_interval
+        self.interaction_window = interaction_window
+        self.relaxed_factor = relaxed_factor
+
+    def interval(self, now: float, last_interaction: float, power: bool) -> float:
+        """Интервал проверок в секундах."""
+        interval = self.twink.warmth.interval
+        if now - last_interaction > self.interaction_window or not power:
+            interval *= self.relaxed_factor
+        return interval
+
+    def delay(self, now: float, last_interaction: float, power: bool) -> float:
+        """Задержка до следующей проверки с учетом последнего запроса."""
+        idle = now - self.twink.last_reqest_time
+        return max(self.MIN_DELAY, self.interval(now, last_interaction, power) - idle)
+
+    def due(self, now: float, last_interaction: float, power: bool, offline: bool) -> bool:
+        """Нужна ли проверка сейчас."""
+        interval = self.interval(now, last_interaction, power)
+        idle = now - self.twink.last_reqest_time
+        return not offline and idle >= interval * 0.9 and interval < self.poll_interval
+
+
+class EffectPrefetch:
+    """
+    Предзагрузка параметров эффектов.
+
+    Пока гирлянда выключена, эффекты выбираются по очереди (выбор не виден) и
+    их параметры запоминаются, затем выбирается текущий эффект. Полный обход
+    повторяется не чаще `interval` секунд, попытка после неудачи - не раньше
+    `retry` секунд. Включение гирлянды или команда пользователя останавливают
+    обход (`cancel`).
+
+    :param twink: Клиент гирлянды (`GyverTwink`): `read_effects` и `select_effect`.
+
+    Атрибуты:
+        - `prefetched`: Время последнего полного обхода (time.time), 0 - не было.
+        - `cancel`: Событие остановки обхода.
+    """
+
+    def __init__(self, twink, interval: float, retry: float) -> None:
+        self.twink = twink
+        self.interval = interval
+        self.retry = retry
+        self.prefetched = 0.0
+        self.cancel = threading.Event()
+        self._attempt = float("-inf")
+
+    def should_start(
+        self,
+        power: bool,
+        busy: bool,
+        current_effect: Optional[int],
+        complete: bool,
+        now: float,
+        wall_now: float,
+    ) -> bool:
+        """
+        Нужно ли начать обход по результату опроса; True отмечает попытку.
+
+        :param power: Включена ли гирлянда (включение останавливает обход).
+        :param busy: Обход или подбор паузы уже идут, либо предзагрузка отключена.
+        :param current_effect: Текущий эффект: без него выбор гирлянды не восстановить.
+        :param complete: Известны ли параметры всех эффектов.
+        :param now: Монотонное время.
+        :param wall_now: Время time.time().
+        """
+        if power:
+            self.cancel.set()
+            return False
+        if busy or current_effect is None or now - self._attempt < self.retry:
+            return False
+        if complete and wall_now - self.prefetched < self.interval:
+            return False
+
+        self.cancel.clear()
+        self._attempt = now
+        return True
+
+    async def async_run(
+        self,
+        count: int,
+        current_effect: Callable[[], Optional[int]],
+        run_job: Callable[..., Awaitable[Any]],
+        wall_now: Callable[[], float] = time.time,
+    ) -> tuple[dict[int, dict], Optional[int]]:
+        """
+        Обходит эффекты 0..count-1 и восстанавливает текущий эффект.
+
+        :param current_effect: Текущий эффект после обхода (его могла сменить
+            команда пользователя во время обхода).
+        :param run_job: Выполнение блокирующей функции клиента
+            (`hass.async_add_executor_job`).
+
+        :return: Прочитанные параметры эффектов (вместе с восстановленным)
+            и восстановленный эффект.
+        """
+        effects = await run_job(
+            partial(self.twink.read_effects, range(count), cancel=self.cancel)
+        )
+        complete = not self.cancel.is_set() and len(effects) == count
+
+        restore = current_effect()
+        if restore is not None:
+            restored = await run_job(self.twink.select_effect, restore)
+            if restored:
+                effects[restore] = restored
+
+        if complete:
+            self.prefetched = wall_now()
+        return effects, restore
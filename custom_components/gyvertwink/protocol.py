@@ -0,0 +1,510 @@
+"""Протокол обмена с гирляндой GyverTwink без ввода-вывода (sans-I/O).
+
+`ProtocolEngine` содержит всю логику запроса: паузу между пакетами на
+гирлянду (`Pacer`), ожидание ответа с таймаутом по RTT, повторы, дубликат запроса
+(hedging) и проверку ответа: префикса GT и байта команды. Движок не открывает сокеты, не спит и не
+читает часы: драйвер передает ему события с текущим временем, а забирает
+действия.
+
+    engine.request(frame, now, wait_answer=True)   # новый запрос
+    engine.datagram_received(data, now)            # принят пакет
+    engine.tick(now)                               # наступило время таймера
+    engine.events()                                # Send / ArmTimer / Done
+
+Запросы выполняются строго по одному в порядке поступления: ответы гирлянды
+не содержат номера запроса, поэтому одновременно ожидать можно только один.
+Драйверы - синхронный `GyverTwink.sock()` и асинхронный `transport.AsyncGyverTwink`
+(на нем работают шлюз и шоу); в тестах время подставляется вручную.
+"""
+from collections import deque
+from typing import NamedTuple, Optional
+
+PREFIX = b"GT"
+
+
+class RttEstimator:
+    """
+    Оценка времени ответа гирлянды и таймаута ожидания (как RTO в TCP, RFC 6298).
+
+    Сглаженное RTT и его разброс обновляются по каждому однозначному ответу
+    (алгоритм Карна: ответы на повторные запросы не учитываются). Таймаут
+    `srtt + 4 * rttvar` ограничивается диапазоном [min_timeout, max_timeout]
+    и удваивается после каждого истекшего ожидания до следующего замера.
+
+    Атрибуты:
+        - `srtt`: Сглаженное RTT в секундах (None до первого замера).
+        - `rttvar`: Сглаженное отклонение RTT в секундах.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(
+        self,
+        initial_timeout: float = 1.0,
+        min_timeout: float = 0.05,
+        max_timeout: float = 2.0,
+        window: int = 32,
+    ) -> None:
+        """
+        :param initial_timeout: Таймаут до первого замера RTT.
+        :param min_timeout: Нижняя граница таймаута.
+        :param max_timeout: Верхняя граница таймаута.
+        :param window: Количество последних замеров для расчета p95.
+        """
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.samples = deque(maxlen=window)
+        self._backoff = 1
+
+    def update(self, rtt: float) -> None:
+        """Добавляет замер RTT (в секундах)."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += self.BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.ALPHA * (rtt - self.srtt)
+
+        self.samples.append(rtt)
+        self._backoff = 1
+
+    def backoff(self) -> None:
+        """Удваивает таймаут после истекшего ожидания ответа."""
+        self._backoff = min(self._backoff * 2, 64)
+
+    @property
+    def timeout(self) -> float:
+        """Текущий таймаут ожидания ответа в секундах."""
+        if self.srtt is None:
+            rto = self.initial_timeout
+        else:
+            rto = self.srtt + self.K * self.rttvar
+
+        # Удваивается уже ограниченный снизу таймаут: иначе при RTT намного
+        # меньше min_timeout повторы ждут столько же, сколько первая попытка
+        return min(self.max_timeout, max(self.min_timeout, rto) * self._backoff)
+
+    @property
+    def p95(self) -> Optional[float]:
+        """95-й перцентиль последних замеров RTT (None, если замеров мало)."""
+        if len(self.samples) < 4:
+            return None
+
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class WarmthTracker:
+    """
+    Зависимость времени ответа от паузы перед запросом.
+
+    Гирлянды на ESP8266 в режиме modem-sleep отвечают на первый пакет после
+    простоя заметно медленнее. Замеры RTT раскладываются по корзинам длительности
+    простоя (0-1, 1-2, 2-4, ... секунд), по ним определяются RTT "прогретого"
+    устройства, RTT первого пакета после простоя и максимальная пауза, после
+    которой устройство еще отвечает быстро.
+
+    Атрибуты:
+        - `warm_rtt`: RTT после короткого простоя в секундах (или None).
+        - `first_packet_rtt`: RTT первого пакета после долгого простоя (или None).
+    """
+
+    # Верхние границы корзин простоя в секундах
+    BUCKETS = (1, 2, 4, 8, 16, 32, float("inf"))
+    ALPHA = 1 / 4
+    # Во сколько раз RTT может превышать прогретое, оставаясь "теплым"
+    COLD_FACTOR = 1.5
+
+    def __init__(self, default_interval: float = 5.0) -> None:
+        self.default_interval = default_interval
+        self.rtt: list[Optional[float]] = [None] * len(self.BUCKETS)
+        self.warm_rtt: Optional[float] = None
+        self.first_packet_rtt: Optional[float] = None
+
+    def _bucket(self, idle: float) -> int:
+        return next(
+            (i for i, limit in enumerate(self.BUCKETS) if idle < limit), len(self.BUCKETS) - 1
+        )
+
+    def update(self, idle: float, rtt: float) -> None:
+        """Добавляет замер RTT после простоя `idle` секунд."""
+        index = self._bucket(idle)
+        current = self.rtt[index]
+        self.rtt[index] = rtt if current is None else current + self.ALPHA * (rtt - current)
+
+        known = [value for value in self.rtt if value is not None]
+        self.warm_rtt = known[0]
+        self.first_packet_rtt = known[-1] if len(known) > 1 else None
+
+    def rtt_after(self, idle: float) -> Optional[float]:
+        """Ожидаемое RTT после простоя `idle` секунд (None, если не измерено)."""
+        return self.rtt[self._bucket(idle)]
+
+    @property
+    def interval(self) -> float:
+        """Максимальная пауза, после которой устройство еще отвечает быстро."""
+        if self.warm_rtt is None:
+            return self.default_interval
+
+        interval = None
+        for limit, value in zip(self.BUCKETS, self.rtt):
+            if value is None:
+                continue
+            if value > self.warm_rtt * self.COLD_FACTOR:
+                break
+            interval = limit
+
+        if interval is None or interval == float("inf"):
+            return self.default_interval if interval is None else 30.0
+        # Прогреваем с запасом, до наступления медленной корзины
+        return max(1.0, min(30.0, interval * 0.8))
+
+
+class Pacer:
+    """
+    Минимальная пауза между пакетами на гирлянду и контроль потерь.
+
+    Пауза `gap` подбирается замером (`GyverTwink.tune_pacing`) и сохраняется.
+    По каждому запросу с ответом обновляется сглаженная доля потерь; если она
+    долго держится выше `LOSS_LIMIT`, пауза удваивается и выставляется флаг
+    `needs_tuning`, чтобы владелец клиента повторил замер.
+
+    Атрибуты:
+        - `gap`: Минимальная пауза между пакетами в секундах.
+        - `tuned`: Подобрана ли пауза замером.
+        - `loss`: Сглаженная доля потерянных ответов.
+    """
+
+    DEFAULT_GAP = 0.2
+    MIN_GAP = 0.01
+    MAX_GAP = 1.0
+
+    # Паузы, которые проверяются при замере, от безопасной к быстрой
+    CANDIDATES = (0.2, 0.12, 0.08, 0.05, 0.03, 0.02, 0.01)
+
+    LOSS_ALPHA = 0.1
+    LOSS_LIMIT = 0.3
+    # Сколько ответов учитывается до первого решения о замедлении
+    MIN_SAMPLES = 10
+
+    __slots__ = ("gap", "tuned", "loss", "samples", "needs_tuning")
+
+    def __init__(self, gap: float = DEFAULT_GAP, tuned: bool = False) -> None:
+        self.gap = gap
+        self.tuned = tuned
+        self.loss = 0.0
+        self.samples = 0
+        self.needs_tuning = False
+
+    def pause(self, idle: float, gap: Optional[float] = None) -> float:
+        """Пауза перед пакетом после простоя `idle` секунд.
+
+        :param gap: Пауза вместо подобранной (замер паузы, пакетные команды).
+        """
+        return max(0.0, (self.gap if gap is None else gap) - idle)
+
+    def record(self, lost: bool) -> None:
+        """Учитывает ответ гирлянды или его потерю."""
+        self.samples += 1
+        self.loss += self.LOSS_ALPHA * ((1.0 if lost else 0.0) - self.loss)
+        if self.samples >= self.MIN_SAMPLES and self.loss > self.LOSS_LIMIT:
+            # Устойчивые потери: сразу замедляемся и просим новый замер
+            self.gap = min(self.MAX_GAP, max(self.gap * 2, self.DEFAULT_GAP))
+            self.needs_tuning = True
+            self.loss = 0.0
+            self.samples = 0
+
+    def learned(self, gap: float) -> None:
+        """Сохраняет паузу, подобранную замером."""
+        self.gap = max(self.MIN_GAP, min(self.MAX_GAP, gap))
+        self.tuned = True
+        self.needs_tuning = False
+        self.loss = 0.0
+        self.samples = 0
+
+
+# Нижняя граница таймаута первого пакета после простоя, пока RTT "холодного"
+# устройства не измерен: радиомодуль просыпается заметно дольше 50 мс
+COLD_MIN_TIMEOUT = 0.3
+# Запас таймаута над измеренным RTT первого пакета после простоя
+COLD_TIMEOUT_FACTOR = 2
+
+
+class Send(NamedTuple):
+    """Отправить пакет гирлянде."""
+
+    frame: bytes
+
+
+class ArmTimer(NamedTuple):
+    """Вызвать `tick` не раньше `deadline` (предыдущий таймер больше не нужен)."""
+
+    deadline: float
+
+
+class Done(NamedTuple):
+    """Запрос завершен: результат в `request.result` или ошибка в `request.error`."""
+
+    request: "Request"
+
+
+class Request:
+    """Запрос к гирлянде и его состояние в движке."""
+
+    __slots__ = (
+        "frame",
+        "wait_answer",
+        "timeout",
+        "retry",
+        "hedge",
+        "gap",
+        "done",
+        "result",
+        "error",
+        "idle",
+        "ready_at",
+        "attempt",
+        "started",
+        "deadline",
+        "hedge_at",
+        "hedged",
+        "invalid",
+    )
+
+    def __init__(
+        self,
+        frame: bytes,
+        wait_answer: bool = False,
+        timeout: Optional[float] = None,
+        retry: int = 1,
+        hedge: bool = False,
+        gap: Optional[float] = None,
+    ) -> None:
+        self.frame = frame
+        self.wait_answer = wait_answer
+        self.timeout = timeout
+        self.retry = retry
+        self.hedge = hedge
+        self.gap = gap
+        self.done = False
+        # Ответ без префикса GT (None для команд без ответа и некорректных ответов)
+        self.result: Optional[bytes] = None
+        self.error: Optional[Exception] = None
+
+        self.idle = 0.0
+        self.ready_at: Optional[float] = None
+        self.attempt = 0
+        self.started: Optional[float] = None
+        self.deadline = 0.0
+        self.hedge_at: Optional[float] = None
+        self.hedged = False
+        self.invalid = False
+
+
+class ProtocolEngine:
+    """
+    Очередь запросов к одной гирлянде.
+
+    :param rtt: Оценка RTT, по которой выбирается таймаут ожидания.
+    :param warmth: Зависимость RTT от простоя перед запросом.
+    :param pacer: Пауза между пакетами на гирлянду.
+    """
+
+    __slots__ = ("rtt", "warmth", "pacer", "last_request", "_queue", "_active", "_events")
+
+    def __init__(
+        self,
+        rtt: Optional[RttEstimator] = None,
+        warmth: Optional[WarmthTracker] = None,
+        pacer: Optional[Pacer] = None,
+    ) -> None:
+        self.rtt = rtt or RttEstimator()
+        self.warmth = warmth or WarmthTracker()
+        self.pacer = pacer or Pacer()
+        # Время завершения последнего запроса (в часах драйвера)
+        self.last_request = float("-inf")
+        # Обычно пуста: список дешевле deque для тысяч клиентов
+        self._queue: list[Request] = []
+        self._active: Optional[Request] = None
+        self._events: list = []
+
+    def request(
+        self,
+        frame: bytes,
+        now: float,
+        wait_answer: bool = False,
+        timeout: Optional[float] = None,
+        retry: int = 1,
+        hedge: bool = False,
+        gap: Optional[float] = None,
+    ) -> Request:
+        """
+        Ставит запрос в очередь.
+
+        :param frame: Пакет с префиксом GT.
+        :param now: Текущее время драйвера в секундах.
+        :param wait_answer: Ожидать ли ответ.
+        :param timeout: Таймаут ожидания. По умолчанию берется из оценки RTT.
+        :param retry: Количество повторов после таймаута.
+        :param hedge: Отправить дубликат, если ответа нет дольше p95 RTT.
+            Только для идемпотентных запросов на чтение.
+        :param gap: Пауза перед запросом вместо `pacer.gap`.
+
+        :return: Запрос; `done` станет True вместе с событием `Done`.
+        """
+        request = Request(frame, wait_answer, timeout, retry, hedge, gap)
+        self._queue.append(request)
+        self._advance(now)
+        return request
+
+    def datagram_received(self, data: bytes, now: float) -> None:
+        """Принят пакет от гирлянды."""
+        request = self._active
+        if request is None or request.started is None or not request.wait_answer:
+            return
+
+        if not data.startswith(PREFIX):
+            request.invalid = True
+            return
+
+        # Ответ повторяет байт команды: пакет с другим байтом - запоздавший
+        # ответ на прошлый запрос (или чужой пакет), ожидание продолжается
+        if len(data) <= len(PREFIX) or data[len(PREFIX)] != request.frame[len(PREFIX)]:
+            return
+
+        # RTT учитывается только для однозначных ответов (алгоритм Карна)
+        if request.attempt == 0 and not request.hedged:
+            rtt = now - request.started
+            self.rtt.update(rtt)
+            self.warmth.update(request.idle, rtt)
+
+        if request.timeout is None:
+            self.pacer.record(lost=False)
+        request.result = data[len(PREFIX):]
+        self._finish(request, now)
+
+    def tick(self, now: float) -> None:
+        """Продвигает таймеры активного запроса до времени `now`."""
+        request = self._active
+        if request is None:
+            return
+
+        if request.started is None:
+            if now >= request.ready_at:
+                self._start(request, now)
+            return
+
+        if now >= request.deadline:
+            if request.timeout is None:
+                self.rtt.backoff()
+                # Таймауты проверок доступности (явный timeout) не учитываются
+                self.pacer.record(lost=True)
+            request.attempt += 1
+            if request.attempt <= request.retry:
+                self._send_attempt(request, now)
+            else:
+                if not request.invalid:
+                    request.error = TimeoutError("Timeout")
+                self._finish(request, now)
+            return
+
+        if request.hedge_at is not None and not request.hedged and now >= request.hedge_at:
+            # Дубликат запроса: побеждает первый корректный ответ
+            request.hedged = True
+            self._events.append(Send(request.frame))
+            self._events.append(ArmTimer(request.deadline))
+
+    def events(self) -> list:
+        """Забирает накопленные действия для драйвера."""
+        events, self._events = self._events, []
+        return events
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """Ближайшее время, когда нужен `tick` (None, если очередь пуста)."""
+        request = self._active
+        if request is None:
+            return None
+        if request.started is None:
+            return request.ready_at
+        if request.hedge_at is not None and not request.hedged:
+            return min(request.deadline, request.hedge_at)
+        return request.deadline
+
+    @property
+    def awaiting_reply(self) -> bool:
+        """Ожидает ли активный запрос ответ гирлянды."""
+        request = self._active
+        return request is not None and request.started is not None
+
+    def _advance(self, now: float) -> None:
+        """Запускает следующий запрос очереди, если активного нет."""
+        while self._active is None and self._queue:
+            request = self._active = self._queue.pop(0)
+            request.idle = now - self.last_request
+            pause = self.pacer.pause(request.idle, request.gap)
+            if pause > 0:
+                request.idle += pause
+                request.ready_at = now + pause
+                self._events.append(ArmTimer(request.ready_at))
+                return
+            self._start(request, now)
+
+    def _start(self, request: Request, now: float) -> None:
+        if not request.wait_answer:
+            self._events.append(Send(request.frame))
+            self._finish(request, now)
+            return
+        self._send_attempt(request, now)
+
+    def _timeout(self, request: Request) -> float:
+        """Таймаут ожидания ответа на попытку запроса.
+
+        Короткий таймаут по RTT "прогретого" устройства действует, только пока
+        простой меньше интервала, после которого гирлянда еще отвечает быстро
+        (`WarmthTracker.interval`). Первый пакет после долгого простоя ждется
+        не меньше RTT, измеренного после такого же простоя, с запасом (или
+        `COLD_MIN_TIMEOUT`, пока его нет), чтобы не повторять запрос к
+        просыпающемуся радиомодулю.
+        """
+        if request.timeout is not None:
+            return request.timeout
+
+        wait = self.rtt.timeout
+        if request.attempt == 0 and request.idle >= self.warmth.interval:
+            cold = self.warmth.rtt_after(request.idle)
+            floor = COLD_MIN_TIMEOUT if cold is None else cold * COLD_TIMEOUT_FACTOR
+            wait = max(wait, min(floor, self.rtt.max_timeout))
+        return wait
+
+    def _send_attempt(self, request: Request, now: float) -> None:
+        wait = self._timeout(request)
+        hedge_after = self.rtt.p95 if request.hedge else None
+
+        request.started = now
+        request.deadline = now + wait
+        request.hedge_at = (
+            now + hedge_after if hedge_after is not None and hedge_after < wait else None
+        )
+        request.hedged = False
+        self._events.append(Send(request.frame))
+        self._events.append(ArmTimer(self.deadline))
+
+    def _finish(self, request: Request, now: float) -> None:
+        request.done = True
+        self.last_request = now
+        self._active = None
+        self._events.append(Done(request))
+        self._advance(now)
+
+
+def parse_effect(payload: bytes) -> Optional[dict]:
+    """Параметры эффекта из ответа на выбор эффекта (без префикса GT)."""
+    if len(payload) < 4 or payload[0] != 4:
+        return None
+    return {"favorite": bool(payload[1]), "scale": payload[2], "speed": payload[3]}
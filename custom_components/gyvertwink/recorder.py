@@ -0,0 +1,243 @@
+"""Запись и воспроизведение UDP-трафика GyverTwink.
+
+Журнал - компактный двоичный файл, в который только дописываются записи.
+Формат:
+
+    заголовок файла: b"GTRL", версия (1 байт), 3 байта резерва
+    запись:          время (float64, time.monotonic), направление (uint8),
+                     IPv4 (4 байта), порт (uint16), длина (uint16), данные
+
+Журнал включается передачей `TrafficRecorder` в клиент:
+
+    twink = GyverTwink("192.168.1.50", recorder=TrafficRecorder("gt.log"))
+
+Воспроизведение журнала через клиент на виртуальной гирлянде:
+
+    python -m custom_components.gyvertwink.recorder replay gt.log --speed 10
+    python -m custom_components.gyvertwink.recorder dump gt.log
+
+В Home Assistant журнал подключается к клиенту coordinator сервисом
+record_traffic, а сервис replay_traffic воспроизводит команды журнала через
+coordinator (`GyverTwinkCoordinator.async_send_frame`).
+"""
+import argparse
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Iterator, NamedTuple, Optional
+
+from .gyver_twink import GyverTwink, expects_reply
+
+MAGIC = b"GTRL"
+VERSION = 1
+FILE_HEADER = MAGIC + bytes([VERSION, 0, 0, 0])
+
+RECORD = struct.Struct("<dB4sHH")
+
+SENT = 0
+RECEIVED = 1
+
+
+class Record(NamedTuple):
+    """Запись журнала трафика."""
+
+    time: float
+    direction: int
+    host: str
+    port: int
+    data: bytes
+
+
+class TrafficRecorder:
+    """
+    Журнал отправленных и полученных пакетов с ротацией по размеру.
+
+    :param path: Путь к файлу журнала.
+    :param max_bytes: Размер файла, после которого начинается новый файл.
+    :param backups: Количество хранимых старых файлов (path.1, path.2, ...).
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024, backups: int = 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+        self._open()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER)
+            self._file.flush()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def record(self, direction: int, address: tuple, data: bytes) -> None:
+        """Записывает пакет в журнал."""
+        header = RECORD.pack(
+            time.monotonic(),
+            direction,
+            socket.inet_aton(address[0]),
+            address[1],
+            len(data),
+        )
+        with self._lock:
+            if self._file.closed:
+                # Журнал закрыт, пока клиент обменивался пакетами
+                return
+            if self._file.tell() + len(header) + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(header + data)
+            self._file.flush()
+
+    def record_sent(self, address: tuple, data: bytes) -> None:
+        self.record(SENT, address, data)
+
+    def record_received(self, address: tuple, data: bytes) -> None:
+        self.record(RECEIVED, address, data)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_log(path: str) -> Iterator[Record]:
+    """Читает журнал трафика через отображение файла в память."""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size <= len(FILE_HEADER):
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:4] != MAGIC:
+                raise ValueError(f"{path} is not a GyverTwink traffic log")
+
+            offset = len(FILE_HEADER)
+            size = len(data)
+            while offset + RECORD.size <= size:
+                ts, direction, host, port, length = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                if offset + length > size:
+                    # Оборванная последняя запись (запись прервана)
+                    break
+                yield Record(
+                    ts, direction, socket.inet_ntoa(host), port, data[offset : offset + length]
+                )
+                offset += length
+
+
+def replay(
+    path: str,
+    host: str = "127.0.0.1",
+    port: Optional[int] = None,
+    speed: float = 1.0,
+) -> dict:
+    """
+    Воспроизводит отправленные пакеты журнала через клиент GyverTwink.
+
+    Если `port` не указан, запускается виртуальная гирлянда на localhost.
+    Ответы сравниваются с записанными в журнале.
+
+    :param path: Путь к журналу.
+    :param host: Адрес гирлянды для воспроизведения.
+    :param port: Порт гирлянды (None - запустить виртуальную гирлянду).
+    :param speed: Ускорение времени (1 - исходные интервалы, 0 - без пауз).
+
+    :return: Статистика воспроизведения.
+    """
+    from .emulator import EmulatorThread
+
+    emulator = None
+    if port is None:
+        emulator = EmulatorThread(host).start()
+        port = emulator.port
+
+    twink = GyverTwink(host, port)
+    stats = {"sent": 0, "replies": 0, "timeouts": 0, "mismatches": 0}
+    records = list(read_log(path))
+    started = time.monotonic()
+    first = None
+
+    try:
+        for index, record in enumerate(records):
+            if record.direction != SENT:
+                continue
+
+            if first is None:
+                first = record.time
+            if speed > 0:
+                delay = (record.time - first) / speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            # Убираем паузу клиента: интервалы задает журнал
+            twink.last_reqest_time = 0
+            stats["sent"] += 1
+
+            if not expects_reply(record.data):
+                twink.sock(record.data)
+                continue
+
+            try:
+                reply = twink.sock(record.data, wait_answer=True)
+            except TimeoutError:
+                stats["timeouts"] += 1
+                continue
+
+            stats["replies"] += 1
+            recorded = next(
+                (r for r in records[index + 1 :] if r.direction == RECEIVED), None
+            )
+            if recorded is not None and reply is not None and b"GT" + reply != recorded.data:
+                stats["mismatches"] += 1
+    finally:
+        if emulator is not None:
+            emulator.stop()
+
+    stats["duration"] = round(time.monotonic() - started, 3)
+    return stats
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Журнал трафика GyverTwink")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump = commands.add_parser("dump", help="вывести записи журнала")
+    dump.add_argument("path")
+
+    play = commands.add_parser("replay", help="воспроизвести журнал")
+    play.add_argument("path")
+    play.add_argument("--host", default="127.0.0.1")
+    play.add_argument("--port", type=int, help="порт гирлянды (по умолчанию эмулятор)")
+    play.add_argument("--speed", type=float, default=1.0, help="ускорение, 0 - без пауз")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "dump":
+        first = None
+        for record in read_log(args.path):
+            first = record.time if first is None else first
+            arrow = "->" if record.direction == SENT else "<-"
+            print(
+                f"{record.time - first:10.3f} {arrow} "
+                f"{record.host}:{record.port} {record.data.hex(' ')}"
+            )
+    else:
+        print(replay(args.path, args.host, args.port, args.speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Фоновый поиск новых гирлянд.
+
+Пока добавлена хотя бы одна гирлянда, на broadcast-адрес каждого интерфейса Home
+Assistant периодически отправляется один запрос поиска. Для ответивших
+гирлянд, которые еще не добавлены (и не скрыты пользователем), запускается
+discovery flow - гирлянда появляется в разделе «Обнаружено». Интервал поиска
+растет, пока новых гирлянд нет (см. `DiscoveryBackoff`).
+"""
+from __future__ import annotations
+
+import logging
+from typing import Callable
+
+from homeassistant.config_entries import SOURCE_INTEGRATION_DISCOVERY
+from homeassistant.const import CONF_HOST, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import discovery_flow
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
+
+from .const import DOMAIN
+from .discovery import DiscoveryBackoff, async_broadcast
+
+_LOGGER = logging.getLogger(__name__)
+
+SCANNER_KEY = f"{DOMAIN}_scanner"
+
+# Первый поиск - через минуту после запуска Home Assistant
+FIRST_SCAN_DELAY = 60
+
+
+class GyverTwinkScanner:
+    """Периодический broadcast-поиск гирлянд."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.backoff = DiscoveryBackoff()
+        # Гирлянды, для которых discovery flow уже запускался
+        self.announced: set[str] = set()
+        self._unsub: Callable[[], None] | None = None
+        self._unsub_started: Callable[[], None] | None = None
+        self._unsub_stop: Callable[[], None] | None = None
+        self._stopped = False
+
+    @callback
+    def async_start(self) -> None:
+        """Запускает поиск после старта Home Assistant."""
+
+        @callback
+        def _started(_hass) -> None:
+            self._schedule(FIRST_SCAN_DELAY)
+
+        self._unsub_started = async_at_started(self.hass, _started)
+        self._unsub_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_stop
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Останавливает поиск (выгружена последняя гирлянда)."""
+        if self._unsub_started:
+            self._unsub_started()
+        if self._unsub_stop:
+            self._unsub_stop()
+        self._async_stop()
+
+    @callback
+    def _async_stop(self, _event=None) -> None:
+        self._stopped = True
+        self._unsub_started = None
+        self._unsub_stop = None
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    def _schedule(self, delay: float) -> None:
+        if not self._stopped:
+            self._unsub = async_call_later(self.hass, delay, self._async_scan)
+
+    def _known_hosts(self) -> set[str]:
+        """Адреса добавленных и скрытых пользователем гирлянд."""
+        known = set()
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            known.add(entry.options.get(CONF_HOST) or entry.data.get(CONF_HOST))
+            known.add(entry.unique_id)
+        return known
+
+    async def _async_scan(self, _now=None) -> None:
+        self._unsub = None
+        from homeassistant.components.network import async_get_ipv4_broadcast_addresses
+
+        found_new = False
+        try:
+            addresses = await async_get_ipv4_broadcast_addresses(self.hass)
+            found = await async_broadcast(addresses)
+        except Exception as err:  # noqa
+            _LOGGER.debug(f"Background discovery failed: {err}")
+            found = set()
+
+        known = self._known_hosts()
+        for host in sorted(found - known - self.announced):
+            _LOGGER.debug(f"Discovered new garland: {host}")
+            self.announced.add(host)
+            found_new = True
+            discovery_flow.async_create_flow(
+                self.hass,
+                DOMAIN,
+                context={"source": SOURCE_INTEGRATION_DISCOVERY},
+                data={CONF_HOST: host},
+            )
+
+        interval = self.backoff.next(found_new)
+        _LOGGER.debug(
+            f"Background discovery: {len(found)} garlands, next scan in {interval} s"
+        )
+        self._schedule(interval)
@@ -0,0 +1,396 @@
+"""Сервисы интеграции GyverTwink."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from functools import partial
+
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_PLAY_PLAYLIST = "play_playlist"
+SERVICE_STOP_PLAYLIST = "stop_playlist"
+SERVICE_APPLY = "apply"
+SERVICE_SET_FAVORITES = "set_favorites"
+SERVICE_PLAY_SHOW = "play_show"
+SERVICE_STOP_SHOW = "stop_show"
+SERVICE_RECORD_TRAFFIC = "record_traffic"
+SERVICE_REPLAY_TRAFFIC = "replay_traffic"
+
+# Сколько гирлянд одновременно получают команды сервисов apply и set_favorites
+APPLY_CONCURRENCY = 16
+
+ATTR_STEPS = "steps"
+ATTR_REPEAT = "repeat"
+ATTR_FAVORITES = "favorites"
+ATTR_SHOW = "show"
+ATTR_FILE = "file"
+ATTR_ENABLED = "enabled"
+ATTR_SPEED = "speed"
+ATTR_REAL_DEVICE = "real_device"
+
+# Скорость эффекта во всех сервисах: 0-127 (0 - остановка) и обратное
+# направление (см. GyverTwinkCoordinator.firmware_speed)
+SPEED_SCHEMA = {
+    vol.Optional("speed"): vol.All(vol.Coerce(int), vol.Range(min=0, max=127)),
+    vol.Optional("direction"): cv.boolean,
+}
+
+STEP_SCHEMA = vol.Schema(
+    {
+        vol.Required("effect"): cv.string,
+        vol.Required("duration"): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional("scale"): vol.All(vol.Coerce(int), vol.Range(min=1, max=255)),
+        **SPEED_SCHEMA,
+    }
+)
+
+DEVICE_SCHEMA = {vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string])}
+
+PLAY_PLAYLIST_SCHEMA = vol.Schema(
+    {
+        **DEVICE_SCHEMA,
+        vol.Required(ATTR_STEPS): vol.All(cv.ensure_list, [STEP_SCHEMA], vol.Length(min=1)),
+        vol.Optional(ATTR_REPEAT, default=True): cv.boolean,
+    }
+)
+
+STOP_PLAYLIST_SCHEMA = vol.Schema(DEVICE_SCHEMA)
+
+APPLY_SCHEMA = vol.Schema(
+    {
+        **DEVICE_SCHEMA,
+        vol.Optional("power"): cv.boolean,
+        vol.Optional("brightness"): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+        vol.Optional("effect"): cv.string,
+        vol.Optional("scale"): vol.All(vol.Coerce(int), vol.Range(min=1, max=255)),
+        **SPEED_SCHEMA,
+        vol.Optional("auto_change"): cv.boolean,
+        vol.Optional("random_change"): cv.boolean,
+        vol.Optional("change_period"): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+        vol.Optional("timer_active"): cv.boolean,
+        vol.Optional("timer_value"): vol.All(vol.Coerce(int), vol.Range(min=1, max=240)),
+    }
+)
+
+SET_FAVORITES_SCHEMA = vol.Schema(
+    {
+        **DEVICE_SCHEMA,
+        vol.Required(ATTR_FAVORITES): vol.All(
+            cv.ensure_list, [cv.string], vol.Length(min=1)
+        ),
+    }
+)
+
+PLAY_SHOW_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_SHOW, "source"): dict,
+            vol.Exclusive(ATTR_FILE, "source"): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_SHOW, ATTR_FILE),
+)
+
+RECORD_TRAFFIC_SCHEMA = vol.Schema(
+    {**DEVICE_SCHEMA, vol.Optional(ATTR_ENABLED, default=True): cv.boolean}
+)
+
+# По умолчанию журнал воспроизводится на виртуальной гирлянде на localhost,
+# настоящие гирлянды получают команды только с real_device: true
+REPLAY_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_SPEED, default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_REAL_DEVICE, default=False): cv.boolean,
+    }
+)
+
+
+def get_coordinators(hass: HomeAssistant, call: ServiceCall) -> dict:
+    """Coordinator для каждого устройства GyverTwink из данных сервиса."""
+    registry = dr.async_get(hass)
+    coordinators = {}
+    for device_id in call.data[ATTR_DEVICE_ID]:
+        device = registry.async_get(device_id)
+        if device is None:
+            raise HomeAssistantError(f"Unknown device: {device_id}")
+
+        for entry_id in device.config_entries:
+            coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+            if coordinator is not None:
+                coordinators[device_id] = coordinator
+                break
+        else:
+            raise HomeAssistantError(f"Device {device_id} is not a loaded GyverTwink")
+
+    return coordinators
+
+
+def resolve_file(hass: HomeAssistant, file: str) -> str:
+    """Путь к файлу относительно каталога конфигурации.
+
+    Читаются только файлы из allowlist_external_dirs, иначе сервис мог бы
+    прочитать любой файл Home Assistant.
+    """
+    path = hass.config.path(file)
+    if not hass.config.is_allowed_path(path):
+        raise HomeAssistantError(f"Access to {file} is not allowed")
+    return path
+
+
+async def async_replay_traffic(coordinator, records: list, speed: float) -> int:
+    """Воспроизводит отправленные пакеты журнала через coordinator.
+
+    :param records: Записи журнала (`recorder.Record`) для воспроизведения.
+    :param speed: Ускорение времени (1 - исходные интервалы, 0 - без пауз).
+
+    :return: Количество отправленных команд.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sent = 0
+    try:
+        for record in records:
+            if speed > 0:
+                delay = (record.time - records[0].time) / speed - (loop.time() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if await coordinator.async_send_frame(record.data):
+                sent += 1
+    except ValueError as err:
+        raise HomeAssistantError(str(err)) from err
+    finally:
+        await coordinator.async_request_refresh()
+    return sent
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Регистрация сервисов интеграции."""
+
+    async def async_play_playlist(call: ServiceCall) -> None:
+        playlists = [c.playlist for c in get_coordinators(hass, call).values()]
+        steps = [playlist.parse_steps(call.data[ATTR_STEPS]) for playlist in playlists]
+        await asyncio.gather(
+            *(
+                playlist.async_start(playlist_steps, call.data[ATTR_REPEAT])
+                for playlist, playlist_steps in zip(playlists, steps)
+            )
+        )
+
+    async def async_stop_playlist(call: ServiceCall) -> None:
+        await asyncio.gather(
+            *(c.playlist.async_stop() for c in get_coordinators(hass, call).values())
+        )
+
+    # Общий лимит для всех одновременных вызовов apply и set_favorites
+    apply_semaphore = asyncio.Semaphore(APPLY_CONCURRENCY)
+
+    async def async_run_device(coordinator, job) -> dict:
+        async with apply_semaphore:
+            started = time.monotonic()
+            result = {"host": coordinator.host, "success": True, "commands": 0}
+            try:
+                result["commands"] = await job(coordinator)
+            except Exception as err:  # noqa
+                result["success"] = False
+                result["error"] = str(err)
+            result["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+            return result
+
+    async def async_apply(call: ServiceCall) -> ServiceResponse:
+        coordinators = get_coordinators(hass, call)
+        target = {k: v for k, v in call.data.items() if k != ATTR_DEVICE_ID}
+        results = await asyncio.gather(
+            *(
+                async_run_device(c, lambda c: c.async_apply(target))
+                for c in coordinators.values()
+            )
+        )
+        return {"devices": dict(zip(coordinators, results))}
+
+    async def async_set_favorites(call: ServiceCall) -> ServiceResponse:
+        coordinators = get_coordinators(hass, call)
+        favorites = call.data[ATTR_FAVORITES]
+        results = await asyncio.gather(
+            *(
+                async_run_device(c, lambda c: c.async_set_favorites(favorites))
+                for c in coordinators.values()
+            )
+        )
+        return {"devices": dict(zip(coordinators, results))}
+
+    # Текущее шоу: одновременно играет только одно
+    show_stop: asyncio.Event | None = None
+
+    async def async_run_show(show, coordinators: dict, stop: asyncio.Event) -> dict:
+        from .show import async_play_show as async_play
+
+        nonlocal show_stop
+
+        # Команды шоу идут через coordinator: недоступные гирлянды, пропуск
+        # повторных команд и оценка текущего эффекта работают как для entities
+        async def send(alias: str, data: bytes) -> None:
+            await coordinators[alias].async_send_frame(data)
+
+        async def arm(alias: str) -> None:
+            await coordinators[alias].async_ping()
+
+        rtt = {alias: coordinator.twink.rtt for alias, coordinator in coordinators.items()}
+        try:
+            report = await async_play(show, stop, send, arm, rtt)
+        finally:
+            if show_stop is stop:
+                show_stop = None
+            for coordinator in set(coordinators.values()):
+                await coordinator.async_request_refresh()
+
+        _LOGGER.debug(f"Show finished: {report}")
+        return report
+
+    async def async_play_show(call: ServiceCall) -> ServiceResponse:
+        from .show import load_show, parse_show
+
+        nonlocal show_stop
+        loaded = {c.host: c for c in hass.data.get(DOMAIN, {}).values()}
+        device_effects = {host: c.effect_list for host, c in loaded.items()}
+        try:
+            if ATTR_FILE in call.data:
+                path = resolve_file(hass, call.data[ATTR_FILE])
+                show = await hass.async_add_executor_job(
+                    partial(load_show, path, device_effects=device_effects)
+                )
+            else:
+                show = parse_show(call.data[ATTR_SHOW], device_effects=device_effects)
+        except (OSError, ValueError, TypeError) as err:
+            raise HomeAssistantError(f"Invalid show: {err}") from err
+
+        unknown = [
+            alias for alias, (host, _) in show.devices.items() if host not in loaded
+        ]
+        if unknown:
+            raise HomeAssistantError(
+                f"Show devices are not loaded GyverTwink: {', '.join(unknown)}"
+            )
+        coordinators = {alias: loaded[host] for alias, (host, _) in show.devices.items()}
+
+        if show_stop is not None:
+            show_stop.set()
+        stop = show_stop = asyncio.Event()
+
+        if call.return_response:
+            return await async_run_show(show, coordinators, stop)
+
+        hass.async_create_background_task(
+            async_run_show(show, coordinators, stop), f"{DOMAIN} show"
+        )
+        return None
+
+    async def async_stop_show(call: ServiceCall) -> None:
+        if show_stop is not None:
+            show_stop.set()
+
+    async def async_record_traffic(call: ServiceCall) -> ServiceResponse:
+        coordinators = get_coordinators(hass, call)
+        devices = {}
+        for device_id, coordinator in coordinators.items():
+            path = await coordinator.async_set_recording(call.data[ATTR_ENABLED])
+            devices[device_id] = {"host": coordinator.host, "file": path}
+        return {"devices": devices}
+
+    async def async_replay_traffic_service(call: ServiceCall) -> ServiceResponse:
+        from .recorder import SENT, read_log, replay
+
+        path = resolve_file(hass, call.data[ATTR_FILE])
+
+        def _read() -> list:
+            # Пинги и поиск гирлянд не меняют ее состояние
+            return [
+                record
+                for record in read_log(path)
+                if record.direction == SENT and record.data[2:3] != b"\x00"
+            ]
+
+        try:
+            records = await hass.async_add_executor_job(_read)
+        except (OSError, ValueError) as err:
+            raise HomeAssistantError(f"Invalid traffic log: {err}") from err
+        if not records:
+            raise HomeAssistantError(f"No commands in {call.data[ATTR_FILE]}")
+
+        speed = call.data[ATTR_SPEED]
+        if not call.data[ATTR_REAL_DEVICE]:
+            # Виртуальная гирлянда на localhost: настоящие гирлянды не меняются
+            stats = await hass.async_add_executor_job(partial(replay, path, speed=speed))
+            return {"emulator": stats}
+
+        if not call.data.get(ATTR_DEVICE_ID):
+            raise HomeAssistantError("device_id is required with real_device")
+        coordinators = get_coordinators(hass, call)
+        results = await asyncio.gather(
+            *(
+                async_run_device(c, lambda c: async_replay_traffic(c, records, speed))
+                for c in coordinators.values()
+            )
+        )
+        return {"devices": dict(zip(coordinators, results))}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PLAY_PLAYLIST, async_play_playlist, PLAY_PLAYLIST_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_PLAYLIST, async_stop_playlist, STOP_PLAYLIST_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY,
+        async_apply,
+        APPLY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_FAVORITES,
+        async_set_favorites,
+        SET_FAVORITES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAY_SHOW,
+        async_play_show,
+        PLAY_SHOW_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_STOP_SHOW, async_stop_show)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRAFFIC,
+        async_record_traffic,
+        RECORD_TRAFFIC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_TRAFFIC,
+        async_replay_traffic_service,
+        REPLAY_TRAFFIC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,441 @@
+"""Шоу: синхронные последовательности команд для нескольких гирлянд.
+
+Шоу задается файлом (JSON или YAML) с ключевыми кадрами по времени:
+
+    devices:
+      A: 192.168.1.50
+      B: 192.168.1.51
+      C: 192.168.1.52:8888
+    keyframes:
+      - {at: 0, devices: [A], effect: Warm grad}
+      - {at: 2.5, devices: [B, C], ramp: {brightness: [0, 255]}, duration: 3}
+      - {at: 10, devices: all, next: true}
+
+Команды ключевого кадра: power, brightness, effect (имя эффекта), scale,
+speed (0-127, как в сервисе apply), direction (обратное направление для
+speed) и next. `ramp` плавно меняет brightness, scale или speed за
+`duration` секунд с частотой `fps` (по умолчанию 10).
+
+Перед запуском все пакеты рассчитываются заранее, для каждой гирлянды
+открывается свой клиент (`transport.AsyncGyverTwink` без пауз между пакетами:
+интервалы задает шоу), а задержка до нее измеряется несколькими запросами
+поиска (заодно они будят радиомодуль). Пакеты отправляются по таймерам event
+loop с поправкой на половину RTT, чтобы команды доходили до гирлянд в нужный
+момент. Отчет содержит отклонение фактического времени отправки от расчетного
+по каждому ключевому кадру.
+
+В Home Assistant пакеты не отправляются напрямую: сервис play_show передает
+их coordinator гирлянд (`GyverTwinkCoordinator.async_send_frame`), эффекты
+берутся из списков эффектов гирлянд. Перед запуском гирлянды так же
+опрашиваются запросами поиска через клиент coordinator, а поправка на
+задержку берется из его оценки RTT.
+
+Запуск без Home Assistant (--emulator - на виртуальных гирляндах):
+
+    python -m custom_components.gyvertwink.show show.yaml --emulator
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from .const import EFFECTS
+from .gyver_twink import BATCH_GAP, speed_to_firmware
+from .protocol import RttEstimator
+from .transport import AsyncGyverTwink
+
+_LOGGER = logging.getLogger(__name__)
+
+PORT = 8888
+
+# Запросов поиска на гирлянду для оценки RTT перед запуском
+ARM_PINGS = 3
+
+# Запас времени между подготовкой и первым пакетом
+LEAD_TIME = 0.3
+
+RAMP_KEYS = ("brightness", "scale", "speed")
+
+# Команды плавного изменения (brightness, scale, speed): при отправке через
+# владельца гирлянды еще не отправленное значение заменяется более новым
+RAMP_COMMANDS = (b"GT\x02\x02", b"GT\x04\x02", b"GT\x04\x03")
+
+
+class Frame(NamedTuple):
+    """Пакет шоу: время от начала, получатель, данные и номер ключевого кадра."""
+
+    at: float
+    device: str
+    data: bytes
+    keyframe: int
+
+
+class Show(NamedTuple):
+    """Рассчитанное шоу."""
+
+    devices: dict[str, tuple[str, int]]
+    frames: list[Frame]
+    keyframes: list[float]
+
+    @property
+    def duration(self) -> float:
+        return self.frames[-1].at if self.frames else 0.0
+
+
+def _command(*payload: int) -> bytes:
+    return bytes([ord("G"), ord("T"), *payload])
+
+
+def _encode(key: str, value: Any, effect_list: list[str], reverse: bool = False) -> bytes:
+    """Пакет протокола для одной команды ключевого кадра."""
+    if key == "power":
+        return _command(2, 1, 1 if value else 0)
+    if key == "brightness":
+        return _command(2, 2, max(0, min(255, int(value))))
+    if key == "scale":
+        return _command(4, 2, max(1, min(255, int(value))))
+    if key == "speed":
+        return _command(4, 3, speed_to_firmware(value, reverse))
+    if key == "effect":
+        if value not in effect_list:
+            raise ValueError(f"Unknown effect: {value}")
+        return _command(4, 0, effect_list.index(value))
+    raise ValueError(f"Unknown command: {key}")
+
+
+def _parse_address(value: str) -> tuple[str, int]:
+    host, _, port = str(value).partition(":")
+    return host, int(port or PORT)
+
+
+def _keyframe_packets(
+    keyframe: dict, index: int, effect_list: list[str]
+) -> list[tuple[float, bytes]]:
+    """Пакеты ключевого кадра для одной гирлянды: (смещение от at, пакет)."""
+    reverse = bool(keyframe.get("direction", False))
+    if "direction" in keyframe and "speed" not in keyframe and "speed" not in (
+        keyframe.get("ramp") or {}
+    ):
+        raise ValueError(f"Keyframe {index}: direction requires speed")
+
+    packets: list[tuple[float, bytes]] = []
+    slot = 0
+    for key in ("power", "effect", "brightness", "scale", "speed"):
+        if key in keyframe:
+            packet = _encode(key, keyframe[key], effect_list, reverse)
+            packets.append((slot * BATCH_GAP, packet))
+            slot += 1
+    if keyframe.get("next"):
+        packets.append((slot * BATCH_GAP, _command(2, 6)))
+        slot += 1
+
+    ramp = keyframe.get("ramp") or {}
+    if ramp:
+        duration = float(keyframe.get("duration", 1))
+        steps = max(1, round(duration * float(keyframe.get("fps", 10))))
+        for key, (start, end) in ramp.items():
+            if key not in RAMP_KEYS:
+                raise ValueError(f"Keyframe {index}: cannot ramp {key}")
+        for step in range(steps + 1):
+            offset = slot * BATCH_GAP + duration * step / steps
+            for key, (start, end) in ramp.items():
+                value = round(start + (end - start) * step / steps)
+                packets.append((offset, _encode(key, value, effect_list, reverse)))
+
+    if not packets:
+        raise ValueError(f"Keyframe {index}: no commands")
+    return packets
+
+
+def parse_show(
+    data: dict,
+    effect_list: list[str] | None = None,
+    device_effects: dict[str, list[str]] | None = None,
+) -> Show:
+    """
+    Проверяет описание шоу и рассчитывает все пакеты.
+
+    Команды одной гирлянды в одном кадре разносятся на `BATCH_GAP`: выбор
+    эффекта идет раньше масштаба и скорости.
+
+    :param data: Описание шоу (см. описание модуля).
+    :param effect_list: Имена эффектов по номерам.
+    :param device_effects: Собственные списки эффектов гирлянд по IP-адресу
+        (остальные гирлянды используют `effect_list`).
+
+    :return: Шоу с пакетами, отсортированными по времени.
+    """
+    effect_list = effect_list or EFFECTS
+    device_effects = device_effects or {}
+    devices = {
+        alias: _parse_address(address) for alias, address in data.get("devices", {}).items()
+    }
+    if not devices:
+        raise ValueError("Show has no devices")
+
+    frames: list[Frame] = []
+    keyframes: list[float] = []
+
+    for index, keyframe in enumerate(data.get("keyframes", [])):
+        at = float(keyframe.get("at", 0))
+        if at < 0:
+            raise ValueError(f"Keyframe {index}: negative time")
+
+        targets = keyframe.get("devices", "all")
+        if targets == "all":
+            targets = list(devices)
+        elif isinstance(targets, str):
+            targets = [targets]
+        unknown = [alias for alias in targets if alias not in devices]
+        if unknown:
+            raise ValueError(f"Keyframe {index}: unknown devices {', '.join(unknown)}")
+        if not targets:
+            raise ValueError(f"Keyframe {index}: no devices")
+
+        # Пакеты рассчитываются один раз на каждый список эффектов
+        packets_by_list: dict[int, list[tuple[float, bytes]]] = {}
+        for alias in targets:
+            effects = device_effects.get(devices[alias][0], effect_list)
+            packets = packets_by_list.get(id(effects))
+            if packets is None:
+                packets = packets_by_list[id(effects)] = _keyframe_packets(
+                    keyframe, index, effects
+                )
+            frames.extend(Frame(at + offset, alias, packet, index) for offset, packet in packets)
+        keyframes.append(at)
+
+    frames.sort(key=lambda frame: frame.at)
+    return Show(devices, frames, keyframes)
+
+
+def load_show(
+    path,
+    effect_list: list[str] | None = None,
+    device_effects: dict[str, list[str]] | None = None,
+) -> Show:
+    """Загружает шоу из файла JSON или YAML (параметры - см. `parse_show`)."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        import yaml
+
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    return parse_show(data, effect_list, device_effects)
+
+
+async def _async_arm(client: AsyncGyverTwink, count: int = ARM_PINGS) -> None:
+    """Оценивает RTT гирлянды несколькими запросами поиска."""
+    for _ in range(count):
+        await client.async_ping(client.rtt.timeout)
+
+
+async def _async_arm_owner(
+    arm: Callable[[str], Awaitable[Any]], alias: str, count: int = ARM_PINGS
+) -> None:
+    """Запросы поиска через владельца гирлянды; ошибки не мешают шоу."""
+    for _ in range(count):
+        try:
+            await arm(alias)
+        except Exception as err:  # noqa
+            _LOGGER.debug(f"Show arm of {alias} failed: {err}")
+            return
+
+
+def _one_way(rtt: RttEstimator) -> float:
+    """Оценка задержки до гирлянды в одну сторону в секундах."""
+    return rtt.srtt / 2 if rtt.srtt is not None else 0.0
+
+
+async def async_play_show(
+    show: Show,
+    stop: asyncio.Event | None = None,
+    send: Callable[[str, bytes], Awaitable[Any]] | None = None,
+    arm: Callable[[str], Awaitable[Any]] | None = None,
+    rtt: dict[str, RttEstimator] | None = None,
+) -> dict:
+    """
+    Проигрывает шоу в текущем event loop.
+
+    Без `send` пакеты отправляются собственными клиентами гирлянд точно по
+    таймерам. С `send` пакет в назначенное время передается владельцу гирлянды
+    (в Home Assistant - coordinator), команды каждой гирлянды выполняются по
+    очереди, а отстающие значения плавных изменений заменяются новыми.
+    Поправка на задержку в обоих случаях - половина RTT гирлянды.
+
+    :param show: Рассчитанное шоу (`parse_show`).
+    :param stop: Событие досрочной остановки.
+    :param send: Отправка пакета через владельца: (имя гирлянды в шоу, пакет).
+    :param arm: Запрос поиска через владельца перед запуском (имя гирлянды).
+    :param rtt: Оценки RTT клиентов владельца по именам гирлянд.
+
+    :return: Отчет: отклонение времени отправки по ключевым кадрам и оценка
+        задержки до каждой гирлянды.
+    """
+    loop = asyncio.get_running_loop()
+    clients: dict[str, AsyncGyverTwink] = {}
+    estimators: dict[str, RttEstimator] = dict(rtt or {})
+    # Очереди пакетов гирлянд при отправке через send
+    lanes: dict[str, list[tuple[Frame, float]]] = {alias: [] for alias in show.devices}
+    wakeups = {alias: asyncio.Event() for alias in show.devices}
+    workers: list[asyncio.Task] = []
+
+    drift: list[list[float]] = [[] for _ in show.keyframes]
+    sent = coalesced = errors = 0
+    done = loop.create_future()
+
+    def handled() -> None:
+        if sent + coalesced + errors == len(show.frames) and not done.done():
+            done.set_result(None)
+
+    def fire(frame: Frame, deadline: float) -> None:
+        nonlocal sent, coalesced
+        if send is None:
+            clients[frame.device].send_nowait(frame.data)
+            drift[frame.keyframe].append(loop.time() - deadline)
+            sent += 1
+            handled()
+            return
+
+        lane = lanes[frame.device]
+        if frame.data[:4] in RAMP_COMMANDS:
+            for position, (queued, _) in enumerate(lane):
+                if queued.data[:4] == frame.data[:4]:
+                    lane[position] = (frame, deadline)
+                    coalesced += 1
+                    handled()
+                    return
+        lane.append((frame, deadline))
+        wakeups[frame.device].set()
+
+    async def drain(alias: str) -> None:
+        nonlocal sent, errors
+        lane, wakeup = lanes[alias], wakeups[alias]
+        while True:
+            if not lane:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            frame, deadline = lane.pop(0)
+            try:
+                await send(alias, frame.data)
+            except Exception as err:  # noqa
+                errors += 1
+                _LOGGER.debug(f"Show frame {frame.data.hex(' ')} to {alias} failed: {err}")
+            else:
+                # Отклонение - по моменту, когда владелец отправил пакет
+                drift[frame.keyframe].append(loop.time() - deadline)
+                sent += 1
+            handled()
+
+    try:
+        if send is None:
+            for alias, (host, port) in show.devices.items():
+                clients[alias] = await AsyncGyverTwink.async_connect(host, port, gap=0)
+                estimators[alias] = clients[alias].rtt
+            await asyncio.gather(*(_async_arm(client) for client in clients.values()))
+        else:
+            if arm is not None:
+                await asyncio.gather(*(_async_arm_owner(arm, alias) for alias in show.devices))
+            workers = [asyncio.create_task(drain(alias)) for alias in show.devices]
+
+        start = loop.time() + LEAD_TIME
+        handles = []
+        for frame in show.frames:
+            estimator = estimators.get(frame.device)
+            lead = _one_way(estimator) if estimator is not None else 0.0
+            deadline = start + frame.at - lead
+            handles.append(loop.call_at(deadline, fire, frame, deadline))
+
+        if not show.frames:
+            done.set_result(None)
+
+        waiters = [done]
+        if stop is not None:
+            waiters.append(asyncio.ensure_future(stop.wait()))
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for handle in handles:
+                handle.cancel()
+            for waiter in waiters[1:]:
+                waiter.cancel()
+
+    finally:
+        for worker in workers:
+            worker.cancel()
+        for client in clients.values():
+            client.close()
+
+    all_drift = sorted(value for values in drift for value in values)
+    return {
+        "frames": len(show.frames),
+        "sent": sent,
+        "coalesced": coalesced,
+        "errors": errors,
+        "stopped": sent + coalesced + errors < len(show.frames),
+        "drift_ms": {
+            "p50": _ms(statistics.median(all_drift)) if all_drift else None,
+            "p95": _ms(all_drift[int(len(all_drift) * 0.95) - 1]) if all_drift else None,
+            "max": _ms(all_drift[-1]) if all_drift else None,
+        },
+        "keyframes": [
+            {
+                "at": at,
+                "frames": len(values),
+                "drift_ms_mean": _ms(statistics.mean(values)) if values else None,
+                "drift_ms_max": _ms(max(values)) if values else None,
+            }
+            for at, values in zip(show.keyframes, drift)
+        ],
+        "devices": {
+            alias: {
+                "rtt_ms": _ms(estimator.srtt),
+                "lead_ms": _ms(_one_way(estimator)),
+            }
+            for alias, estimator in estimators.items()
+        },
+    }
+
+
+def _ms(value: float | None) -> float | None:
+    return None if value is None else round(value * 1000, 3)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Шоу GyverTwink")
+    parser.add_argument("path", help="файл шоу (JSON или YAML)")
+    parser.add_argument("--emulator", action="store_true", help="виртуальные гирлянды")
+    args = parser.parse_args(argv)
+
+    show = load_show(args.path)
+    emulators = []
+    if args.emulator:
+        from .emulator import EmulatorThread
+
+        devices = {}
+        for alias in show.devices:
+            emulator = EmulatorThread().start()
+            emulators.append(emulator)
+            devices[alias] = ("127.0.0.1", emulator.port)
+        show = show._replace(devices=devices)
+
+    try:
+        report = asyncio.run(async_play_show(show))
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
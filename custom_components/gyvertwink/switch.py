@@ -1,15 +1,11 @@
-import logging
-
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import DOMAIN
+from .const import DOMAIN
 from .coordinator import GyverTwinkCoordinator
-
-_LOGGER = logging.getLogger(__name__)
+from .entity import GyverTwinkEntity
+from .gyver_twink import speed_to_firmware
 
 
 async def async_setup_entry(
@@ -22,48 +18,41 @@ async def async_setup_entry(
     
     # Создаем все switch entities с coordinator
     entities = [
-        GyverTwinkDirection(coordinator, entry.entry_id, hass),
+        GyverTwinkDirection(coordinator, entry.entry_id),
         GyverTwinkAutoChange(coordinator, entry.entry_id),
         GyverTwinkRandomChange(coordinator, entry.entry_id),
         GyverTwinkOffTimer(coordinator, entry.entry_id),
     ]
     
-    async_add_entities(entities, True)
+    # Данные уже получены coordinator, обновление перед добавлением не нужно
+    async_add_entities(entities)
 
 
-class GyverTwinkDirection(CoordinatorEntity, SwitchEntity):
+class GyverTwinkDirection(GyverTwinkEntity, SwitchEntity):
     """Switch entity для управления направлением движения эффекта.
     
     OFF = Прямое направление (Forward)
     ON = Обратное направление (Reverse)
     """
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str, hass):
-        """Инициализация Direction switch."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Direction"
-        self._attr_unique_id = f"{unique_id}_direction"
-        self._attr_icon = "mdi:swap-horizontal"
-        
-        self.hass = hass
-        self.entry_id = unique_id
-        self._attr_is_on = False  # False = Forward, True = Reverse
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | Direction | {message}")
+    _key = "direction"
+    _log_name = "Direction"
+    _attr_name = "Gyver Twink Direction"
+    _attr_icon = "mdi:swap-horizontal"
+    _attr_is_on = False  # False = Forward, True = Reverse
+
+    def _update_from_data(self) -> None:
+        """Обновляет направление из известной скорости текущего эффекта."""
+        speed = self.coordinator.effect_param("speed")
+        if speed is not None and speed != 128:
+            self._attr_is_on = speed > 128
 
     def _get_speed_entity(self):
         """Получает Speed entity для синхронизации направления."""
         from homeassistant.helpers import entity_registry
         er = entity_registry.async_get(self.hass)
         
-        speed_unique_id = f"{self.entry_id}_speed"
+        speed_unique_id = f"{self.coordinator.entry_id}_speed"
         entity_id = er.async_get_entity_id("number", DOMAIN, speed_unique_id)
         
         if entity_id:
@@ -73,13 +62,6 @@ class GyverTwinkDirection(CoordinatorEntity, SwitchEntity):
                 return entity_comp.get_entity(entity_id)
         return None
 
-    def _calculate_speed_value(self, speed: int, direction: bool) -> int:
-        """Вычисляет итоговое значение скорости с учетом направления."""
-        if direction:
-            return 128 + speed
-        else:
-            return 128 - speed
-
     async def async_turn_on(self, **kwargs):
         """Включить обратное направление (Reverse)."""
         try:
@@ -94,7 +76,7 @@ class GyverTwinkDirection(CoordinatorEntity, SwitchEntity):
                 speed_entity.set_direction(True)
             
             # Вычисляем финальное значение и отправляем на устройство
-            final_speed = self._calculate_speed_value(current_speed, True)
+            final_speed = speed_to_firmware(current_speed, True)
             await self.coordinator.async_set_speed(final_speed)
             
             self.debug(f"Direction REVERSE (speed: {current_speed}, final: {final_speed})")
@@ -118,7 +100,7 @@ class GyverTwinkDirection(CoordinatorEntity, SwitchEntity):
                 speed_entity.set_direction(False)
             
             # Вычисляем финальное значение и отправляем на устройство
-            final_speed = self._calculate_speed_value(current_speed, False)
+            final_speed = speed_to_firmware(current_speed, False)
             await self.coordinator.async_set_speed(final_speed)
             
             self.debug(f"Direction FORWARD (speed: {current_speed}, final: {final_speed})")
@@ -129,35 +111,22 @@ class GyverTwinkDirection(CoordinatorEntity, SwitchEntity):
             raise
 
 
-class GyverTwinkAutoChange(CoordinatorEntity, SwitchEntity):
+class GyverTwinkAutoChange(GyverTwinkEntity, SwitchEntity):
     """Switch entity для автоматической смены эффектов."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация AutoChange switch."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Auto Change"
-        self._attr_unique_id = f"{unique_id}_auto_change"
-        self._attr_icon = "mdi:autorenew"
-        
-        self._attr_is_on = False
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | AutoChange | {message}")
+    _key = "auto_change"
+    _log_name = "AutoChange"
+    _attr_name = "Gyver Twink Auto Change"
+    _attr_icon = "mdi:autorenew"
+    _attr_is_on = False
 
-    def _handle_coordinator_update(self) -> None:
-        """Обработка обновления данных от coordinator."""
+    def _update_from_data(self) -> None:
+        """Обновляет значение из данных coordinator без записи состояния."""
         if self.coordinator.data:
             # Получаем актуальное состояние от устройства
             auto_change = self.coordinator.data.get("auto_change")
             if auto_change is not None:
                 self._attr_is_on = auto_change
-        self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs):
         """Включить автосмену эффектов."""
@@ -182,35 +151,22 @@ class GyverTwinkAutoChange(CoordinatorEntity, SwitchEntity):
             raise
 
 
-class GyverTwinkRandomChange(CoordinatorEntity, SwitchEntity):
+class GyverTwinkRandomChange(GyverTwinkEntity, SwitchEntity):
     """Switch entity для случайной смены эффектов."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация RandomChange switch."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Random Change"
-        self._attr_unique_id = f"{unique_id}_random_change"
-        self._attr_icon = "mdi:shuffle-variant"
-        
-        self._attr_is_on = False
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | RandomChange | {message}")
+    _key = "random_change"
+    _log_name = "RandomChange"
+    _attr_name = "Gyver Twink Random Change"
+    _attr_icon = "mdi:shuffle-variant"
+    _attr_is_on = False
 
-    def _handle_coordinator_update(self) -> None:
-        """Обработка обновления данных от coordinator."""
+    def _update_from_data(self) -> None:
+        """Обновляет значение из данных coordinator без записи состояния."""
         if self.coordinator.data:
             # Получаем актуальное состояние от устройства
             random_change = self.coordinator.data.get("random_change")
             if random_change is not None:
                 self._attr_is_on = random_change
-        self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs):
         """Включить случайную смену эффектов."""
@@ -235,35 +191,22 @@ class GyverTwinkRandomChange(CoordinatorEntity, SwitchEntity):
             raise
 
 
-class GyverTwinkOffTimer(CoordinatorEntity, SwitchEntity):
+class GyverTwinkOffTimer(GyverTwinkEntity, SwitchEntity):
     """Switch entity для включения таймера выключения."""
-    
-    def __init__(self, coordinator: GyverTwinkCoordinator, unique_id: str):
-        """Инициализация OffTimer switch."""
-        super().__init__(coordinator)
-        
-        self._attr_name = "Gyver Twink Off Timer"
-        self._attr_unique_id = f"{unique_id}_off_timer"
-        self._attr_icon = "mdi:timer-off"
-        
-        self._attr_is_on = False
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, unique_id)},
-        )
 
-    def debug(self, message):
-        """Логирование отладочной информации."""
-        _LOGGER.debug(f"{self.coordinator.host} | OffTimer | {message}")
+    _key = "off_timer"
+    _log_name = "OffTimer"
+    _attr_name = "Gyver Twink Off Timer"
+    _attr_icon = "mdi:timer-off"
+    _attr_is_on = False
 
-    def _handle_coordinator_update(self) -> None:
-        """Обработка обновления данных от coordinator."""
+    def _update_from_data(self) -> None:
+        """Обновляет значение из данных coordinator без записи состояния."""
         if self.coordinator.data:
             # Получаем актуальное состояние от устройства
             timer_active = self.coordinator.data.get("timer_active")
             if timer_active is not None:
                 self._attr_is_on = timer_active
-        self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs):
         """Включить таймер выключения."""
@@ -0,0 +1,155 @@
+"""Оценка текущего эффекта гирлянды без запросов к ней.
+
+get_settings не возвращает номер эффекта, поэтому он выводится из известных
+событий: выбора эффекта, команды "следующий эффект" и автосмены прошивки.
+Прошивка при автосмене раз в `change_period` минут переходит к следующему
+избранному эффекту или (при `random_change`) к случайному избранному. Момент
+смены отсчитывается таймером гирлянды, который не виден снаружи, поэтому фаза
+считается равномерно распределенной и каждая оценка получает уверенность.
+Ниже `CONFIDENCE_THRESHOLD` эффект считается неизвестным: прочитать номер
+эффекта у гирлянды нельзя, оценка снова становится точной только после
+выбора эффекта или команды "следующий эффект".
+
+    tracker.selected(3, now)
+    tracker.update_settings(auto_change=True, random_change=False, period=5, now=now)
+    effect, confidence = tracker.predict(now + 400, favorites)
+
+Модуль не зависит от Home Assistant, время передается вызывающим.
+"""
+import math
+from typing import Optional, Sequence
+
+# Уверенность, ниже которой оценка эффекта не используется
+CONFIDENCE_THRESHOLD = 0.4
+
+
+class EffectTracker:
+    """
+    Модель смены эффектов в прошивке.
+
+    Атрибуты:
+        - `effect`: Эффект, известный на момент `anchor` (None - неизвестен).
+        - `confidence`: Уверенность в `effect` на момент `anchor` (0-1).
+        - `anchor`: Время последнего пересчета модели (монотонные секунды).
+    """
+
+    # Уверенность уменьшается вдвое за HALF_LIFE секунд: эффект могли сменить
+    # из приложения, а это событие не наблюдаемо
+    HALF_LIFE = 6 * 3600
+    # Множитель уверенности на каждую предсказанную автосмену: расхождение
+    # часов гирлянды и Home Assistant накапливается
+    STEP_CONFIDENCE = 0.97
+
+    __slots__ = (
+        "effect",
+        "confidence",
+        "anchor",
+        "auto_change",
+        "random_change",
+        "period",
+    )
+
+    def __init__(self) -> None:
+        self.effect: Optional[int] = None
+        self.confidence = 0.0
+        self.anchor = 0.0
+        self.auto_change = False
+        self.random_change = False
+        self.period = 0.0
+
+    def selected(self, effect: int, now: float) -> None:
+        """Эффект выбран командой select_effect."""
+        self.effect = effect
+        self.confidence = 1.0
+        self.anchor = now
+
+    def lost(self) -> None:
+        """Текущий эффект неизвестен."""
+        self.effect = None
+        self.confidence = 0.0
+
+    def next_effect(self, now: float, favorites: Sequence[bool]) -> None:
+        """Отправлена команда перехода к следующему избранному эффекту."""
+        effect, confidence = self.predict(now, favorites)
+        if effect is None:
+            return
+        self.effect = self._advance(effect, 1, favorites)
+        self.confidence = confidence
+        self.anchor = now
+
+    def update_settings(
+        self,
+        auto_change: bool,
+        random_change: bool,
+        period: int,
+        now: float,
+        favorites: Sequence[bool],
+    ) -> None:
+        """Учитывает настройки автосмены из опроса или отправленной команды.
+
+        :param period: Период смены в минутах, как в get_settings.
+        """
+        auto_change = bool(auto_change)
+        random_change = bool(random_change)
+        period = max(int(period or 1), 1) * 60
+        if (auto_change, random_change, period) == (
+            self.auto_change,
+            self.random_change,
+            self.period,
+        ):
+            return
+
+        # Оценка до изменения фиксируется, дальше действует новый режим
+        self.effect, self.confidence = self.predict(now, favorites)
+        self.anchor = now
+        self.auto_change = auto_change
+        self.random_change = random_change
+        self.period = period
+
+    def predict(
+        self, now: float, favorites: Sequence[bool]
+    ) -> tuple[Optional[int], float]:
+        """Наиболее вероятный текущий эффект и уверенность в нем.
+
+        :param favorites: Флаги избранных эффектов по номерам эффектов.
+
+        :return: Номер эффекта (None - неизвестен) и вероятность 0-1.
+        """
+        if self.effect is None:
+            return None, 0.0
+
+        elapsed = max(now - self.anchor, 0.0)
+        confidence = self.confidence * 0.5 ** (elapsed / self.HALF_LIFE)
+        count = sum(1 for favorite in favorites if favorite)
+        if not self.auto_change or not count:
+            return self.effect, confidence
+
+        cycles = elapsed / self.period
+        if self.random_change:
+            # Первая смена - в течение одного периода; после нее эффект
+            # равновероятно любой избранный
+            stay = max(1.0 - cycles, 0.0)
+            return self.effect, confidence * (stay + (1.0 - stay) / count)
+
+        # Смен было floor(cycles) или на одну больше, в зависимости от фазы.
+        # Вероятность выбранного варианта p от 0.5 до 1 переводится в 2p - 1:
+        # посередине периода оба варианта равновероятны и уверенность нулевая
+        steps = math.floor(cycles)
+        fraction = cycles - steps
+        if fraction > 0.5:
+            steps += 1
+        confidence *= abs(1.0 - 2.0 * fraction) * self.STEP_CONFIDENCE**steps
+        return self._advance(self.effect, steps, favorites), confidence
+
+    @staticmethod
+    def _advance(effect: int, steps: int, favorites: Sequence[bool]) -> int:
+        """Эффект после `steps` переходов к следующему избранному."""
+        ring = [index for index, favorite in enumerate(favorites) if favorite]
+        if not ring or steps <= 0:
+            return effect
+
+        # Первый переход - к ближайшему избранному после текущего эффекта
+        position = next(
+            (i for i, index in enumerate(ring) if index > effect), 0
+        )
+        return ring[(position + steps - 1) % len(ring)]
@@ -0,0 +1,155 @@
+"""Асинхронный клиент GyverTwink: драйвер `ProtocolEngine` для asyncio.
+
+Пакеты принимаются datagram-протоколом event loop, таймеры движка ставятся
+через `loop.call_at`, поэтому ожидание ответа не занимает поток executor.
+Одновременные запросы выполняются по очереди (см. `protocol`).
+
+    twink = await AsyncGyverTwink.async_connect("192.168.1.50")
+    settings = await twink.async_get_settings()
+    twink.close()
+"""
+import asyncio
+import logging
+import socket
+from typing import Optional
+
+from .gyver_twink import TwinkSettings
+from .protocol import ArmTimer, Done, Pacer, ProtocolEngine, Send, parse_effect
+
+_LOGGER = logging.getLogger(__name__)
+
+PORT = 8888
+
+
+class AsyncGyverTwink(asyncio.DatagramProtocol):
+    """Асинхронный клиент одной гирлянды.
+
+    :param gap: Минимальная пауза между пакетами (по умолчанию `Pacer.DEFAULT_GAP`).
+    """
+
+    def __init__(self, gap: Optional[float] = None) -> None:
+        self.engine = ProtocolEngine(pacer=Pacer(gap) if gap is not None else None)
+        self.rtt = self.engine.rtt
+        self.pacer = self.engine.pacer
+        self.settings_ = TwinkSettings()
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self._loop = asyncio.get_running_loop()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._waiters: dict = {}
+
+    @classmethod
+    async def async_connect(
+        cls, host: str, port: int = PORT, gap: Optional[float] = None
+    ) -> "AsyncGyverTwink":
+        """Открывает сокет к гирлянде."""
+        loop = asyncio.get_running_loop()
+        _, protocol = await loop.create_datagram_endpoint(
+            lambda: cls(gap), remote_addr=(host, port), family=socket.AF_INET
+        )
+        return protocol
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.engine.datagram_received(data, self._loop.time())
+        self._process()
+
+    def error_received(self, exc: Exception) -> None:
+        # ICMP "port unreachable": ответа не будет, запрос завершится по таймауту
+        _LOGGER.debug(f"Socket error: {exc}")
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.transport is not None:
+            self.transport.close()
+
+    async def async_request(
+        self,
+        frame: bytes,
+        wait_answer: bool = False,
+        timeout: Optional[float] = None,
+        retry: int = 1,
+        hedge: bool = False,
+    ) -> Optional[bytes]:
+        """
+        Асинхронный аналог `GyverTwink.sock()`.
+
+        :return: Ответ без префикса GT (если ожидается) или None.
+        """
+        future = self._loop.create_future()
+        request = self.engine.request(
+            frame,
+            self._loop.time(),
+            wait_answer=wait_answer,
+            timeout=timeout,
+            retry=retry,
+            hedge=hedge,
+        )
+        self._waiters[request] = future
+        self._process()
+        return await future
+
+    def _process(self) -> None:
+        """Выполняет действия движка."""
+        for event in self.engine.events():
+            if isinstance(event, Send):
+                self.transport.sendto(event.frame)
+            elif isinstance(event, ArmTimer):
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = self._loop.call_at(event.deadline, self._on_timer)
+            elif isinstance(event, Done):
+                request = event.request
+                future = self._waiters.pop(request, None)
+                if future is None or future.done():
+                    continue
+                if request.error is not None:
+                    future.set_exception(request.error)
+                else:
+                    future.set_result(request.result)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self.engine.tick(self._loop.time())
+        self._process()
+
+    async def async_ping(self, timeout: float = 0.5) -> bool:
+        """Проверяет доступность гирлянды (см. `GyverTwink.ping`)."""
+        try:
+            data = await self.async_request(
+                b"GT\x00", wait_answer=True, timeout=timeout, retry=0
+            )
+        except TimeoutError:
+            return False
+        return data is not None
+
+    async def async_get_settings(self) -> Optional[TwinkSettings]:
+        """Настройки гирлянды (см. `GyverTwink.get_settings`)."""
+        data = await self.async_request(b"GT\x01", wait_answer=True, hedge=True)
+        if not data:
+            return None
+        self.settings_ = TwinkSettings.parse(data[1:])
+        return self.settings_
+
+    async def async_select_effect(self, number: int) -> Optional[dict]:
+        """Выбирает эффект и возвращает его параметры (см. `GyverTwink.select_effect`)."""
+        data = await self.async_request(
+            bytes([ord("G"), ord("T"), 4, 0, number]), wait_answer=True
+        )
+        if not data:
+            return None
+        return parse_effect(data)
+
+    async def async_send(self, frame: bytes) -> None:
+        """Команда без ответа (установка параметра)."""
+        await self.async_request(frame)
+
+    def send_nowait(self, frame: bytes) -> None:
+        """Ставит команду без ответа в очередь, не дожидаясь отправки.
+
+        При пустой очереди и паузе между пакетами 0 пакет уходит сразу.
+        """
+        self.engine.request(frame, self._loop.time())
+        self._process()
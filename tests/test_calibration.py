@@ -0,0 +1,26 @@
+"""Анализ кадров калибровки."""
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np  # noqa: E402
+
+from custom_components.gyvertwink.calibration import main  # noqa: E402
+
+
+def test_frames_sorted_by_led_number(tmp_path, capsys):
+    """led_10 идет после led_9, а не после led_1."""
+    shape = (40, 40)
+    for index in range(12):
+        frame = np.zeros(shape, dtype=np.float32)
+        frame[5 + index * 2, 20] = 255
+        np.save(tmp_path / f"led_{index}.npy", frame)
+
+    paths = [str(path) for path in tmp_path.glob("*.npy")]
+    assert main(["analyse", *paths, "--radius", "1"]) == 0
+
+    leds = json.loads(capsys.readouterr().out)["leds"]
+    ys = [led["y"] for led in leds]
+    assert ys == sorted(ys)
@@ -0,0 +1,111 @@
+"""Клиент GyverTwink на виртуальной гирлянде."""
+import threading
+import time
+
+import pytest
+
+from custom_components.gyvertwink.emulator import EmulatorThread
+from custom_components.gyvertwink.gyver_twink import GyverTwink
+
+
+@pytest.fixture
+def emulator():
+    thread = EmulatorThread().start()
+    yield thread
+    thread.stop()
+
+
+def test_settings_snapshot_not_changed_by_commands(emulator):
+    """Прочитанные настройки - снимок: команды и опросы его не меняют."""
+    twink = GyverTwink("127.0.0.1", emulator.port)
+    snapshot = twink.get_settings()
+    assert snapshot["brightness"] == 200
+
+    twink.set_brightness(50)
+    assert snapshot["brightness"] == 200
+    assert twink.read_settings()["brightness"] == 50
+    # Ответ на запрос настроек - после обработки команды гирляндой
+    assert twink.get_settings()["brightness"] == 50
+
+    emulator.device.settings["brightness"] = 120
+    assert twink.get_settings()["brightness"] == 120
+    assert snapshot["brightness"] == 200
+
+
+def test_pacing_trials_verify_changed_value_and_restore():
+    """Замер паузы меняет яркость, проверяет ее чтением и возвращает исходную."""
+    thread = EmulatorThread(min_gap=0.05).start()
+    try:
+        twink = GyverTwink("127.0.0.1", thread.port)
+        result = twink.tune_pacing(trials=2, candidates=(0.1, 0.03))
+
+        assert result["trials"] == {100.0: "2/2", 30.0: "0/2"}
+        assert twink.pacer.gap == 0.1
+        # Проверка проходит, только если прочитана измененная яркость
+        assert thread.device.settings["brightness"] == 200
+    finally:
+        thread.stop()
+
+
+def test_concurrent_reads_share_one_request():
+    """Одновременные чтения настроек - один запрос к гирлянде."""
+    thread = EmulatorThread(delay=0.1).start()
+    try:
+        twink = GyverTwink("127.0.0.1", thread.port)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append(twink.read_settings()["brightness"])
+
+        readers = [threading.Thread(target=read) for _ in range(8)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+
+        assert results == [200] * 8
+        assert thread.device.received == {1: 1}
+    finally:
+        thread.stop()
+
+
+def test_stale_settings_served_while_revalidating():
+    """Устаревший кэш отдается сразу, свежие настройки приходят в фоне."""
+    thread = EmulatorThread(delay=0.1).start()
+    try:
+        twink = GyverTwink("127.0.0.1", thread.port, settings_ttl=0.05, settings_stale=10)
+        assert twink.read_settings()["brightness"] == 200
+        thread.device.settings["brightness"] = 120
+        time.sleep(0.1)
+
+        started = time.monotonic()
+        assert twink.read_settings()["brightness"] == 200
+        assert time.monotonic() - started < 0.05
+
+        deadline = time.monotonic() + 2
+        while twink.settings_["brightness"] != 120 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert twink.read_settings(max_age=10)["brightness"] == 120
+        assert thread.device.received == {1: 2}
+    finally:
+        thread.stop()
+
+
+def test_set_favorites_marks_each_effect():
+    """Флаг избранного достается своему эффекту, исходный эффект восстанавливается."""
+    thread = EmulatorThread().start()
+    try:
+        twink = GyverTwink("127.0.0.1", thread.port)
+        thread.device.effect = 3
+        effects, restored = twink.set_favorites({1: False, 4: False, 5: True}, restore=3)
+
+        assert all(effect is not None and effect["favorite"] for effect in effects)
+        favorites = [effect["favorite"] for effect in thread.device.effects[:7]]
+        assert favorites == [True, False, True, True, False, True, True]
+        assert thread.device.effect == 3 and restored is not None
+        # Три пары "выбор + флаг" и восстановление
+        assert thread.device.received[4] == 7
+    finally:
+        thread.stop()
@@ -0,0 +1,96 @@
+"""Добавление гирлянды через config flow."""
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant import config_entries  # noqa: E402
+from homeassistant.const import CONF_HOST  # noqa: E402
+from homeassistant.data_entry_flow import FlowResultType  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # noqa: E402
+
+from custom_components.gyvertwink.const import CONF_EFFECTS, DOMAIN, EFFECTS  # noqa: E402
+from custom_components.gyvertwink.emulator import async_start_emulator  # noqa: E402
+
+HOST = "127.0.0.1"
+# async_sweep обращается к гирляндам на стандартный порт
+PORT = 8888
+
+
+@pytest.fixture(autouse=True)
+def skip_setup():
+    """Созданная запись не настраивается: проверяется только flow."""
+    with patch("custom_components.gyvertwink.async_setup_entry", return_value=True):
+        yield
+
+
+async def _start(hass, step: str):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] is FlowResultType.MENU
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": step}
+    )
+
+
+async def test_manual_creates_entry_with_unique_id(hass, enable_custom_integrations):
+    result = await _start(hass, "manual")
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: HOST, CONF_EFFECTS: "One, Two"}
+    )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"] == {CONF_HOST: HOST, CONF_EFFECTS: ["One", "Two"]}
+    assert result["result"].unique_id == HOST
+
+
+async def test_manual_aborts_for_configured_host(hass, enable_custom_integrations):
+    """Повтор адреса прерывается и для записей без unique_id."""
+    MockConfigEntry(domain=DOMAIN, options={CONF_HOST: HOST}).add_to_hass(hass)
+
+    result = await _start(hass, "manual")
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: HOST, CONF_EFFECTS: ",".join(EFFECTS)}
+    )
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+
+
+async def test_scan_and_pick(hass, enable_custom_integrations, socket_enabled):
+    transport, device = await async_start_emulator(HOST, PORT)
+    try:
+        result = await _start(hass, "scan")
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"network": f"{HOST}/32"}
+        )
+        assert result["type"] is FlowResultType.FORM
+        assert result["step_id"] == "pick"
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_HOST: HOST}
+        )
+        assert result["type"] is FlowResultType.CREATE_ENTRY
+        assert result["result"].unique_id == HOST
+
+        # Добавленная гирлянда больше не предлагается
+        result = await _start(hass, "scan")
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"network": f"{HOST}/32"}
+        )
+        assert result["type"] is FlowResultType.ABORT
+        assert result["reason"] == "no_devices_found"
+    finally:
+        transport.close()
+
+
+async def test_scan_rejects_invalid_network(hass, enable_custom_integrations):
+    result = await _start(hass, "scan")
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"network": "10.0.0.0/16"}
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_network"}
@@ -0,0 +1,68 @@
+"""Поиск гирлянд и broadcast-опрос на виртуальных гирляндах."""
+import asyncio
+
+import pytest
+
+from custom_components.gyvertwink.discovery import (
+    BACKGROUND_MAX_INTERVAL,
+    BACKGROUND_MIN_INTERVAL,
+    DiscoveryBackoff,
+    async_poll_settings,
+    async_resolve_host,
+    async_sweep,
+)
+from custom_components.gyvertwink.emulator import async_start_emulator
+from custom_components.gyvertwink.gyver_twink import TwinkSettings
+
+
+def test_fleet_poll_matches_replies_by_resolved_address():
+    """Гирлянда, заданная именем хоста, находится среди ответов по IP."""
+
+    async def check():
+        transport, device = await async_start_emulator("127.0.0.1", 0)
+        port = transport.get_extra_info("sockname")[1]
+        try:
+            address = await async_resolve_host("localhost")
+            assert address == "127.0.0.1"
+            assert await async_resolve_host("127.0.0.1") == "127.0.0.1"
+
+            replies = await async_poll_settings(["127.0.0.1"], {address}, 1.0, port=port)
+            assert TwinkSettings.parse(replies[address][1:])["brightness"] == 200
+            assert device.received == {1: 1}
+        finally:
+            transport.close()
+
+    asyncio.run(check())
+
+
+def test_sweep_finds_only_responding_addresses():
+    async def check():
+        transport, device = await async_start_emulator("127.0.0.1", 0)
+        port = transport.get_extra_info("sockname")[1]
+        try:
+            found = await async_sweep("127.0.0.0/30", timeout=0.3, port=port)
+            assert found == ["127.0.0.1"]
+            assert device.received == {0: 1}
+        finally:
+            transport.close()
+
+    asyncio.run(check())
+
+
+@pytest.mark.parametrize("network", ["10.0.0.0/16", "fd00::/120", "not a network"])
+def test_sweep_rejects_unsupported_networks(network):
+    with pytest.raises(ValueError):
+        asyncio.run(async_sweep(network))
+
+
+def test_background_interval_doubles_and_resets():
+    backoff = DiscoveryBackoff()
+    assert backoff.interval == BACKGROUND_MIN_INTERVAL == 300
+
+    intervals = [backoff.next(found_new=False) for _ in range(5)]
+    assert intervals == [600, 1200, 2400, 3600, 3600]
+    assert BACKGROUND_MAX_INTERVAL == 3600
+
+    # Новая гирлянда - снова частый поиск
+    assert backoff.next(found_new=True) == 300
+    assert backoff.next(found_new=False) == 600
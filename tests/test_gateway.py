@@ -0,0 +1,66 @@
+"""UDP-шлюз на виртуальной гирлянде."""
+import asyncio
+
+from custom_components.gyvertwink.emulator import async_start_emulator
+from custom_components.gyvertwink.gateway import DeviceChannel
+from custom_components.gyvertwink.transport import AsyncGyverTwink
+
+
+async def _with_gateway(bind_host: str, check) -> None:
+    transport, device = await async_start_emulator("127.0.0.1", 0)
+    channel = DeviceChannel("127.0.0.1", transport.get_extra_info("sockname")[1], gap=0.01)
+    await channel.async_start(bind_host, 0)
+    client = await AsyncGyverTwink.async_connect("127.0.0.1", channel.local_address[1], gap=0)
+    try:
+        await check(channel, client, device)
+    finally:
+        client.close()
+        channel.close()
+        transport.close()
+
+
+def test_discovery_reply_uses_interface_address_on_wildcard_bind():
+    """На 0.0.0.0 шлюз отвечает октетом интерфейса, а не 0."""
+
+    async def check(channel, client, device):
+        reply = await client.async_request(b"GT\x00", wait_answer=True)
+        assert reply == b"\x00\x01"
+        assert device.received == {}
+
+    asyncio.run(_with_gateway("0.0.0.0", check))
+
+
+def test_reads_served_from_cache_with_queued_commands():
+    async def check(channel, client, device):
+        await client.async_get_settings()
+        await client.async_send(b"GT\x02\x02\x32")
+        settings = await client.async_get_settings()
+        assert settings["brightness"] == 50
+        assert (await client.async_select_effect(3))["speed"] == 64
+        assert device.received == {1: 1, 2: 1, 4: 1}
+
+    asyncio.run(_with_gateway("127.0.0.1", check))
+
+
+def test_worker_survives_socket_error():
+    """Ошибка сокета к гирлянде не останавливает шлюз: клиент повторяет чтение."""
+
+    async def check(channel, client, device):
+        request = channel.client.async_request
+        failures = []
+
+        async def unreachable_once(*args, **kwargs):
+            if not failures:
+                failures.append(args[0])
+                raise OSError("Network is unreachable")
+            return await request(*args, **kwargs)
+
+        channel.client.async_request = unreachable_once
+        settings = await client.async_get_settings()
+
+        assert settings["brightness"] == 200
+        assert failures == [b"GT\x01"]
+        assert device.received == {1: 1}
+        assert channel._read_waiters is None
+
+    asyncio.run(_with_gateway("127.0.0.1", check))
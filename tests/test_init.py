@@ -0,0 +1,122 @@
+"""Настройка гирлянды в Home Assistant на виртуальной гирлянде."""
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.const import CONF_HOST  # noqa: E402
+from homeassistant.exceptions import HomeAssistantError  # noqa: E402
+from homeassistant.helpers import device_registry as dr  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # noqa: E402
+
+from custom_components.gyvertwink.const import CONF_EFFECTS, DOMAIN, EFFECTS  # noqa: E402
+from custom_components.gyvertwink.emulator import async_start_emulator  # noqa: E402
+
+# Координатор обращается к гирлянде на стандартный порт
+HOST = "127.0.0.1"
+PORT = 8888
+
+
+async def test_setup_costs_one_settings_request(
+    hass, enable_custom_integrations, socket_enabled
+):
+    """Настройка гирлянды и первое обновление - один запрос настроек."""
+    transport, device = await async_start_emulator(HOST, PORT)
+    entry = MockConfigEntry(
+        domain=DOMAIN, options={CONF_HOST: HOST, CONF_EFFECTS: list(EFFECTS)}
+    )
+    entry.add_to_hass(hass)
+    try:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        # Платформы берут уже полученные данные и не запрашивают обновление
+        assert device.received == {1: 1}
+        assert len(hass.states.async_entity_ids("light")) == 1
+    finally:
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        transport.close()
+
+
+async def test_record_and_replay_traffic(hass, enable_custom_integrations, socket_enabled):
+    """Журнал, записанный coordinator, воспроизводится через интеграцию."""
+    transport, device = await async_start_emulator(HOST, PORT)
+    entry = MockConfigEntry(
+        domain=DOMAIN, options={CONF_HOST: HOST, CONF_EFFECTS: list(EFFECTS)}
+    )
+    entry.add_to_hass(hass)
+    hass.config.allowlist_external_dirs = {hass.config.config_dir}
+    try:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+
+        path = await coordinator.async_set_recording(True)
+        await coordinator.async_set_brightness(50)
+        await coordinator.async_select_effect(3)
+        assert await coordinator.async_set_recording(False) is None
+
+        device.settings["brightness"] = 200
+        device.effect = 0
+        await coordinator.async_refresh()
+
+        device_id = dr.async_get(hass).async_get_device(
+            identifiers={(DOMAIN, entry.entry_id)}
+        ).id
+        data = {"device_id": device_id, "file": path, "speed": 0}
+
+        # По умолчанию журнал получает виртуальная гирлянда, а не устройство
+        response = await hass.services.async_call(
+            DOMAIN, "replay_traffic", data, blocking=True, return_response=True
+        )
+        assert response["emulator"]["sent"] >= 2
+        assert response["emulator"]["timeouts"] == 0
+        assert device.settings["brightness"] == 200
+        assert device.effect == 0
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            "replay_traffic",
+            {**data, "real_device": True},
+            blocking=True,
+            return_response=True,
+        )
+
+        assert response["devices"][device_id]["success"]
+        assert device.settings["brightness"] == 50
+        assert device.effect == 3
+        assert coordinator.data["brightness"] == 50
+    finally:
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        transport.close()
+
+
+async def test_show_runs_through_coordinator(hass, enable_custom_integrations, socket_enabled):
+    """Шоу выбирает эффект через coordinator, файлы вне allowlist не читаются."""
+    transport, device = await async_start_emulator(HOST, PORT)
+    effects = ["Mine", *EFFECTS]
+    entry = MockConfigEntry(domain=DOMAIN, options={CONF_HOST: HOST, CONF_EFFECTS: effects})
+    entry.add_to_hass(hass)
+    try:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, "play_show", {"file": "../../etc/passwd"}, blocking=True
+            )
+
+        show = {"devices": {"A": HOST}, "keyframes": [{"at": 0, "effect": "Warm grad"}]}
+        report = await hass.services.async_call(
+            DOMAIN, "play_show", {"show": show}, blocking=True, return_response=True
+        )
+
+        assert report["sent"] == 1
+        assert device.effect == effects.index("Warm grad")
+        assert coordinator.current_effect == effects.index("Warm grad")
+    finally:
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        transport.close()
@@ -0,0 +1,116 @@
+"""Плейлист эффектов на поддельном coordinator."""
+import time
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    async_fire_time_changed,
+)
+
+from custom_components.gyvertwink.const import DOMAIN, EFFECTS  # noqa: E402
+from custom_components.gyvertwink.gyver_twink import speed_to_firmware  # noqa: E402
+from custom_components.gyvertwink.playlist import (  # noqa: E402
+    STORAGE_VERSION,
+    GyverTwinkPlaylist,
+    PlaylistStep,
+)
+
+
+class FakeCoordinator:
+    """Coordinator без гирлянды: запоминает выбранные эффекты."""
+
+    host = "192.0.2.1"
+    entry_id = "playlist"
+    effect_list = list(EFFECTS)
+
+    def __init__(self, fail: tuple = ()) -> None:
+        self.selected = []
+        self.fail = set(fail)
+
+    async def async_select_effect(self, effect_id, refresh=True):
+        self.selected.append(effect_id)
+        if effect_id in self.fail:
+            raise RuntimeError("Unexpected")
+        return {"favorite": True, "scale": 128, "speed": 64}
+
+    async def async_set_scale(self, value):
+        return True
+
+    async def async_set_speed(self, value):
+        return True
+
+    def firmware_speed(self, speed, direction):
+        return speed_to_firmware(64 if speed is None else speed, bool(direction))
+
+    def async_update_listeners(self):
+        pass
+
+
+STEPS = [PlaylistStep(effect=0, duration=10), PlaylistStep(effect=1, duration=10)]
+
+
+async def _advance(hass, seconds: float) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+async def test_steps_advance_on_timer(hass):
+    coordinator = FakeCoordinator()
+    playlist = GyverTwinkPlaylist(hass, coordinator)
+
+    await playlist.async_start(list(STEPS))
+    assert coordinator.selected == [0]
+
+    await _advance(hass, 11)
+    assert coordinator.selected == [0, 1]
+    assert playlist.index == 1
+
+    await playlist.async_stop()
+    assert not playlist.running
+
+
+async def test_failing_step_keeps_playlist_running(hass, caplog):
+    """Непредвиденная ошибка шага записывается в журнал, следующий шаг идет."""
+    coordinator = FakeCoordinator(fail=(0,))
+    playlist = GyverTwinkPlaylist(hass, coordinator)
+
+    await playlist.async_start(list(STEPS))
+    assert playlist.running
+    assert "Step 0 failed" in caplog.text
+
+    await _advance(hass, 11)
+    assert coordinator.selected == [0, 1]
+
+    await playlist.async_stop()
+
+
+async def test_restore_continues_at_elapsed_step(hass, hass_storage):
+    """После перезапуска плейлист продолжается с шага по прошедшему времени."""
+    hass_storage[f"{DOMAIN}.playlist.{FakeCoordinator.entry_id}"] = {
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.playlist.{FakeCoordinator.entry_id}",
+        "data": {
+            "steps": [
+                {"effect": step.effect, "duration": step.duration} for step in STEPS
+            ],
+            "repeat": True,
+            "index": 0,
+            "step_started": time.time() - 12,
+        },
+    }
+    coordinator = FakeCoordinator()
+    playlist = GyverTwinkPlaylist(hass, coordinator)
+
+    await playlist.async_restore()
+    assert coordinator.selected == [1]
+    assert playlist.index == 1
+
+    # Оставшиеся 8 секунд шага, затем - первый шаг по кругу
+    await _advance(hass, 9)
+    assert coordinator.selected == [1, 0]
+
+    await playlist.async_stop()
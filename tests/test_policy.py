@@ -0,0 +1,246 @@
+"""Решения координатора без Home Assistant."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from custom_components.gyvertwink.gyver_twink import TwinkSettings
+from custom_components.gyvertwink.policy import (
+    CircuitBreaker,
+    CommandElider,
+    DeviceOffline,
+    EffectPrefetch,
+    KeepWarm,
+)
+
+
+def _set(elider: CommandElider, sent: list, key: str, value, now: float) -> None:
+    """Установка параметра так же, как в coordinator._async_set."""
+    if not elider.is_current(key, value, now):
+        sent.append((key, value))
+        elider.sent(key, value, now)
+
+
+def test_elision_compares_with_last_sent_value():
+    """A, B, A - три команды, хотя опрос после B еще не прошел."""
+    elider = CommandElider(freshness=30)
+    elider.polled(TwinkSettings.parse(bytes([1, 0, 1, 100, 0, 0, 1, 0, 10])), 0.0)
+
+    sent = []
+    _set(elider, sent, "brightness", 50, 1.0)
+    _set(elider, sent, "brightness", 100, 2.0)
+    _set(elider, sent, "brightness", 50, 3.0)
+    assert sent == [("brightness", 50), ("brightness", 100), ("brightness", 50)]
+
+    # Повтор A в окне свежести пропускается, после окна - отправляется
+    _set(elider, sent, "brightness", 50, 4.0)
+    assert len(sent) == 3
+    _set(elider, sent, "brightness", 50, 40.0)
+    assert len(sent) == 4
+
+
+def test_elision_uses_newer_poll():
+    """Опрос новее команды заменяет отправленное значение."""
+    elider = CommandElider(freshness=30)
+    elider.sent("power", True, 0.0)
+    elider.polled({"power": False}, 1.0)
+
+    assert not elider.is_current("power", True, 2.0)
+    assert elider.is_current("power", 0, 2.0)
+    assert not elider.is_current("brightness", 0, 2.0)
+
+
+class FakeDevice:
+    """Гирлянда для circuit breaker: считает опросы и проверки."""
+
+    def __init__(self) -> None:
+        self.online = False
+        self.reads = 0
+        self.probes = 0
+
+    async def read(self) -> dict:
+        self.reads += 1
+        if not self.online:
+            raise TimeoutError("Timeout")
+        return {"power": True}
+
+    async def probe(self) -> bool:
+        self.probes += 1
+        return self.online
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(3, timedelta(seconds=15), timedelta(minutes=5))
+
+
+def _poll(breaker: CircuitBreaker, device: FakeDevice):
+    return asyncio.run(breaker.async_call(device.read, device.probe))
+
+
+def test_breaker_opens_after_three_failed_polls():
+    breaker, device = _breaker(), FakeDevice()
+
+    for failures in (1, 2, 3):
+        with pytest.raises(TimeoutError):
+            _poll(breaker, device)
+        assert breaker.failures == failures
+    assert breaker.open
+    assert breaker.probe_interval == timedelta(seconds=15)
+    assert (device.reads, device.probes) == (3, 0)
+
+
+def test_open_breaker_probes_with_doubling_interval():
+    """Открытый breaker только проверяет гирлянду, интервал растет до 5 минут."""
+    breaker, device = _breaker(), FakeDevice()
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            _poll(breaker, device)
+
+    intervals = []
+    for _ in range(6):
+        with pytest.raises(DeviceOffline):
+            _poll(breaker, device)
+        intervals.append(breaker.probe_interval.total_seconds())
+
+    assert intervals == [30, 60, 120, 240, 300, 300]
+    assert (device.reads, device.probes) == (3, 6)
+
+
+def test_breaker_recovers_on_probe_reply():
+    breaker, device = _breaker(), FakeDevice()
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            _poll(breaker, device)
+
+    device.online = True
+    assert _poll(breaker, device) == {"power": True}
+    assert not breaker.open and breaker.failures == 0
+    assert (device.reads, device.probes) == (4, 1)
+
+    # Следующая серия неудач снова отсчитывается с нуля и с 15 секунд
+    device.online = False
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            _poll(breaker, device)
+    assert breaker.open and breaker.probe_interval == timedelta(seconds=15)
+
+
+class FakeTwink:
+    """Клиент гирлянды: выученный интервал keep-warm и время последнего запроса."""
+
+    def __init__(self, interval: float = 5.0) -> None:
+        self.warmth = type("Warmth", (), {"interval": interval})()
+        self.last_reqest_time = 0.0
+
+
+def _warmer(twink: FakeTwink) -> KeepWarm:
+    return KeepWarm(twink, poll_interval=15, interaction_window=600, relaxed_factor=4)
+
+
+def test_keep_warm_relaxes_for_idle_user_or_power_off():
+    warmer = _warmer(FakeTwink(interval=3))
+
+    assert warmer.interval(100.0, last_interaction=90.0, power=True) == 3
+    assert warmer.interval(100.0, last_interaction=90.0, power=False) == 12
+    assert warmer.interval(1000.0, last_interaction=90.0, power=True) == 12
+
+
+def test_keep_warm_pings_only_after_idle():
+    """Опрос и команды тоже прогревают гирлянду: проверка - только после простоя."""
+    twink = FakeTwink(interval=5)
+    warmer = _warmer(twink)
+    twink.last_reqest_time = 98.0
+
+    assert not warmer.due(100.0, 90.0, power=True, offline=False)
+    assert warmer.delay(100.0, 90.0, power=True) == 3.0
+
+    assert warmer.due(103.0, 90.0, power=True, offline=False)
+    assert not warmer.due(103.0, 90.0, power=True, offline=True)
+    assert warmer.delay(104.0, 90.0, power=True) == KeepWarm.MIN_DELAY
+
+
+def test_keep_warm_left_to_poll_when_interval_is_longer():
+    twink = FakeTwink(interval=5)
+    warmer = _warmer(twink)
+
+    # Выключенная гирлянда: 20 секунд дольше опроса, прогревает сам опрос
+    assert not warmer.due(100.0, 90.0, power=False, offline=False)
+
+
+class FakeEffectTwink:
+    """Клиент гирлянды для предзагрузки: запоминает выбранные эффекты."""
+
+    def __init__(self, lost=()) -> None:
+        self.selected = []
+        self.lost = set(lost)
+
+    def read_effects(self, numbers, cancel=None):
+        effects = {}
+        for number in numbers:
+            if cancel is not None and cancel.is_set():
+                break
+            self.selected.append(number)
+            if number not in self.lost:
+                effects[number] = {"favorite": True, "scale": number, "speed": 64}
+        return effects
+
+    def select_effect(self, number):
+        self.selected.append(number)
+        return {"favorite": True, "scale": number, "speed": 64}
+
+
+async def _run_job(func, *args):
+    return func(*args)
+
+
+def _prefetch(twink) -> EffectPrefetch:
+    return EffectPrefetch(twink, interval=12 * 3600, retry=300)
+
+
+def test_prefetch_starts_only_when_powered_off_with_known_effect():
+    prefetch = _prefetch(FakeEffectTwink())
+    start = dict(busy=False, current_effect=2, complete=False, now=1000.0, wall_now=5e6)
+
+    assert not prefetch.should_start(power=True, **start)
+    assert prefetch.cancel.is_set()
+    assert not prefetch.should_start(power=False, **{**start, "current_effect": None})
+    assert not prefetch.should_start(power=False, **{**start, "busy": True})
+
+    assert prefetch.should_start(power=False, **start)
+    assert not prefetch.cancel.is_set()
+    # Повтор после неудачи - не раньше retry
+    assert not prefetch.should_start(power=False, **{**start, "now": 1200.0})
+    assert prefetch.should_start(power=False, **{**start, "now": 1300.0})
+
+
+def test_prefetch_reads_all_effects_and_restores_current():
+    twink = FakeEffectTwink()
+    prefetch = _prefetch(twink)
+
+    effects, restore = asyncio.run(
+        prefetch.async_run(4, lambda: 2, _run_job, wall_now=lambda: 5e6)
+    )
+
+    assert twink.selected == [0, 1, 2, 3, 2]
+    assert restore == 2 and sorted(effects) == [0, 1, 2, 3]
+    assert prefetch.prefetched == 5e6
+
+    # Полный свежий обход не повторяется
+    start = dict(busy=False, current_effect=2, now=1e4)
+    assert not prefetch.should_start(False, complete=True, wall_now=5e6 + 3600, **start)
+    assert prefetch.should_start(False, complete=True, wall_now=5e6 + 13 * 3600, **start)
+
+
+def test_incomplete_prefetch_is_not_marked_done():
+    """Потерянный ответ или остановка: время полного обхода не меняется."""
+    twink = FakeEffectTwink(lost={1})
+    prefetch = _prefetch(twink)
+    effects, restore = asyncio.run(prefetch.async_run(3, lambda: 0, _run_job))
+    assert sorted(effects) == [0, 2] and prefetch.prefetched == 0.0
+
+    twink = FakeEffectTwink()
+    prefetch = _prefetch(twink)
+    prefetch.cancel.set()
+    effects, restore = asyncio.run(prefetch.async_run(3, lambda: None, _run_job))
+    assert effects == {} and restore is None and twink.selected == []
+    assert prefetch.prefetched == 0.0
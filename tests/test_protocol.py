@@ -0,0 +1,167 @@
+"""Движок протокола на поддельных часах."""
+import pytest
+
+from custom_components.gyvertwink.protocol import (
+    COLD_MIN_TIMEOUT,
+    ArmTimer,
+    Done,
+    Pacer,
+    ProtocolEngine,
+    Send,
+)
+
+SETTINGS = b"GT\x01"
+SETTINGS_REPLY = b"GT\x01" + bytes(9)
+SELECT = b"GT\x04\x00\x03"
+SELECT_REPLY = b"GT\x04\x01\x80\x40"
+
+
+def warm_up(engine: ProtocolEngine, now: float, count: int = 10, rtt: float = 0.01) -> float:
+    """Серия быстрых ответов с короткими паузами; возвращает время после нее."""
+    engine.last_request = max(engine.last_request, now - 0.3)
+    for _ in range(count):
+        engine.request(SETTINGS, now, wait_answer=True)
+        now += rtt
+        engine.datagram_received(SETTINGS_REPLY, now)
+        now += 0.3
+    engine.events()
+    return now
+
+
+def test_warm_request_uses_rtt_timeout():
+    engine = ProtocolEngine()
+    now = warm_up(engine, 0.0)
+
+    request = engine.request(SETTINGS, now, wait_answer=True)
+    assert request.deadline - request.started == pytest.approx(engine.rtt.timeout)
+    assert engine.rtt.timeout < COLD_MIN_TIMEOUT
+
+
+def test_cold_request_waits_longer_than_warm_timeout():
+    engine = ProtocolEngine()
+    now = warm_up(engine, 0.0)
+
+    # Простой после быстрых ответов: RTT после такого простоя еще не измерен
+    request = engine.request(SETTINGS, now + 20, wait_answer=True)
+    assert request.deadline - request.started >= COLD_MIN_TIMEOUT
+    engine.events()
+
+    # Медленный ответ просыпающейся гирлянды не вызывает повтор
+    engine.tick(request.started + 0.2)
+    assert [event for event in engine.events() if isinstance(event, Send)] == []
+    engine.datagram_received(SETTINGS_REPLY, request.started + 0.25)
+    assert request.done and request.error is None
+
+
+def test_cold_timeout_follows_measured_first_packet_rtt():
+    engine = ProtocolEngine()
+    now = warm_up(engine, 0.0)
+
+    request = engine.request(SETTINGS, now + 20, wait_answer=True)
+    engine.datagram_received(SETTINGS_REPLY, request.started + 0.2)
+    now = warm_up(engine, request.started + 0.5)
+
+    request = engine.request(SETTINGS, now + 20, wait_answer=True)
+    assert request.deadline - request.started >= 0.4 - 1e-9
+
+
+def sends(engine: ProtocolEngine) -> list[bytes]:
+    """Пакеты, которые драйвер должен отправить."""
+    return [event.frame for event in engine.events() if isinstance(event, Send)]
+
+
+def test_requests_run_one_at_a_time_with_gap():
+    engine = ProtocolEngine(pacer=Pacer(0.1))
+    first = engine.request(SETTINGS, 0.0, wait_answer=True)
+    second = engine.request(SELECT, 0.0, wait_answer=True)
+    assert sends(engine) == [SETTINGS]
+
+    # Следующий запрос - после ответа на текущий и паузы между пакетами
+    engine.datagram_received(SETTINGS_REPLY, 0.02)
+    assert first.done and sends(engine) == []
+    assert engine.deadline == pytest.approx(0.12)
+
+    engine.tick(engine.deadline)
+    assert sends(engine) == [SELECT]
+    engine.datagram_received(SELECT_REPLY, 0.13)
+    assert second.done and second.result == SELECT_REPLY[2:]
+
+
+def test_request_gap_overrides_pacer():
+    engine = ProtocolEngine(pacer=Pacer(0.1))
+    engine.request(SETTINGS, 0.0, wait_answer=True)
+    engine.datagram_received(SETTINGS_REPLY, 0.02)
+    engine.events()
+
+    # Пакетные команды задают свою паузу, в том числе нулевую
+    engine.request(SELECT, 0.03, gap=0.05)
+    assert sends(engine) == []
+    assert engine.deadline == pytest.approx(0.07)
+    engine.tick(engine.deadline)
+    assert sends(engine) == [SELECT]
+
+    engine.request(SELECT, 0.07, gap=0)
+    assert sends(engine) == [SELECT]
+
+
+def test_reply_to_other_command_is_ignored():
+    engine = ProtocolEngine(pacer=Pacer(0))
+    request = engine.request(SELECT, 0.0, wait_answer=True)
+    engine.events()
+
+    # Запоздавший ответ на чтение настроек не завершает выбор эффекта
+    engine.datagram_received(SETTINGS_REPLY, 0.01)
+    assert not request.done
+    assert engine.rtt.srtt is None
+
+    engine.datagram_received(SELECT_REPLY, 0.02)
+    assert request.done and request.result == SELECT_REPLY[2:]
+    assert engine.rtt.srtt == pytest.approx(0.02)
+
+
+def test_timeout_retries_with_backoff_then_fails():
+    engine = ProtocolEngine(pacer=Pacer(0))
+    now = warm_up(engine, 0.0)
+    timeout = engine.rtt.timeout
+
+    request = engine.request(SETTINGS, now, wait_answer=True, retry=1)
+    assert sends(engine) == [SETTINGS]
+
+    engine.tick(now + timeout)
+    assert sends(engine) == [SETTINGS]
+    # Повтор ждет вдвое дольше, даже если таймаут на нижней границе
+    assert request.deadline - request.started == pytest.approx(2 * timeout)
+
+    engine.tick(request.deadline)
+    done = [event for event in engine.events() if isinstance(event, Done)]
+    assert done and isinstance(request.error, TimeoutError)
+
+
+def test_invalid_reply_ends_without_error():
+    engine = ProtocolEngine(pacer=Pacer(0))
+    request = engine.request(SETTINGS, 0.0, wait_answer=True, timeout=0.1, retry=0)
+    engine.events()
+
+    engine.datagram_received(b"XX\x01", 0.01)
+    engine.tick(0.1)
+    assert request.done and request.error is None and request.result is None
+
+
+def test_hedge_sends_duplicate_after_p95():
+    engine = ProtocolEngine(pacer=Pacer(0))
+    now = warm_up(engine, 0.0, rtt=0.01)
+    p95 = engine.rtt.p95
+
+    request = engine.request(SETTINGS, now, wait_answer=True, hedge=True)
+    assert sends(engine) == [SETTINGS]
+    assert engine.deadline == pytest.approx(now + p95)
+
+    engine.tick(now + p95)
+    events = engine.events()
+    assert [e.frame for e in events if isinstance(e, Send)] == [SETTINGS]
+    assert ArmTimer(request.deadline) in events
+
+    # Ответ после дубликата неоднозначен и не попадает в оценку RTT
+    srtt = engine.rtt.srtt
+    engine.datagram_received(SETTINGS_REPLY, now + p95 + 0.005)
+    assert request.done and engine.rtt.srtt == srtt
@@ -0,0 +1,45 @@
+"""Фоновый поиск новых гирлянд."""
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.const import CONF_HOST  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # noqa: E402
+
+from custom_components.gyvertwink.const import DOMAIN  # noqa: E402
+from custom_components.gyvertwink.scanner import GyverTwinkScanner  # noqa: E402
+
+CONFIGURED = "192.0.2.10"
+IGNORED = "192.0.2.11"
+NEW = "192.0.2.12"
+
+
+async def test_scan_offers_only_new_garlands(hass, enable_custom_integrations):
+    """Добавленные и скрытые гирлянды не предлагаются, новая - один раз."""
+    MockConfigEntry(domain=DOMAIN, options={CONF_HOST: CONFIGURED}).add_to_hass(hass)
+    MockConfigEntry(domain=DOMAIN, unique_id=IGNORED, source="ignore").add_to_hass(hass)
+    scanner = GyverTwinkScanner(hass)
+
+    with patch(
+        "homeassistant.components.network.async_get_ipv4_broadcast_addresses",
+        return_value=[],
+    ), patch(
+        "custom_components.gyvertwink.scanner.async_broadcast",
+        return_value={CONFIGURED, IGNORED, NEW},
+    ):
+        await scanner._async_scan()
+        await hass.async_block_till_done()
+        first_interval = scanner.backoff.interval
+
+        await scanner._async_scan()
+        await hass.async_block_till_done()
+
+    flows = hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    assert [flow["context"]["unique_id"] for flow in flows] == [NEW]
+    # Новая гирлянда сбрасывает интервал, повторный поиск без новых - удваивает
+    assert first_interval == 300
+    assert scanner.backoff.interval == 600
+
+    scanner.async_stop()
@@ -0,0 +1,96 @@
+"""Расчет и проигрывание шоу."""
+import asyncio
+
+import pytest
+
+from custom_components.gyvertwink.gyver_twink import speed_from_firmware, speed_to_firmware
+from custom_components.gyvertwink.protocol import RttEstimator
+from custom_components.gyvertwink.show import ARM_PINGS, async_play_show, parse_show
+
+DEVICES = {"A": "192.0.2.1"}
+
+
+def test_speed_conversion_round_trip():
+    assert speed_to_firmware(0) == 128
+    assert speed_to_firmware(40) == 88
+    assert speed_to_firmware(40, reverse=True) == 168
+    assert speed_from_firmware(168) == (40, True)
+    assert speed_from_firmware(88) == (40, False)
+
+
+def test_show_speed_uses_service_format():
+    show = parse_show(
+        {
+            "devices": DEVICES,
+            "keyframes": [
+                {"at": 0, "speed": 40},
+                {"at": 1, "speed": 40, "direction": True},
+            ],
+        }
+    )
+    assert [frame.data[4] for frame in show.frames] == [
+        speed_to_firmware(40),
+        speed_to_firmware(40, True),
+    ]
+
+
+def test_show_direction_requires_speed():
+    with pytest.raises(ValueError):
+        parse_show({"devices": DEVICES, "keyframes": [{"at": 0, "direction": True}]})
+
+
+def test_show_uses_device_effect_list():
+    devices = {"A": "192.0.2.1", "B": "192.0.2.2"}
+    show = parse_show(
+        {"devices": devices, "keyframes": [{"at": 0, "effect": "Custom"}]},
+        effect_list=["Other", "Custom"],
+        device_effects={"192.0.2.2": ["Custom"]},
+    )
+    assert {frame.device: frame.data[4] for frame in show.frames} == {"A": 1, "B": 0}
+
+
+def test_routed_show_coalesces_ramp_behind_slow_owner():
+    """Через медленного владельца ramp доходит до конечного значения."""
+    show = parse_show(
+        {
+            "devices": DEVICES,
+            "keyframes": [
+                {"at": 0, "effect": "Warm grad", "ramp": {"brightness": [0, 255]},
+                 "duration": 0.4, "fps": 20},
+            ],
+        }
+    )
+    received = []
+
+    async def send(alias, data):
+        received.append(data)
+        await asyncio.sleep(0.12)
+
+    report = asyncio.run(async_play_show(show, send=send))
+
+    assert not report["stopped"] and report["errors"] == 0
+    assert report["coalesced"] > 0
+    assert report["sent"] + report["coalesced"] == len(show.frames)
+    assert received[0][2:4] == b"\x04\x00"
+    assert received[-1] == b"GT\x02\x02\xff"
+
+
+def test_routed_show_arms_owner_and_leads_by_half_rtt():
+    """Через владельца: запросы поиска перед запуском, поправка на RTT/2."""
+    show = parse_show({"devices": DEVICES, "keyframes": [{"at": 0, "brightness": 10}]})
+    rtt = RttEstimator()
+    rtt.update(0.2)
+    armed = []
+
+    async def arm(alias):
+        armed.append(alias)
+
+    async def send(alias, data):
+        await asyncio.sleep(0.05)
+
+    report = asyncio.run(async_play_show(show, send=send, arm=arm, rtt={"A": rtt}))
+
+    assert armed == ["A"] * ARM_PINGS
+    assert report["devices"]["A"]["lead_ms"] == 100
+    # Отклонение измеряется после отправки владельцем
+    assert report["drift_ms"]["max"] >= 50
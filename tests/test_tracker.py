@@ -0,0 +1,64 @@
+"""Оценка текущего эффекта по модели автосмены."""
+import pytest
+
+from custom_components.gyvertwink.tracker import CONFIDENCE_THRESHOLD, EffectTracker
+
+FAVORITES = [True, False, True, True]
+
+
+def _tracker(random_change: bool = False) -> EffectTracker:
+    """Выбран эффект 0, автосмена раз в минуту."""
+    tracker = EffectTracker()
+    tracker.selected(0, 0.0)
+    tracker.update_settings(True, random_change, 1, 0.0, FAVORITES)
+    return tracker
+
+
+def test_selected_effect_is_certain_without_auto_change():
+    tracker = EffectTracker()
+    assert tracker.predict(0.0, FAVORITES) == (None, 0.0)
+
+    tracker.selected(2, 0.0)
+    assert tracker.predict(0.0, FAVORITES) == (2, 1.0)
+    # Без автосмены уверенность только медленно убывает со временем
+    effect, confidence = tracker.predict(EffectTracker.HALF_LIFE, FAVORITES)
+    assert effect == 2 and confidence == pytest.approx(0.5)
+
+
+def test_auto_change_steps_through_favorites():
+    tracker = _tracker()
+
+    # Эффект 1 не избранный и пропускается
+    assert tracker.predict(5.0, FAVORITES)[0] == 0
+    assert tracker.predict(65.0, FAVORITES)[0] == 2
+    assert tracker.predict(125.0, FAVORITES)[0] == 3
+    assert tracker.predict(185.0, FAVORITES)[0] == 0
+
+
+def test_half_phase_is_below_threshold():
+    """Посередине периода смена равновероятна: эффект неизвестен."""
+    tracker = _tracker()
+
+    assert tracker.predict(6.0, FAVORITES)[1] >= CONFIDENCE_THRESHOLD
+    assert tracker.predict(30.0, FAVORITES)[1] < CONFIDENCE_THRESHOLD
+    assert tracker.predict(90.0, FAVORITES)[1] < CONFIDENCE_THRESHOLD
+    assert tracker.predict(118.0, FAVORITES)[1] >= CONFIDENCE_THRESHOLD
+
+
+def test_random_change_loses_confidence_after_first_period():
+    tracker = _tracker(random_change=True)
+
+    effect, confidence = tracker.predict(90.0, FAVORITES)
+    assert effect == 0
+    assert confidence == pytest.approx(1 / 3, rel=0.01)
+
+
+def test_next_effect_and_lost():
+    tracker = EffectTracker()
+    tracker.selected(0, 1.0)
+    tracker.next_effect(1.0, FAVORITES)
+    assert tracker.predict(1.0, FAVORITES) == (2, 1.0)
+
+    tracker.lost()
+    tracker.next_effect(2.0, FAVORITES)
+    assert tracker.predict(2.0, FAVORITES) == (None, 0.0)